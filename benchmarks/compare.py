@@ -0,0 +1,74 @@
+# benchmarks/compare.py
+"""
+Compare two benchmark result files and fail when the current run regressed.
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, str]:
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float,
+            metric: str = "median") -> List[Dict[str, Any]]:
+    """
+    One row per benchmark of the baseline, with the relative change of `metric` and
+    whether it exceeds threshold (0.1 = 10% slower). A benchmark missing from the
+    current run has no change and counts as a regression, so a renamed or crashed
+    benchmark can't pass unnoticed. Benchmarks new in the current run are skipped.
+    """
+    current_by_key = {result_key(result): result for result in current["results"]}
+    rows = []
+    for before in baseline["results"]:
+        result = current_by_key.get(result_key(before))
+        if result is None:
+            rows.append({"name": before["name"], "params": before["params"], "baseline": before[metric],
+                         "current": None, "change": None, "regression": True})
+            continue
+        if not before[metric]:
+            continue
+        change = result[metric] / before[metric] - 1
+        rows.append({"name": result["name"], "params": result["params"], "baseline": before[metric],
+                     "current": result[metric], "change": change, "regression": change > threshold})
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed slowdown, 0.1 = 10%%")
+    parser.add_argument("--metric", default="median", choices=["mean", "median", "p95", "min"])
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+
+    rows = compare(baseline, current, args.threshold, args.metric)
+    for row in rows:
+        params = ", ".join(f"{key}={value}" for key, value in row["params"].items())
+        if row["current"] is None:
+            print(f"{row['name']:<24} {params:<50} {row['baseline'] * 1000:10.3f}ms {'':>12} {'':>8} MISSING")
+            continue
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:<24} {params:<50} {row['baseline'] * 1000:10.3f}ms {row['current'] * 1000:10.3f}ms "
+              f"{row['change']:+8.1%} {flag}")
+    missing = [row for row in rows if row["current"] is None]
+    regressions = [row for row in rows if row["regression"] and row["current"] is not None]
+    if missing:
+        print(f"{len(missing)} benchmark(s) missing from the current run")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+    return 1 if missing or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
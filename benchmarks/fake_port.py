@@ -0,0 +1,119 @@
+# benchmarks/fake_port.py
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+BLUEPRINT_PATH = re.compile(r"^/v1/blueprints/(?P<identifier>[^/]+)$")
+SCORECARDS_PATH = re.compile(r"^/v1/blueprints/(?P<identifier>[^/]+)/scorecards(?:/(?P<scorecard>[^/]+))?$")
+INTEGRATION_PATH = re.compile(r"^/v1/integration/(?P<identifier>[^/]+)$")
+
+
+class FakePortServer:
+    """
+    Local stand-in for the Port API used by the benchmarks.
+
+    latency (+/- jitter) seconds are added to every response; error_rate is the share
+    of requests answered with a 503 and rate_limit_rate the share answered with a 429
+    and Retry-After: 0. Blueprints carry `blueprint_properties` properties so payload
+    sizes can be varied. Authentication is always accepted.
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, blueprint_properties: int = 10, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.blueprint_properties = blueprint_properties
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str], int] = {}
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.base_url = ""
+
+    def blueprint(self, identifier: str) -> Dict[str, Any]:
+        properties = {f"property_{index}": {"title": f"Property {index}", "type": "string",
+                                            "description": "x" * 64}
+                      for index in range(self.blueprint_properties)}
+        return {"ok": True, "blueprint": {"identifier": identifier, "title": identifier,
+                                          "schema": {"properties": properties}, "aggregationProperties": {}}}
+
+    def respond(self, method: str, path: str, body: Any) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        with self.lock:
+            self.requests[(method, path)] = self.requests.get((method, path), 0) + 1
+            roll = self.random.random()
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        if delay:
+            time.sleep(delay)
+
+        if path == "/v1/auth/access_token":
+            return 200, {"accessToken": "benchmark-token", "expiresIn": 3600}, {}
+        if roll < self.rate_limit_rate:
+            return 429, {"ok": False, "error": "rate_limited"}, {"Retry-After": "0"}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, {"ok": False, "error": "unavailable"}, {}
+
+        match = BLUEPRINT_PATH.match(path)
+        if match and method == "GET":
+            return 200, self.blueprint(match.group("identifier")), {}
+        if match and method == "PATCH":
+            return 200, {"ok": True, "blueprint": body}, {}
+        match = SCORECARDS_PATH.match(path)
+        if match and method == "GET":
+            return 200, {"ok": True, "scorecards": []}, {}
+        if match and method in ("POST", "PUT"):
+            return 200, {"ok": True, "scorecard": body}, {}
+        match = INTEGRATION_PATH.match(path)
+        if match and method == "GET":
+            return 200, {"ok": True, "integration": {"identifier": match.group("identifier")}}, {}
+        return 404, {"ok": False, "error": "not_found"}, {}
+
+    def request_count(self) -> int:
+        with self.lock:
+            return sum(self.requests.values())
+
+    def start(self) -> "FakePortServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                status, body, headers = fake.respond(self.command, self.path, json.loads(raw) if raw else None)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_PUT = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> "FakePortServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,264 @@
+# benchmarks/run.py
+"""
+Benchmark the workflow executor against a local fake Port API.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.compare baseline.json results.json --threshold 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from ruamel.yaml import YAML
+
+from benchmarks.fake_port import FakePortServer
+from benchmarks.workflows import BENCHMARK_INPUTS, generate_workflow, write_workflow
+from src.api_clients.async_port_api import AsyncPortAPI
+from src.api_clients.port_api import PortAPI
+from src.yaml_handler.workflow_registry import WorkflowRegistry, compile_workflow, write_plan_cache
+from src.yaml_handler.yaml_executor import YAMLExecutor, create_execution_plan
+
+
+def summarize(name: str, params: Dict[str, Any], samples: List[float]) -> Dict[str, Any]:
+    """
+    Statistics for per-iteration wall times in seconds.
+    """
+    ordered = sorted(samples)
+    total = sum(samples)
+    return {
+        "name": name,
+        "params": params,
+        "unit": "seconds",
+        "iterations": len(samples),
+        "mean": total / len(samples),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        "min": ordered[0],
+        "max": ordered[-1],
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "ops_per_second": len(samples) / total if total else None
+    }
+
+
+def measure(function: Callable[[], Any], iterations: int, warmup: int = 1) -> List[float]:
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_parsing(folder: str, filename: str, params: Dict[str, Any], iterations: int) -> List[Dict[str, Any]]:
+    path = os.path.join(folder, filename)
+    yaml = YAML(typ="safe")
+
+    def load():
+        with open(path) as file:
+            return yaml.load(file)
+
+    data = load()
+    workflow = compile_workflow(filename, data)
+    # What `python -m src.yaml_handler.validate` leaves behind, for registry_cached_get
+    write_plan_cache(folder, {filename: data})
+
+    def resolve():
+        executor = YAMLExecutor(folder, None, BENCHMARK_INPUTS)
+        executor.use_workflow(workflow)
+        for step in executor.steps:
+            if step.action == "load_resource":
+                step.result = {"status": "success", "data": {"ok": True, "blueprint": {"identifier": "service"}}}
+        for step in executor.steps:
+            executor.resolve_step(step)
+
+    return [
+        summarize("yaml_load", params, measure(load, iterations)),
+        summarize("plan_build", params, measure(lambda: create_execution_plan(data), iterations)),
+        summarize("registry_cold_get", params,
+                  measure(lambda: WorkflowRegistry(folder, plan_cache=False).get(filename), iterations)),
+        summarize("registry_cached_get", params, measure(lambda: WorkflowRegistry(folder).get(filename), iterations)),
+        summarize("plan_instantiate", params, measure(workflow.instantiate, iterations)),
+        summarize("placeholder_resolution", params, measure(resolve, iterations)),
+    ]
+
+
+def bench_execution(folder: str, filename: str, params: Dict[str, Any], fake: FakePortServer,
+                    iterations: int, workers: List[int]) -> List[Dict[str, Any]]:
+    workflow = WorkflowRegistry(folder).get(filename)
+    # No response cache, so every iteration reads from the fake server
+    port_api = PortAPI(cache_size=0, backoff_factor=0.01)
+    port_api.base_url = fake.base_url
+    async_port_api = AsyncPortAPI(cache_size=0, backoff_factor=0.01)
+    async_port_api.base_url = fake.base_url
+
+    results = []
+    for max_workers in workers:
+        def run_sync():
+            executor = YAMLExecutor(folder, port_api, BENCHMARK_INPUTS, max_workers=max_workers)
+            executor.use_workflow(workflow)
+            executor.execute_steps()
+
+        def run_async():
+            executor = YAMLExecutor(folder, port_api, BENCHMARK_INPUTS, max_workers=max_workers,
+                                    async_port_api=async_port_api)
+            executor.use_workflow(workflow)
+            asyncio.run(executor.execute_steps_async())
+
+        run_params = dict(params, max_workers=max_workers)
+        results.append(summarize("execute_steps", run_params, measure(run_sync, iterations)))
+        results.append(summarize("execute_steps_async", run_params, measure(run_async, iterations)))
+    return results
+
+
+def bench_http(folder: str, filename: str, params: Dict[str, Any], fake: FakePortServer,
+               requests_per_client: int, concurrency: List[int]) -> List[Dict[str, Any]]:
+    """
+    Throughput of POST /execute_steps served by the Flask app with concurrent clients.
+    """
+    import requests
+    from werkzeug.serving import make_server
+
+    from src.web_app import app as app_module
+    from src.yaml_handler.workflow_registry import get_registry
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # No access log line per request
+    # Like bench_execution, no response cache, so every request reads from the fake server
+    port_api = PortAPI(cache_size=0, backoff_factor=0.01)
+    port_api.base_url = fake.base_url
+    app_port_api, app_registry = app_module.port_api, app_module.workflow_registry
+    app_module.port_api, app_module.workflow_registry = port_api, get_registry(folder)
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/execute_steps"
+
+    results = []
+    try:
+        for clients in concurrency:
+            def client(_):
+                latencies = []
+                with requests.Session() as session:
+                    for _ in range(requests_per_client):
+                        start = time.perf_counter()
+                        response = session.post(url, json={"filename": filename, "inputs": BENCHMARK_INPUTS})
+                        response.raise_for_status()
+                        latencies.append(time.perf_counter() - start)
+                return latencies
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as pool:
+                latencies = [latency for batch in pool.map(client, range(clients)) for latency in batch]
+            elapsed = time.perf_counter() - start
+
+            summary = summarize("http_execute_steps", dict(params, clients=clients), latencies)
+            # Requests complete in parallel, so throughput comes from the elapsed time, not the latencies
+            summary["ops_per_second"] = len(latencies) / elapsed
+            results.append(summary)
+    finally:
+        server.shutdown()
+        app_module.port_api, app_module.workflow_registry = app_port_api, app_registry
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def parse_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the YAML workflow executor against a fake Port API.")
+    parser.add_argument("--sizes", type=parse_list, default=[10, 50, 200], help="Workflow sizes in steps")
+    parser.add_argument("--properties", type=int, default=5, help="Properties per add_properties step")
+    parser.add_argument("--rules", type=int, default=3, help="Rules per scorecard")
+    parser.add_argument("--nesting", type=int, default=2, help="Depth of nested placeholder containers per step")
+    parser.add_argument("--iterations", type=int, default=20, help="Iterations of the in-process benchmarks")
+    parser.add_argument("--execute-iterations", type=int, default=5, help="Iterations of end-to-end runs")
+    parser.add_argument("--workers", type=parse_list, default=[1, 4], help="max_workers values for execute_steps")
+    parser.add_argument("--concurrency", type=parse_list, default=[1, 8], help="Concurrent HTTP clients")
+    parser.add_argument("--requests-per-client", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Port latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake Port responses that are 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake Port responses that are 429")
+    parser.add_argument("--blueprint-properties", type=int, default=20, help="Properties per fake blueprint")
+    parser.add_argument("--skip", type=lambda value: set(value.split(",")), default=set(),
+                        help="Comma-separated groups to skip: parsing, execution, http")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="workflow-bench-")
+    # Keep the app's databases out of the repository, for this run only
+    databases = {"CHECKPOINT_DB": os.path.join(work_dir, "checkpoints.db"),
+                 "RUN_HISTORY_DB": os.path.join(work_dir, "run_history.db"),
+                 "JOBS_DB": os.path.join(work_dir, "jobs.db")}
+    unset = [name for name in databases if name not in os.environ]
+    for name in unset:
+        os.environ[name] = databases[name]
+
+    try:
+        fake = FakePortServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                              rate_limit_rate=args.rate_limit_rate, blueprint_properties=args.blueprint_properties)
+        results = []
+        with fake:
+            for size in args.sizes:
+                filename = f"bench_{size}.yml"
+                write_workflow(work_dir, filename, generate_workflow(size, args.properties, args.rules, args.nesting))
+                params = {"steps": size, "properties": args.properties, "rules": args.rules, "nesting": args.nesting}
+                if "parsing" not in args.skip:
+                    results.extend(bench_parsing(work_dir, filename, params, args.iterations))
+                if "execution" not in args.skip:
+                    results.extend(bench_execution(work_dir, filename, params, fake, args.execute_iterations,
+                                                   args.workers))
+                if "http" not in args.skip:
+                    results.extend(bench_http(work_dir, filename, params, fake, args.requests_per_client,
+                                              args.concurrency))
+            port_requests = fake.request_count()
+    finally:
+        for name in unset:
+            os.environ.pop(name, None)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "revision": git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "fake_port": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+                          "rate_limit_rate": args.rate_limit_rate, "blueprint_properties": args.blueprint_properties,
+                          "requests_served": port_requests}
+        },
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
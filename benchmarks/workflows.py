@@ -0,0 +1,72 @@
+# benchmarks/workflows.py
+
+import json
+import os
+from typing import Any, Dict
+
+from ruamel.yaml import YAML
+
+RULE_QUERY = json.dumps({"combinator": "and", "conditions": [{"property": "changed_files", "operator": "<",
+                                                             "value": 20}]})
+
+
+def nested_metadata(depth: int) -> Dict[str, Any]:
+    """
+    A dict nested `depth` levels deep with placeholders at every level, to exercise
+    placeholder resolution inside containers.
+    """
+    metadata: Dict[str, Any] = {"owner": "{{ inputs.team }}", "static": "value"}
+    for level in range(depth):
+        metadata = {"owner": "{{ inputs.team }}", "level": level, "tags": ["a", "{{ inputs.team }}"],
+                    "child": metadata}
+    return metadata
+
+
+def generate_workflow(steps: int = 10, properties: int = 5, rules: int = 3, nesting: int = 0) -> Dict[str, Any]:
+    """
+    A synthetic workflow with `steps` steps: one load_resource step per four steps,
+    followed by add_properties_to_blueprint and add_scorecards_to_blueprint steps that
+    reference the loaded blueprints.
+    """
+    loads = max(1, steps // 4)
+    workflow_steps = []
+    for index in range(loads):
+        workflow_steps.append({"name": f"Load {index}", "action": "load_resource", "resource_type": "blueprint",
+                               "resource_id": f"{{{{ inputs.blueprint }}}}_{index}"})
+
+    for index in range(steps - loads):
+        load = f"Load {index % loads}"
+        step: Dict[str, Any] = {"name": f"Step {index}", "blueprint_data": f"{{{{ steps.{load}.result }}}}"}
+        if index % 2 == 0:
+            step["action"] = "add_properties_to_blueprint"
+            step["properties"] = [{"identifier": f"prop_{index}_{number}", "name": f"{{{{ inputs.team }}}} {number}",
+                                   "type": "string"} for number in range(properties)]
+        else:
+            step["action"] = "add_scorecards_to_blueprint"
+            step["scorecards"] = [{
+                "identifier": f"scorecard_{index}",
+                "name": f"Scorecard {index}",
+                "rules": [{"identifier": f"rule_{number}", "title": f"Rule {number}", "level": "Gold",
+                           "query": RULE_QUERY} for number in range(rules)]
+            }]
+        if nesting:
+            step["metadata"] = nested_metadata(nesting)
+        workflow_steps.append(step)
+
+    return {
+        "title": f"Benchmark workflow ({steps} steps)",
+        "description": "Generated by benchmarks/workflows.py",
+        "inputs": {"blueprint": {"type": "blueprint"}, "team": {"type": "text"}},
+        "steps": workflow_steps
+    }
+
+
+def write_workflow(folder: str, filename: str, workflow: Dict[str, Any]) -> str:
+    path = os.path.join(folder, filename)
+    yaml = YAML()
+    with open(path, "w") as file:
+        yaml.dump(workflow, file)
+    return path
+
+
+BENCHMARK_INPUTS = {"blueprint": "service", "team": "platform"}
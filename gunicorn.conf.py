@@ -0,0 +1,34 @@
+# gunicorn.conf.py
+"""
+Pre-fork deployment of the web app:
+
+    gunicorn -c gunicorn.conf.py src.web_app.app:app
+
+The app is imported and its workflows compiled once in the master; workers forked
+afterwards share that read-only state copy-on-write. Each worker then fetches its
+Port tokens on a background thread, so a slow Port can't delay its heartbeat past
+the worker timeout. GET /ready returns 200 once that is done.
+"""
+
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5001")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+preload_app = True
+
+
+def when_ready(server):
+    from src.web_app import app
+
+    app.warm_up(worker=False)
+    # Move everything allocated so far out of the collector's reach, so collections in
+    # the workers don't touch (and copy) the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from src.web_app import app
+
+    app.warm_up(shared=False)
@@ -0,0 +1,325 @@
+# src/api_clients/async_port_api.py
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import random
+import time
+import aiohttp
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from src.api_clients.port_api import RETRY_STATUS_CODES, WRITE_RETRY_STATUS_CODES
+from src.api_clients.response_cache import ResponseCache, matches_resource
+from src.api_clients.single_flight import SingleFlight
+from src.api_clients.streaming import normalize_fields, project
+from src.api_clients.rate_limit import RateLimiter
+from src.instrumentation.timing import endpoint_label, record_http
+
+
+class AsyncPortAPIError(Exception):
+    """
+    Raised for HTTP error responses, mirroring requests' HTTPError for the sync client.
+    """
+    def __init__(self, status: int, message: str, text: str = ""):
+        super().__init__(f"{status} Error: {message}")
+        self.status = status
+        self.text = text
+
+
+class AsyncPortAPI:
+    """
+    asyncio counterpart of PortAPI built on aiohttp.
+
+    Token state lives on the instance and can be shared by every request, while the
+    aiohttp session is scoped to the event loop that opens it through `session()`
+    (or `async with AsyncPortAPI() as api`).
+    """
+    # Failures a request can raise, for callers that don't import aiohttp themselves
+    REQUEST_ERRORS = (AsyncPortAPIError, aiohttp.ClientError, asyncio.TimeoutError)
+
+    def __init__(self, pool_size: int = 100, max_retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_max: float = 30.0, timeout: float = 30.0, token_refresh_margin: float = 60.0,
+                 cache_size: int = 256, cache_ttls: Optional[Dict[str, float]] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.base_url = "https://api.getport.io/v1"
+        self.client_id = os.getenv("PORT_CLIENT_ID")
+        self.client_secret = os.getenv("PORT_CLIENT_SECRET")
+        self.token = None
+        self.token_expires_at: Optional[float] = None
+        self.headers = {"Content-Type": "application/json"}
+
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.token_refresh_margin = token_refresh_margin
+        # Read-through cache for blueprint/integration reads; cache_size=0 disables it
+        self.cache = ResponseCache(max_size=cache_size, ttls=cache_ttls)
+        # Read/write budgets and in-flight cap; may be shared with the sync PortAPI
+        self.rate_limiter = rate_limiter or RateLimiter()
+        # Concurrent identical reads, and token requests, share one HTTP request, also across event loops
+        self.flights = SingleFlight()
+        self._session: contextvars.ContextVar = contextvars.ContextVar(f"port_session_{id(self)}", default=None)
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        """
+        Open a pooled aiohttp session for the current event loop and use it for every
+        call made inside the block. Nested scopes reuse the outer session.
+        """
+        if self._session.get() is not None:
+            yield self
+            return
+
+        connector = aiohttp.TCPConnector(limit=self.pool_size)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as client:
+            token = self._session.set(client)
+            try:
+                yield self
+            finally:
+                self._session.reset(token)
+
+    async def __aenter__(self):
+        self._scope = self.session()
+        return await self._scope.__aenter__()
+
+    async def __aexit__(self, *exc_info):
+        return await self._scope.__aexit__(*exc_info)
+
+    def _client(self) -> aiohttp.ClientSession:
+        client = self._session.get()
+        if client is None:
+            raise RuntimeError("AsyncPortAPI must be used inside `async with port_api.session()`")
+        return client
+
+    def token_is_stale(self) -> bool:
+        """
+        True when there is no token yet or it expires within token_refresh_margin seconds.
+        """
+        if not self.token:
+            return True
+        if self.token_expires_at is None:
+            return False
+        return time.monotonic() >= self.token_expires_at - self.token_refresh_margin
+
+    async def authenticate(self):
+        """
+        Retrieve an access token using clientId and clientSecret. Concurrent calls
+        share a single token request.
+        """
+        return await self.flights.do_async("authenticate", self._fetch_token)
+
+    async def _fetch_token(self):
+        auth_url = f"{self.base_url}/auth/access_token"
+        auth_data = {
+            "clientId": self.client_id,
+            "clientSecret": self.client_secret
+        }
+
+        status, body, text = await self._send("POST", auth_url, json=auth_data,
+                                              headers={"Content-Type": "application/json"}, idempotent=True)
+        if status >= 400:
+            raise AsyncPortAPIError(status, "authentication failed", text)
+
+        self.token = body.get("accessToken")
+        expires_in = body.get("expiresIn")
+        self.token_expires_at = time.monotonic() + expires_in if expires_in else None
+        self.headers["Authorization"] = f"Bearer {self.token}"
+        return self.token
+
+    async def ensure_token(self):
+        """
+        Authenticate if the current token is missing or about to expire.
+        """
+        if self.token_is_stale():
+            await self.flights.do_async("authenticate", self._fetch_token_if, self.token_is_stale)
+
+    async def refresh_token(self, rejected_token: Optional[str]):
+        """
+        Replace a token Port rejected with a 401, unless another request already did.
+        """
+        await self.flights.do_async("authenticate", self._fetch_token_if, lambda: self.token == rejected_token)
+
+    async def _fetch_token_if(self, needed: Callable[[], bool]) -> Optional[str]:
+        return await self._fetch_token() if needed() else self.token
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """
+        Seconds to wait before the given retry attempt, honoring a numeric Retry-After.
+        """
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    async def _send(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs):
+        """
+        Send a request with retries on 429/5xx and connection errors; requests that
+        aren't idempotent are only retried as in PortAPI._send.
+        Returns (status, parsed JSON body or None, raw text).
+        """
+        kind = "read" if method == "GET" else "write"
+        if idempotent is None:
+            idempotent = method == "GET"
+        retry_status_codes = RETRY_STATUS_CODES if idempotent else WRITE_RETRY_STATUS_CODES
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                async with self.rate_limiter.slot_async(kind):
+                    attempt_start = time.perf_counter()
+                    async with self._client().request(method, url, **kwargs) as response:
+                        ttfb = time.perf_counter() - attempt_start
+                        text = await response.text()
+                        status = response.status
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                # Only a failed connection attempt is known to have left Port untouched
+                if attempt >= self.max_retries or not (idempotent or isinstance(e, aiohttp.ClientConnectorError)):
+                    self._record_http(method, url, "error", start, attempt, None, "")
+                    raise
+                await asyncio.sleep(self._backoff_delay(attempt, None))
+                attempt += 1
+                continue
+
+            if status not in retry_status_codes or attempt >= self.max_retries:
+                self._record_http(method, url, status, start, attempt, ttfb, text)
+                try:
+                    body = json.loads(text) if text else None
+                except ValueError:
+                    body = None
+                return status, body, text
+            await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def _record_http(self, method: str, url: str, status: Any, start: float, retries: int,
+                     ttfb: Optional[float], text: str) -> None:
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        record_http({
+            "method": method,
+            "endpoint": endpoint_label(path),
+            "status": status,
+            "wall": time.perf_counter() - start,
+            "connect": None,  # aiohttp doesn't expose per-request connection setup time
+            "ttfb": ttfb,
+            "bytes": len(text.encode()),
+            "retries": retries
+        })
+
+    async def _request(self, method: str, path: str, **kwargs):
+        """
+        Send an authenticated request, refreshing the token once on a 401.
+        """
+        await self.ensure_token()
+        url = f"{self.base_url}{path}"
+        token = self.token
+        status, body, text = await self._send(method, url, headers=dict(self.headers), **kwargs)
+        if status == 401:
+            await self.refresh_token(token)
+            status, body, text = await self._send(method, url, headers=dict(self.headers), **kwargs)
+        return status, body, text
+
+    async def _get(self, path: str) -> Dict[str, Any]:
+        status, body, text = await self._request("GET", path)
+        if status >= 400:
+            raise AsyncPortAPIError(status, f"GET {path} failed", text)
+        return body
+
+    async def _cached_get(self, resource_type: str, resource_id: str, path: str,
+                          fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        fields = normalize_fields(fields)
+        cache_id = resource_id if fields is None else (resource_id, fields)
+        cached = self.cache.get(resource_type, cache_id)
+        if cached is not None:
+            return cached
+        return await self.flights.do_async((resource_type, cache_id), self._load, resource_type, cache_id, path,
+                                           fields)
+
+    async def _load(self, resource_type: str, cache_id: Any, path: str,
+                    fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        generation = self.cache.generation(resource_type, cache_id)
+        data = await self._get(path)
+        if fields is not None:
+            # The body is already in memory here; projecting only bounds what the run keeps
+            data = project(data, fields)
+        self.cache.set(resource_type, cache_id, data, generation)
+        return data
+
+    async def _write(self, method: str, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            status, body, text = await self._request(method, path, data=json.dumps(payload))
+        except AsyncPortAPIError as api_err:
+            return {"status": "error", "error": str(api_err), "details": api_err.text}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+            return {"status": "error", "error": str(req_err), "details": "An error occurred during the request."}
+
+        if status >= 400:
+            return {"status": "error", "error": f"{status} Error: {method} {path} failed", "details": text}
+        return {"status": "success", "data": body}
+
+    async def get_blueprint_data(self, blueprint_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch blueprint data for a given blueprint ID, optionally only the given dotted fields.
+        """
+        return await self._cached_get("blueprint", blueprint_id, f"/blueprints/{blueprint_id}", fields)
+
+    async def get_integration_data(self, integration_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch integration data for a given integration ID, optionally only the given dotted fields.
+        """
+        return await self._cached_get("integration", integration_id, f"/integration/{integration_id}", fields)
+
+    async def get_scorecards(self, blueprint_identifier: str) -> List[Dict[str, Any]]:
+        """
+        Fetch the scorecards defined on a blueprint.
+        """
+        cached = self.cache.get("scorecards", blueprint_identifier)
+        if cached is not None:
+            return cached
+        return await self.flights.do_async(("scorecards", blueprint_identifier), self._load_scorecards,
+                                           blueprint_identifier)
+
+    async def _load_scorecards(self, blueprint_identifier: str) -> List[Dict[str, Any]]:
+        generation = self.cache.generation("scorecards", blueprint_identifier)
+        scorecards = (await self._get(f"/blueprints/{blueprint_identifier}/scorecards")).get("scorecards", [])
+        self.cache.set("scorecards", blueprint_identifier, scorecards, generation)
+        return scorecards
+
+    def invalidate(self, resource_type: str, resource_id: str) -> None:
+        """
+        Forget cached and in-flight reads of a resource we are about to change, see PortAPI.invalidate.
+        """
+        self.cache.invalidate(resource_type, resource_id)
+        self.flights.forget(lambda key: matches_resource(key, resource_type, resource_id))
+
+    @contextlib.contextmanager
+    def _invalidating(self, blueprint_identifier: str, *resource_types: str):
+        """
+        Invalidate the blueprint's resources before and after a write, see PortAPI._invalidating.
+        """
+        for resource_type in resource_types:
+            self.invalidate(resource_type, blueprint_identifier)
+        try:
+            yield
+        finally:
+            for resource_type in resource_types:
+                self.invalidate(resource_type, blueprint_identifier)
+
+    async def update_blueprint(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._invalidating(blueprint_identifier, "blueprint"):
+            return await self._write("PATCH", f"/blueprints/{blueprint_identifier}", payload)
+
+    async def create_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._invalidating(blueprint_identifier, "blueprint", "scorecards"):
+            return await self._write("POST", f"/blueprints/{blueprint_identifier}/scorecards", payload)
+
+    async def update_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._invalidating(blueprint_identifier, "blueprint", "scorecards"):
+            return await self._write("PUT",
+                                     f"/blueprints/{blueprint_identifier}/scorecards/{payload['identifier']}",
+                                     payload)
@@ -0,0 +1,176 @@
+# src/api_clients/cassette.py
+"""
+Record PortAPI traffic to a cassette and replay it without network access.
+
+A cassette is gzip-compressed JSON lines: a header, then one interaction per HTTP
+request in the order they completed, retries included. Each line is a gzip member
+of its own, which gzip readers decompress as one stream. Both modes are transport
+adapters, so retries, rate limiting, streaming and timing hooks in PortAPI behave
+exactly as they do against Port.
+
+On replay a request is matched on method, path and a digest of its body, falling
+back to method and path alone so runs with other inputs still replay. Interactions
+of a request are served in recorded order and then again from the start, so a
+short recording can drive any number of runs. Each response is held back for its
+recorded latency times latency_scale; 0 measures the executor alone.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+from src.api_clients.http_timing import TimedHTTPAdapter
+
+CASSETTE_VERSION = 1
+CASSETTE_MODES = ("record", "replay")
+# Response headers worth replaying; bodies are stored decoded, so encodings are dropped
+KEPT_HEADERS = ("Content-Type", "Retry-After")
+# Token requests carry credentials: their bodies aren't matched and the issued token isn't stored
+AUTH_PATH = "/auth/access_token"
+RECORDED_TOKEN = "recorded-token"
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """
+    Raised on replay for a request the cassette has no interaction for.
+    """
+
+
+def body_digest(request: requests.PreparedRequest) -> Optional[str]:
+    if request.path_url.endswith(AUTH_PATH) or not request.body:
+        return None
+    body = request.body.encode() if isinstance(request.body, str) else request.body
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def raw_response(status: int, reason: str, headers: Dict[str, str], content: bytes) -> HTTPResponse:
+    """
+    A urllib3 response serving content from memory, which requests can stream like a live one.
+    """
+    headers = dict(headers, **{"Content-Length": str(len(content))})
+    return HTTPResponse(body=io.BytesIO(content), headers=headers, status=status, reason=reason,
+                        preload_content=False, decode_content=False)
+
+
+class RecordingAdapter(TimedHTTPAdapter):
+    """
+    Sends requests to Port as usual and appends each interaction to the cassette.
+
+    An interaction is written with a single append as soon as its request completes,
+    and no compressor state is kept between writes. Processes forked after the
+    adapter was created (e.g. workers of a preloaded gunicorn app) therefore record
+    to the same cassette without corrupting it.
+    """
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        self._append({"version": CASSETTE_VERSION, "recorded_at": time.time()})
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        # O_APPEND moves every write to the end of the file atomically, so members written
+        # by other threads or processes never overlap
+        member = gzip.compress((json.dumps(record) + "\n").encode("utf-8"), compresslevel=6)
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, member)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content  # Read the whole body, even for streamed requests, to store it
+        elapsed = time.perf_counter() - start
+
+        stored = content
+        if request.path_url.endswith(AUTH_PATH) and response.ok:
+            body = response.json()
+            body["accessToken"] = RECORDED_TOKEN
+            stored = json.dumps(body).encode()
+        headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+        self._append({"method": request.method, "path": request.path_url, "body": body_digest(request),
+                      "status": response.status_code, "reason": response.reason, "headers": headers,
+                      "elapsed": elapsed, "content": stored.decode("utf-8", errors="replace")})
+        # The caller gets a fresh response over the same bytes, since this one's stream is used up
+        return self.build_response(request, raw_response(response.status_code, response.reason, headers, content))
+
+    def close(self) -> None:
+        super().close()
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Answers requests from a cassette without opening connections. Thread-safe.
+    """
+    def __init__(self, path: str, latency_scale: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._exact: Dict[Tuple[str, str, Optional[str]], List[Dict[str, Any]]] = {}
+        self._by_route: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._positions: Dict[Tuple[Any, ...], int] = {}
+        self.replayed = 0
+        self.misses = 0
+
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {path}: {header.get('version')}")
+            for line in file:
+                interaction = json.loads(line)
+                interaction["content"] = interaction["content"].encode()
+                route = (interaction["method"], interaction["path"])
+                self._exact.setdefault(route + (interaction["body"],), []).append(interaction)
+                self._by_route.setdefault(route, []).append(interaction)
+
+    def _next(self, request: requests.PreparedRequest) -> Dict[str, Any]:
+        route = (request.method, request.path_url)
+        key = route + (body_digest(request),)
+        interactions = self._exact.get(key)
+        if interactions is None:
+            key, interactions = route, self._by_route.get(route)
+        with self._lock:
+            if interactions is None:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded interaction for {request.method} {request.path_url}",
+                                   request=request)
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self.replayed += 1
+        return interactions[position % len(interactions)]
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        interaction = self._next(request)
+        if self.latency_scale > 0:
+            time.sleep(interaction["elapsed"] * self.latency_scale)
+        return self.build_response(request, raw_response(interaction["status"], interaction["reason"],
+                                                         interaction["headers"], interaction["content"]))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"replayed": self.replayed, "misses": self.misses}
+
+
+def cassette_adapter(path: str, mode: str, latency_scale: float = 1.0, **kwargs) -> HTTPAdapter:
+    """
+    The transport for a PortAPI recording to, or replaying from, the cassette at path.
+    """
+    if mode == "record":
+        return RecordingAdapter(path, **kwargs)
+    if mode == "replay":
+        return ReplayAdapter(path, latency_scale=latency_scale, **kwargs)
+    raise ValueError(f"Cassette mode must be one of {', '.join(CASSETTE_MODES)}, got {mode!r}")
@@ -0,0 +1,63 @@
+# src/api_clients/http_timing.py
+
+import threading
+import time
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Connection setup time (TCP connect plus TLS handshake) of the request running in this thread
+_local = threading.local()
+
+
+def _add_connect_time(seconds: float) -> None:
+    _local.connect_seconds = (getattr(_local, "connect_seconds", None) or 0.0) + seconds
+
+
+def take_connect_time() -> Optional[float]:
+    """
+    Seconds spent opening new connections since the last call, or None if the
+    request reused a pooled keep-alive connection.
+    """
+    seconds = getattr(_local, "connect_seconds", None)
+    _local.connect_seconds = None
+    return seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections record how long it takes to open them.
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
@@ -1,113 +1,406 @@
 # src/api_clients/port_api.py
+import contextlib
 import json
 import os
+import random
+import time
 import requests
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
+from urllib3.exceptions import NewConnectionError
+
+from src.api_clients.cassette import cassette_adapter
+from src.api_clients.http_timing import TimedHTTPAdapter, take_connect_time
+from src.api_clients.rate_limit import RateLimiter
+from src.api_clients.response_cache import ResponseCache, matches_resource
+from src.api_clients.single_flight import SingleFlight
+from src.api_clients.streaming import normalize_fields, read_fields
+from src.instrumentation.timing import endpoint_label, record_http
 
 # Explicitly load the .env file here
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
 
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# A write may already have been applied when it gets a 5xx or times out, and creates aren't idempotent,
+# so writes are only retried when Port turned them away or the request never left this process
+WRITE_RETRY_STATUS_CODES = {429}
+
+
+def failed_before_sending(error: requests.RequestException) -> bool:
+    """
+    True when a request failed while connecting, so Port never received it.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying error
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
 class PortAPI:
-    def __init__(self):
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                 backoff_max: float = 30.0, timeout: float = 30.0, token_refresh_margin: float = 60.0,
+                 cache_size: int = 256, cache_ttls: Optional[Dict[str, float]] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cassette: Optional[str] = None,
+                 cassette_mode: str = "replay", replay_latency_scale: float = 1.0):
         self.base_url = "https://api.getport.io/v1"
         self.client_id = os.getenv("PORT_CLIENT_ID")
         self.client_secret = os.getenv("PORT_CLIENT_SECRET")
         self.token = None
+        self.token_expires_at: Optional[float] = None
         self.headers = {"Content-Type": "application/json"}
 
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.token_refresh_margin = token_refresh_margin  # Seconds before expiry to refresh the token
+        # Read-through cache for blueprint/integration reads; cache_size=0 disables it
+        self.cache = ResponseCache(max_size=cache_size, ttls=cache_ttls)
+        # Concurrent identical reads, and token requests, share one HTTP request
+        self.flights = SingleFlight()
+        # Read/write budgets and in-flight cap; may be shared with other clients
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # One keep-alive connection pool shared by every call made through this client. With a
+        # cassette, traffic is recorded to it or replayed from it instead (see cassette.py).
+        self.session = requests.Session()
+        if cassette:
+            adapter = cassette_adapter(cassette, cassette_mode, replay_latency_scale,
+                                       pool_connections=pool_size, pool_maxsize=pool_size)
+        else:
+            adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
     def authenticate(self):
         """
-        Retrieve an access token using clientId and clientSecret.
+        Retrieve an access token using clientId and clientSecret. Concurrent calls
+        share a single token request.
         """
+        return self.flights.do("authenticate", self._fetch_token)
+
+    def _fetch_token(self):
         auth_url = f"{self.base_url}/auth/access_token"
         auth_data = {
             "clientId": self.client_id,
             "clientSecret": self.client_secret
         }
 
-        response = requests.post(auth_url, json=auth_data, headers=self.headers)
+        # Asking for a token changes nothing in Port, so it is retried like a read
+        response = self._send("POST", auth_url, json=auth_data, headers={"Content-Type": "application/json"},
+                              idempotent=True)
         response.raise_for_status()
 
-        self.token = response.json().get("accessToken")
+        body = response.json()
+        self.token = body.get("accessToken")
+        expires_in = body.get("expiresIn")
+        self.token_expires_at = time.monotonic() + expires_in if expires_in else None
         # Update headers with the token
         self.headers["Authorization"] = f"Bearer {self.token}"
         return self.token
 
-    def get_blueprint_data(self, blueprint_id: str) -> Dict[str, Any]:
+    def token_is_stale(self) -> bool:
         """
-        Fetch blueprint data for a given blueprint ID.
+        True when there is no token yet or it expires within token_refresh_margin seconds.
         """
         if not self.token:
-            self.authenticate()
+            return True
+        if self.token_expires_at is None:
+            return False
+        return time.monotonic() >= self.token_expires_at - self.token_refresh_margin
 
-        url = f"{self.base_url}/blueprints/{blueprint_id}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+    def ensure_token(self):
+        """
+        Authenticate if the current token is missing or about to expire.
+        """
+        if self.token_is_stale():
+            self.flights.do("authenticate", self._fetch_token_if, self.token_is_stale)
+
+    def refresh_token(self, rejected_token: Optional[str]):
+        """
+        Replace a token Port rejected with a 401, unless another request already did.
+        """
+        self.flights.do("authenticate", self._fetch_token_if, lambda: self.token == rejected_token)
 
-        return response.json()
+    def _fetch_token_if(self, needed: Callable[[], bool]) -> Optional[str]:
+        # Checked again once in the flight: a token request may have finished since the caller looked
+        return self._fetch_token() if needed() else self.token
 
-    def get_integration_data(self, integration_id: str) -> Dict[str, Any]:
+    def _backoff_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
         """
-        Fetch integration data for a given integration ID.
+        Seconds to wait before the given retry attempt. Honors a numeric Retry-After
+        header, otherwise uses exponential backoff with full jitter.
         """
-        if not self.token:
-            self.authenticate()
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass  # HTTP-date values fall back to exponential backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
 
-        url = f"{self.base_url}/integration/{integration_id}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+    def _send(self, method: str, url: str, idempotent: Optional[bool] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session, retrying 429/5xx responses and
+        connection errors with backoff. Requests that aren't idempotent (by default
+        anything but GET) are only retried on 429 and on connection errors raised
+        before they were sent. The last response or error is returned/raised once
+        retries are exhausted. Timing, size and retries are reported to the
+        instrumentation hooks.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        kind = "read" if method == "GET" else "write"
+        if idempotent is None:
+            idempotent = method == "GET"
+        retry_status_codes = RETRY_STATUS_CODES if idempotent else WRITE_RETRY_STATUS_CODES
+        attempt = 0
+        start = time.perf_counter()
+        take_connect_time()  # Discard anything left over from an earlier request on this thread
+        while True:
+            try:
+                # Every attempt, retries included, counts against the rate limits
+                with self.rate_limiter.slot(kind):
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries or not (idempotent or failed_before_sending(e)):
+                    self._record_http(method, url, "error", start, attempt, None)
+                    raise
+                time.sleep(self._backoff_delay(attempt, None))
+                attempt += 1
+                continue
 
-        return response.json()
+            if response.status_code not in retry_status_codes or attempt >= self.max_retries:
+                self._record_http(method, url, response.status_code, start, attempt, response,
+                                  streamed=kwargs.get("stream", False))
+                return response
+            response.close()  # Hand the connection back to the pool before waiting
+            time.sleep(self._backoff_delay(attempt, response))
+            attempt += 1
 
-    def update_blueprint(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Any:
-        if not self.token:
-            self.authenticate()
+    def _record_http(self, method: str, url: str, status: Any, start: float, retries: int,
+                     response: Optional[requests.Response], streamed: bool = False) -> None:
+        path = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        record_http({
+            "method": method,
+            "endpoint": endpoint_label(path),
+            "status": status,
+            "wall": time.perf_counter() - start,
+            "connect": take_connect_time(),
+            # requests measures until the response headers were parsed
+            "ttfb": response.elapsed.total_seconds() if response is not None else None,
+            # A streamed body hasn't been read yet; fall back to the declared length
+            "bytes": (int(response.headers.get("Content-Length") or 0) if streamed else len(response.content))
+            if response is not None else 0,
+            "retries": retries
+        })
 
-        url = f"{self.base_url}/blueprints/{blueprint_identifier}"
-        response = requests.patch(url, headers=self.headers, data=json.dumps(payload))
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send an authenticated request to the Port API. A 401 triggers one token
+        refresh and a single replay of the request.
+        """
+        self.ensure_token()
+        url = f"{self.base_url}{path}"
+        token = self.token
+        response = self._send(method, url, headers=dict(self.headers), **kwargs)
+        if response.status_code == 401:
+            response.close()
+            self.refresh_token(token)
+            response = self._send(method, url, headers=dict(self.headers), **kwargs)
+        return response
 
-        # Check for HTTP errors and return a structured response
+    def _get_json(self, path: str, fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        """
+        GET a JSON document. With fields, the body is streamed and only those paths
+        are kept, so large responses are never held in memory whole.
+        """
+        if fields is None:
+            response = self._request("GET", path)
+            response.raise_for_status()
+            return response.json()
+
+        response = self._request("GET", path, stream=True)
         try:
-            response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
-            return {
-                "status": "success",
-                "data": response.json()  # Parse JSON response if successful
-            }
-        except requests.exceptions.HTTPError as http_err:
-            return {
-                "status": "error",
-                "error": str(http_err),
-                "details": response.text  # Include server's error message for context
-            }
-        except requests.exceptions.RequestException as req_err:
-            return {
-                "status": "error",
-                "error": str(req_err),
-                "details": "An error occurred during the request."
-            }
+            response.raise_for_status()
+            return read_fields(response, fields)
+        finally:
+            response.close()
 
-    def create_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-        url = f"{self.base_url}/blueprints/{blueprint_identifier}/scorecards"
+    def _load_json(self, resource_type: str, cache_id: Any, path: str,
+                   fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        # Taken first, so a write that invalidates the resource meanwhile keeps this response out of the cache
+        generation = self.cache.generation(resource_type, cache_id)
+        data = self._get_json(path, fields)
+        self.cache.set(resource_type, cache_id, data, generation)
+        return data
+
+    def get_blueprint_data(self, blueprint_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch blueprint data for a given blueprint ID, optionally only the given dotted fields.
+        """
+        fields = normalize_fields(fields)
+        cache_id = blueprint_id if fields is None else (blueprint_id, fields)
+        cached = self.cache.get("blueprint", cache_id)
+        if cached is not None:
+            return cached
+
+        return self.flights.do(("blueprint", cache_id), self._load_json, "blueprint", cache_id, f"/blueprints/{blueprint_id}", fields)
+
+    def get_integration_data(self, integration_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch integration data for a given integration ID, optionally only the given dotted fields.
+        """
+        fields = normalize_fields(fields)
+        cache_id = integration_id if fields is None else (integration_id, fields)
+        cached = self.cache.get("integration", cache_id)
+        if cached is not None:
+            return cached
+
+        return self.flights.do(("integration", cache_id), self._load_json, "integration", cache_id, f"/integration/{integration_id}", fields)
+
+    def get_scorecards(self, blueprint_identifier: str) -> List[Dict[str, Any]]:
+        """
+        Fetch the scorecards defined on a blueprint.
+        """
+        cached = self.cache.get("scorecards", blueprint_identifier)
+        if cached is not None:
+            return cached
+
+        return self.flights.do(("scorecards", blueprint_identifier), self._load_scorecards, blueprint_identifier)
+
+    def _load_scorecards(self, blueprint_identifier: str) -> List[Dict[str, Any]]:
+        generation = self.cache.generation("scorecards", blueprint_identifier)
+        response = self._request("GET", f"/blueprints/{blueprint_identifier}/scorecards")
+        response.raise_for_status()
 
-        response = requests.post(url, headers=self.headers, data=json.dumps(payload))
+        scorecards = response.json().get("scorecards", [])
+        self.cache.set("scorecards", blueprint_identifier, scorecards, generation)
+        return scorecards
 
-        # Check for HTTP errors and return a structured response
+    def invalidate(self, resource_type: str, resource_id: str) -> None:
+        """
+        Forget cached and in-flight reads of a resource we are about to change, so the
+        next read sees the write. Reads already in flight still return to their
+        callers but are not cached.
+        """
+        self.cache.invalidate(resource_type, resource_id)
+        self.flights.forget(lambda key: matches_resource(key, resource_type, resource_id))
+
+    @contextlib.contextmanager
+    def _invalidating(self, blueprint_identifier: str, *resource_types: str):
+        """
+        Invalidate the blueprint's resources around a write: before it, so nothing
+        cached is served meanwhile, and after it, since a read sent while the write
+        was in flight may have fetched the state from before it.
+        """
+        for resource_type in resource_types:
+            self.invalidate(resource_type, blueprint_identifier)
         try:
-            response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
-            return {
-                "status": "success",
-                "data": response.json()  # Parse JSON response if successful
-            }
+            yield
+        finally:
+            for resource_type in resource_types:
+                self.invalidate(resource_type, blueprint_identifier)
+
+    def update_blueprint(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Any:
+        # Any cached copy of this blueprint is out of date once we write to it
+        with self._invalidating(blueprint_identifier, "blueprint"):
+            # Check for HTTP errors and return a structured response
+            try:
+                response = self._request("PATCH", f"/blueprints/{blueprint_identifier}", data=json.dumps(payload))
+                response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
+                return {
+                    "status": "success",
+                    "data": response.json()  # Parse JSON response if successful
+                }
+            except requests.exceptions.HTTPError as http_err:
+                return {
+                    "status": "error",
+                    "error": str(http_err),
+                    # Include server's error message for context
+                    "details": http_err.response.text if http_err.response is not None else ""
+                }
+            except requests.exceptions.RequestException as req_err:
+                return {
+                    "status": "error",
+                    "error": str(req_err),
+                    "details": "An error occurred during the request."
+                }
+
+    def create_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._invalidating(blueprint_identifier, "blueprint", "scorecards"):
+            # Check for HTTP errors and return a structured response
+            try:
+                response = self._request("POST", f"/blueprints/{blueprint_identifier}/scorecards",
+                                         data=json.dumps(payload))
+                response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
+                return {
+                    "status": "success",
+                    "data": response.json()  # Parse JSON response if successful
+                }
+            except requests.exceptions.HTTPError as http_err:
+                return {
+                    "status": "error",
+                    "error": str(http_err),
+                    # Include server's error message for context
+                    "details": http_err.response.text if http_err.response is not None else ""
+                }
+            except requests.exceptions.RequestException as req_err:
+                return {
+                    "status": "error",
+                    "error": str(req_err),
+                    "details": "An error occurred during the request."
+                }
+
+    def bulk_upsert_entities(self, blueprint_identifier: str, entities: List[Dict[str, Any]],
+                             merge: bool = True) -> Dict[str, Any]:
+        """
+        Create or update up to 20 entities of a blueprint in one request. With merge,
+        properties missing from an entity keep their current values.
+        """
+        try:
+            response = self._request("POST", f"/blueprints/{blueprint_identifier}/entities/bulk",
+                                     params={"upsert": "true", "merge": "true" if merge else "false"},
+                                     data=json.dumps({"entities": entities}))
+            response.raise_for_status()
+            return {"status": "success", "data": response.json()}
         except requests.exceptions.HTTPError as http_err:
             return {
                 "status": "error",
                 "error": str(http_err),
-                "details": response.text  # Include server's error message for context
+                "details": http_err.response.text if http_err.response is not None else ""
             }
         except requests.exceptions.RequestException as req_err:
             return {
                 "status": "error",
                 "error": str(req_err),
                 "details": "An error occurred during the request."
-            }
\ No newline at end of file
+            }
+
+    def update_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        with self._invalidating(blueprint_identifier, "blueprint", "scorecards"):
+            # Check for HTTP errors and return a structured response
+            try:
+                response = self._request("PUT", f"/blueprints/{blueprint_identifier}/scorecards/{payload['identifier']}",
+                                         data=json.dumps(payload))
+                response.raise_for_status()  # Raises an HTTPError for bad responses (4xx or 5xx)
+                return {
+                    "status": "success",
+                    "data": response.json()  # Parse JSON response if successful
+                }
+            except requests.exceptions.HTTPError as http_err:
+                return {
+                    "status": "error",
+                    "error": str(http_err),
+                    # Include server's error message for context
+                    "details": http_err.response.text if http_err.response is not None else ""
+                }
+            except requests.exceptions.RequestException as req_err:
+                return {
+                    "status": "error",
+                    "error": str(req_err),
+                    "details": "An error occurred during the request."
+                }
@@ -0,0 +1,271 @@
+# src/api_clients/rate_limit.py
+import asyncio
+import contextlib
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process limiters are available
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens are added per second, up to `capacity`.
+
+    acquire() blocks until enough tokens are available. A rate of 0 or less
+    disables limiting.
+    """
+    poll_interval = 0.005
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0, blocking: bool = True) -> float:
+        """
+        Take tokens if available. Returns 0 on success, otherwise the seconds to wait
+        before they will be. Without blocking, a bucket another caller is updating
+        counts as unavailable for poll_interval instead of being waited for.
+        """
+        if not self.enabled:
+            return 0.0
+        if not self._lock.acquire(blocking):
+            return self.poll_interval
+        try:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+        finally:
+            self._lock.release()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Block until tokens are taken. Returns the total seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a file, so every process that opens the same
+    path (e.g. gunicorn workers) shares one budget. Access is serialized with flock.
+    """
+    _STATE = struct.Struct("dd")  # tokens, wall-clock time of the last update
+
+    def __init__(self, path: str, rate: float, capacity: Optional[float] = None):
+        if fcntl is None:
+            raise RuntimeError("Cross-process rate limiting requires fcntl (POSIX)")
+        super().__init__(rate, capacity)
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._open_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+
+    @property
+    def _fd(self) -> int:
+        # flock locks belong to the open file, which forked children share with their parent, so
+        # workers of a preloaded app would not exclude each other; each process opens its own.
+        # Callers hold self._lock.
+        if self._pid != os.getpid():
+            os.close(self._open_fd)  # Only this process's copy; the parent's stays open
+            self._open_fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._pid = os.getpid()
+        return self._open_fd
+
+    def try_acquire(self, tokens: float = 1.0, blocking: bool = True) -> float:
+        if not self.enabled:
+            return 0.0
+        # flock is per open file, so threads of this process also need the local lock
+        if not self._lock.acquire(blocking):
+            return self.poll_interval
+        try:
+            fd = self._fd
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:  # Another process holds the bucket
+                return self.poll_interval
+            try:
+                now = time.time()
+                raw = os.pread(fd, self._STATE.size, 0)
+                if len(raw) == self._STATE.size:
+                    stored, updated_at = self._STATE.unpack(raw)
+                    available = min(self.capacity, stored + max(0.0, now - updated_at) * self.rate)
+                else:
+                    available = self.capacity
+                delay = 0.0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    delay = (tokens - available) / self.rate
+                os.pwrite(fd, self._STATE.pack(available, now), 0)
+                return delay
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
+
+
+class InFlightLimiter:
+    """
+    Caps the number of requests in flight at the same time within this process.
+    """
+    poll_interval = 0.005
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def try_acquire(self) -> Any:
+        """
+        Take a slot without blocking. Returns a handle for release(), or None if all slots are taken.
+        """
+        return True if self._semaphore.acquire(blocking=False) else None
+
+    def acquire(self) -> Any:
+        self._semaphore.acquire()
+        return True
+
+    def release(self, handle: Any) -> None:
+        self._semaphore.release()
+
+
+class FileInFlightLimiter(InFlightLimiter):
+    """
+    Caps in-flight requests across processes: each slot is a lock file held with a
+    non-blocking flock for the duration of a request. The OS releases the slot if
+    the holding process dies.
+    """
+    def __init__(self, directory: str, limit: int):
+        if fcntl is None:
+            raise RuntimeError("Cross-process rate limiting requires fcntl (POSIX)")
+        self.limit = limit
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def try_acquire(self) -> Any:
+        for slot in range(self.limit):
+            fd = os.open(os.path.join(self.directory, f"slot-{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    def acquire(self) -> Any:
+        while True:
+            handle = self.try_acquire()
+            if handle is not None:
+                return handle
+            time.sleep(self.poll_interval)
+
+    def release(self, handle: Any) -> None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        os.close(handle)
+
+
+class RateLimiter:
+    """
+    Client-side throttle for Port API calls: separate token buckets for reads and
+    writes plus a cap on requests in flight. With state_dir set, the budgets are
+    shared by every process using that directory. Rates and limits of 0 disable them.
+    """
+    def __init__(self, read_rate: float = 0.0, write_rate: float = 0.0, max_in_flight: int = 0,
+                 burst: Optional[float] = None, state_dir: Optional[str] = None):
+        self.state_dir = state_dir
+        if state_dir:
+            self.buckets = {"read": FileTokenBucket(os.path.join(state_dir, "read.bucket"), read_rate, burst),
+                            "write": FileTokenBucket(os.path.join(state_dir, "write.bucket"), write_rate, burst)}
+            self.in_flight = FileInFlightLimiter(os.path.join(state_dir, "in_flight"), max_in_flight) \
+                if max_in_flight > 0 else None
+        else:
+            self.buckets = {"read": TokenBucket(read_rate, burst), "write": TokenBucket(write_rate, burst)}
+            self.in_flight = InFlightLimiter(max_in_flight) if max_in_flight > 0 else None
+        self._lock = threading.Lock()
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.active = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.in_flight is not None or any(bucket.enabled for bucket in self.buckets.values())
+
+    def _record(self, waited: float, active_delta: int) -> None:
+        with self._lock:
+            if waited > 0:
+                self.throttled += 1
+                self.wait_seconds += waited
+            self.active += active_delta
+
+    @contextlib.contextmanager
+    def slot(self, kind: str):
+        """
+        Block until a request of the given kind ("read" or "write") may be sent.
+        """
+        start = time.perf_counter()
+        self.buckets[kind].acquire()
+        handle = self.in_flight.acquire() if self.in_flight is not None else None
+        self._record(time.perf_counter() - start, 1)
+        try:
+            yield
+        finally:
+            if handle is not None:
+                self.in_flight.release(handle)
+            self._record(0.0, -1)
+
+    @contextlib.asynccontextmanager
+    async def slot_async(self, kind: str):
+        """
+        slot() for coroutines: waits with asyncio.sleep instead of blocking the event loop,
+        including while another thread or process holds the bucket's lock.
+        """
+        start = time.perf_counter()
+        bucket = self.buckets[kind]
+        while True:
+            delay = bucket.try_acquire(blocking=False)
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        handle = None
+        if self.in_flight is not None:
+            while True:
+                handle = self.in_flight.try_acquire()
+                if handle is not None:
+                    break
+                await asyncio.sleep(self.in_flight.poll_interval)
+        self._record(time.perf_counter() - start, 1)
+        try:
+            yield
+        finally:
+            if handle is not None:
+                self.in_flight.release(handle)
+            self._record(0.0, -1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"throttled": self.throttled, "wait_seconds": self.wait_seconds, "in_flight": self.active}
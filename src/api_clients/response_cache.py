@@ -0,0 +1,155 @@
+# src/api_clients/response_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Default time-to-live in seconds per resource type
+DEFAULT_TTLS = {
+    "blueprint": 30.0,
+    "integration": 30.0,
+    "scorecards": 30.0,
+}
+
+_MISSING = object()
+
+
+def base_resource_id(resource_id: Hashable) -> Hashable:
+    """
+    The resource a cache id refers to: field projections are cached as (resource_id, fields).
+    """
+    return resource_id[0] if isinstance(resource_id, tuple) else resource_id
+
+
+def matches_resource(key: Tuple[str, Hashable], resource_type: str, resource_id: Hashable) -> bool:
+    """
+    True for the key of resource_id and for the keys of its field projections,
+    which are (resource_type, (resource_id, fields)).
+    """
+    return key[0] == resource_type and (
+        key[1] == resource_id or (isinstance(key[1], tuple) and key[1][:1] == (resource_id,)))
+
+
+class ResponseCache:
+    """
+    Thread-safe, size-bounded cache for Port read responses.
+
+    Entries are keyed by (resource_type, resource_id), expire after the TTL configured
+    for their resource type, and the least recently used entry is evicted once
+    max_size is reached. Cached values are shared between callers and must be
+    treated as read-only.
+
+    Every invalidation bumps a cache-wide generation and records it for the resource.
+    A reader takes the generation before fetching and passes it to set(), which drops
+    the response if the resource was invalidated while it was in flight. Only the
+    latest max_invalidations resources are remembered; older ones are treated as
+    invalidated at the newest generation forgotten, which at worst drops a response
+    that could have been cached.
+    """
+    max_invalidations = 1024
+
+    def __init__(self, max_size: int = 256, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+        # Generation of each resource's latest invalidation, least recent first
+        self._invalidated: "OrderedDict[Tuple[str, Hashable], int]" = OrderedDict()
+        self._forgotten = 0  # Latest generation dropped from _invalidated
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, resource_type: str, resource_id: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value, or default on a miss or an expired entry.
+        """
+        key = (resource_type, resource_id)
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, resource_type: str, resource_id: Hashable) -> int:
+        """
+        The current generation; take it before fetching a value to set().
+        """
+        with self._lock:
+            return self._generation
+
+    def set(self, resource_type: str, resource_id: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Cache value, unless generation is given and the resource was invalidated since it was taken.
+        """
+        if not self.enabled:
+            return
+        key = (resource_type, resource_id)
+        ttl = self.ttls.get(resource_type, self.default_ttl)
+        with self._lock:
+            if generation is not None and \
+                    generation < self._invalidated.get((resource_type, base_resource_id(resource_id)), self._forgotten):
+                self.discarded += 1
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, resource_type: str, resource_id: Hashable) -> None:
+        """
+        Drop the entry for resource_id along with any field projections of it, and
+        keep responses already in flight from being cached.
+        """
+        with self._lock:
+            self._generation += 1
+            self._invalidated[(resource_type, resource_id)] = self._generation
+            self._invalidated.move_to_end((resource_type, resource_id))
+            while len(self._invalidated) > self.max_invalidations:
+                self._forgotten = self._invalidated.popitem(last=False)[1]
+            keys = [key for key in self._entries if matches_resource(key, resource_type, resource_id)]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Counters used to size the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "discarded": self.discarded,
+            }
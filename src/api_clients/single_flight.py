@@ -0,0 +1,107 @@
+# src/api_clients/single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class FlightAborted(Exception):
+    """
+    The caller running a shared call was interrupted; callers waiting on it try again.
+    """
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs the call,
+    callers arriving while it is in flight wait for it and receive the same result
+    or exception. Nothing is kept once the call has finished; that's up to the
+    ResponseCache.
+
+    Thread-safe, and the same instance can be used from any number of event loops
+    through do_async, since waiters are woken through a concurrent Future.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """
+        The in-flight call for key, and whether the caller has to run it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            future.set_running_or_notify_cancel()  # Waiters can't cancel it from here on
+            self.calls += 1
+            return future, True
+
+    def _land(self, key: Hashable, future: Future) -> None:
+        # Callers arriving after this start a new call
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key: Hashable, call: Callable[..., Any], *args, **kwargs) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except FlightAborted:
+                    continue
+            try:
+                result = call(*args, **kwargs)
+            except Exception as e:
+                self._land(key, future)
+                future.set_exception(e)
+                raise
+            except BaseException:
+                self._land(key, future)
+                future.set_exception(FlightAborted())
+                raise
+            self._land(key, future)
+            future.set_result(result)
+            return result
+
+    async def do_async(self, key: Hashable, call: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: a cancelled waiter must not cancel the call for everyone else
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except FlightAborted:
+                    continue
+            try:
+                result = await call(*args, **kwargs)
+            except Exception as e:
+                self._land(key, future)
+                future.set_exception(e)
+                raise
+            except BaseException:  # Cancelled, e.g. because its request went away
+                self._land(key, future)
+                future.set_exception(FlightAborted())
+                raise
+            self._land(key, future)
+            future.set_result(result)
+            return result
+
+    def forget(self, matches: Callable[[Hashable], bool]) -> None:
+        """
+        Detach in-flight calls whose key matches, so later callers start a new call
+        instead of sharing one that began before, e.g., a write. Current waiters still
+        receive the detached call's result.
+        """
+        with self._lock:
+            for key in [key for key in self._calls if matches(key)]:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,90 @@
+# src/api_clients/streaming.py
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import ijson
+except ImportError:  # Optional: without it responses are parsed whole and then projected
+    ijson = None
+
+_MISSING = object()
+
+
+def normalize_fields(fields: Union[None, str, Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    A hashable, ordered form of a `fields` declaration, or None when all fields are wanted.
+    """
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = [fields]
+    return tuple(sorted({field.strip() for field in fields if field and field.strip()})) or None
+
+
+def _set_path(target: Dict[str, Any], path: str, value: Any) -> None:
+    keys = path.split(".")
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def project(data: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Keep only the listed dotted paths of object keys, e.g. "blueprint.identifier".
+    Paths that don't exist are left out.
+    """
+    result: Dict[str, Any] = {}
+    for field in fields:
+        value = data
+        for key in field.split("."):
+            value = value.get(key, _MISSING) if isinstance(value, dict) else _MISSING
+            if value is _MISSING:
+                break
+        if value is not _MISSING:
+            _set_path(result, field, value)
+    return result
+
+
+def parse_fields(stream: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    Incrementally parse a JSON document from a binary file-like object, building only
+    the values at the listed paths. Memory use is bounded by the selected values,
+    not by the size of the document. Requires ijson.
+    """
+    wanted = set(fields)
+    result: Dict[str, Any] = {}
+    builder = None
+    target = ""
+    depth = 0
+    # use_float: numbers come back as float, like json.loads gives, rather than Decimal
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if depth == 0:
+                    _set_path(result, target, builder.value)
+                    builder = None
+            continue
+        if prefix not in wanted or event in ("map_key", "end_map", "end_array"):
+            continue
+        if event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            target, depth = prefix, 1
+        else:
+            _set_path(result, prefix, value)
+    return result
+
+
+def read_fields(response: Any, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    The listed fields of a streamed requests.Response body. Falls back to parsing the
+    whole body when ijson is not installed.
+    """
+    if ijson is None:
+        return project(response.json(), fields)
+    response.raw.decode_content = True  # Let urllib3 undo gzip/deflate while streaming
+    return parse_fields(response.raw, fields)
@@ -0,0 +1,74 @@
+# src/instrumentation/hooks.py
+
+import logging
+import threading
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationHook:
+    """
+    Base class for instrumentation consumers. Override the callbacks you need;
+    they are called synchronously from the thread doing the work, so keep them cheap.
+    """
+    def on_phase(self, phase: str, wall: float, cpu: float, labels: Dict[str, Any]) -> None:
+        """
+        A timed phase outside of any step, e.g. YAML parsing or plan instantiation.
+        """
+
+    def on_step(self, step: Dict[str, Any]) -> None:
+        """
+        A finished step: number, name, action, status, per-phase timings and HTTP calls.
+        """
+
+    def on_http(self, record: Dict[str, Any]) -> None:
+        """
+        A finished Port API call: method, endpoint, status, timings, bytes and retries.
+        """
+
+    def on_run(self, run: Dict[str, Any]) -> None:
+        """
+        A finished workflow run with its overall timings and per-step outcomes, see YAMLExecutor.run_report.
+        """
+
+
+class HookRegistry:
+    """
+    Thread-safe set of hooks. A failing hook is logged and never breaks the caller.
+    """
+    def __init__(self):
+        self._hooks: List[InstrumentationHook] = []
+        self._lock = threading.Lock()
+
+    def register(self, hook: InstrumentationHook) -> InstrumentationHook:
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+        return hook
+
+    def unregister(self, hook: InstrumentationHook) -> None:
+        with self._lock:
+            self._hooks = [registered for registered in self._hooks if registered is not hook]
+
+    def _emit(self, method: str, *args: Any) -> None:
+        for hook in self._hooks:
+            try:
+                getattr(hook, method)(*args)
+            except Exception:
+                logger.exception("Instrumentation hook %r failed in %s", hook, method)
+
+    def emit_phase(self, phase: str, wall: float, cpu: float, labels: Dict[str, Any] = None) -> None:
+        self._emit("on_phase", phase, wall, cpu, labels or {})
+
+    def emit_step(self, step: Dict[str, Any]) -> None:
+        self._emit("on_step", step)
+
+    def emit_http(self, record: Dict[str, Any]) -> None:
+        self._emit("on_http", record)
+
+    def emit_run(self, run: Dict[str, Any]) -> None:
+        self._emit("on_run", run)
+
+
+# Process-wide hooks used by PortAPI, AsyncPortAPI, YAMLExecutor and the workflow registry
+hooks = HookRegistry()
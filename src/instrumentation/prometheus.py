@@ -0,0 +1,127 @@
+# src/instrumentation/prometheus.py
+
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.instrumentation.hooks import InstrumentationHook
+
+# Histogram buckets in seconds, from sub-millisecond CPU work to slow Port round-trips
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    items = key + extra
+    if not items:
+        return ""
+    escaped = (f'{name}="{_escape(value)}"' for name, value in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry(InstrumentationHook):
+    """
+    Aggregates instrumentation events into counters and histograms and renders them
+    in the Prometheus text exposition format.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._gauges: Dict[str, Callable[[], Dict[LabelKey, float]]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, help_text: str, labels: Dict[str, Any], amount: float = 1.0) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._help.setdefault(name, ("counter", help_text))
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, help_text: str, labels: Dict[str, Any], value: float) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help_text))
+            series = self._histograms.setdefault(name, {})
+            # Per-bucket counts followed by the running sum and count
+            values = series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Dict[str, float]],
+              label_name: str = "name") -> None:
+        """
+        Register a gauge family whose values are collected when rendering.
+        """
+        with self._lock:
+            self._help[name] = ("gauge", help_text)
+            self._gauges[name] = lambda: {((label_name, key),): value for key, value in collect().items()}
+
+    def on_phase(self, phase: str, wall: float, cpu: float, labels: Dict[str, Any]) -> None:
+        self.observe("executor_phase_wall_seconds", "Wall time of executor phases", {"phase": phase}, wall)
+        self.observe("executor_phase_cpu_seconds", "CPU time of executor phases", {"phase": phase}, cpu)
+
+    def on_step(self, step: Dict[str, Any]) -> None:
+        labels = {"action": step.get("action"), "status": step.get("status")}
+        self.inc("executor_steps_total", "Executed workflow steps", labels)
+        for phase, totals in step.get("timings", {}).get("phases", {}).items():
+            self.observe("executor_step_phase_wall_seconds", "Wall time per step phase",
+                         {"action": step.get("action"), "phase": phase}, totals["wall"])
+            self.observe("executor_step_phase_cpu_seconds", "CPU time per step phase",
+                         {"action": step.get("action"), "phase": phase}, totals["cpu"])
+
+    def on_http(self, record: Dict[str, Any]) -> None:
+        labels = {"method": record.get("method"), "endpoint": record.get("endpoint"),
+                  "status": record.get("status")}
+        self.inc("port_api_requests_total", "Port API requests", labels)
+        self.observe("port_api_request_seconds", "Port API request wall time", labels, record.get("wall", 0.0))
+        if record.get("ttfb") is not None:
+            self.observe("port_api_ttfb_seconds", "Time to first byte of Port API responses", labels, record["ttfb"])
+        if record.get("connect") is not None:
+            self.observe("port_api_connect_seconds", "Time to open new connections to Port", {}, record["connect"])
+        self.inc("port_api_response_bytes_total", "Bytes received from the Port API", labels, record.get("bytes", 0))
+        self.inc("port_api_retries_total", "Retried Port API attempts", labels, record.get("retries", 0))
+
+    def on_run(self, run: Dict[str, Any]) -> None:
+        self.inc("executor_runs_total", "Workflow runs", {"mode": run.get("mode")})
+        self.observe("executor_run_wall_seconds", "Wall time of workflow runs", {"mode": run.get("mode")},
+                     run.get("wall", 0.0))
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            help_items = sorted(self._help.items())
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {key: list(values) for key, values in series.items()}
+                          for name, series in self._histograms.items()}
+            gauges = dict(self._gauges)
+
+        for name, (kind, help_text) in help_items:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for key, value in counters.get(name, {}).items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            elif kind == "gauge":
+                for key, value in gauges[name]().items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            else:
+                for key, values in histograms.get(name, {}).items():
+                    for bound, count in zip(self.buckets, values):
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', str(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key, (('le', '+Inf'),))} {values[-1]}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {values[-2]}")
+                    lines.append(f"{name}_count{_format_labels(key)} {values[-1]}")
+        return "\n".join(lines) + "\n"
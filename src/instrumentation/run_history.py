@@ -0,0 +1,258 @@
+# src/instrumentation/run_history.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.instrumentation.hooks import InstrumentationHook
+
+# Run outcomes; a run is failed as soon as one of its steps did not succeed
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Step statuses that make a run fail
+FAILED_STEP_STATUSES = ("failed", "error")
+
+# Upper bound on the page size of list_runs
+MAX_PAGE_SIZE = 500
+
+
+def inputs_hash(inputs: Dict[str, Any]) -> str:
+    """
+    Short, stable hash of a run's inputs, to find runs with the same inputs without storing them.
+    """
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def encode_cursor(started_at: float, run_id: str) -> str:
+    return f"{started_at!r}|{run_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Raises ValueError for a malformed cursor.
+    """
+    started_at, _, run_id = cursor.partition("|")
+    return float(started_at), run_id
+
+
+class RunHistoryStore(ABC):
+    """
+    Interface for stores of finished workflow runs.
+    """
+    @abstractmethod
+    def record_run(self, run: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_runs(self, filename: Optional[str] = None, status: Optional[str] = None, since: Optional[float] = None,
+                  until: Optional[float] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def workflow_stats(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def compact(self, older_than: float) -> int:
+        raise NotImplementedError
+
+
+class SQLiteRunHistoryStore(RunHistoryStore):
+    """
+    Keeps a summary of every run and its steps in a local SQLite database, indexed by
+    workflow, status and start time. Each run is appended in one transaction.
+
+    With retention_seconds, runs older than that are deleted every compact_every
+    appends and the freed pages are returned to the file system.
+    """
+    def __init__(self, path: str, retention_seconds: Optional[float] = None, compact_every: int = 1000):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.compact_every = compact_every
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._appends = 0
+        with self._lock:
+            # Only takes effect for a new database; lets compact() shrink the file
+            self._connection.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    inputs_hash TEXT NOT NULL,
+                    mode TEXT,
+                    write_mode TEXT,
+                    status TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    wall REAL NOT NULL,
+                    step_count INTEGER NOT NULL,
+                    failed_steps INTEGER NOT NULL,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS runs_by_time ON runs (started_at, run_id);
+                CREATE INDEX IF NOT EXISTS runs_by_workflow ON runs (filename, started_at, run_id);
+                CREATE INDEX IF NOT EXISTS runs_by_status ON runs (status, started_at, run_id);
+                CREATE TABLE IF NOT EXISTS run_steps (
+                    run_id TEXT NOT NULL,
+                    step_number INTEGER NOT NULL,
+                    step_name TEXT,
+                    action TEXT,
+                    status TEXT,
+                    wall REAL,
+                    error TEXT,
+                    PRIMARY KEY (run_id, step_number)
+                ) WITHOUT ROWID;
+            """)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # Each process opens its own connection, see SQLiteCheckpointStore. Callers hold self._lock.
+        if self._pid != os.getpid():
+            self._open_connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._open_connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._open_connection
+
+    def record_run(self, run: Dict[str, Any]) -> None:
+        """
+        Append a run as reported by YAMLExecutor through hooks.emit_run. Re-recording
+        a run id, e.g. after it was resumed, replaces the earlier record.
+        """
+        steps = run.get("results", [])
+        failed = [step for step in steps if step.get("status") in FAILED_STEP_STATUSES]
+        error = next((step.get("error") for step in failed if step.get("error")), None)
+        with self._lock:
+            connection = self._connection
+            # Commits, or rolls back if a statement fails so the connection isn't left inside a transaction
+            with connection:
+                connection.execute("BEGIN")
+                connection.execute("DELETE FROM run_steps WHERE run_id = ?", (run["run_id"],))
+                connection.execute(
+                    "INSERT OR REPLACE INTO runs (run_id, filename, inputs_hash, mode, write_mode, status, "
+                    "started_at, wall, step_count, failed_steps, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (run["run_id"], run.get("filename"), inputs_hash(run.get("inputs") or {}), run.get("mode"),
+                     run.get("write_mode"), FAILED if failed else COMPLETED, run["started_at"], run.get("wall", 0.0),
+                     len(steps), len(failed), str(error) if error is not None else None)
+                )
+                connection.executemany(
+                    "INSERT INTO run_steps (run_id, step_number, step_name, action, status, wall, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run["run_id"], step.get("step_number"), step.get("step_name"), step.get("action"),
+                      step.get("status"), step.get("wall"), str(step["error"]) if step.get("error") else None)
+                     for step in steps]
+                )
+            self._appends += 1
+            due = self.retention_seconds is not None and self._appends % self.compact_every == 0
+        if due:
+            self.compact(time.time() - self.retention_seconds)
+
+    def list_runs(self, filename: Optional[str] = None, status: Optional[str] = None, since: Optional[float] = None,
+                  until: Optional[float] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Runs newest first, optionally filtered. Pass the returned next_cursor to get the
+        following page; it is None on the last page.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        conditions, params = [], []
+        for column, value in (("filename", filename), ("status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            conditions.append("started_at >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("started_at < ?")
+            params.append(until)
+        if cursor:
+            started_at, run_id = decode_cursor(cursor)
+            conditions.append("(started_at < ? OR (started_at = ? AND run_id < ?))")
+            params += [started_at, started_at, run_id]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT run_id, filename, inputs_hash, mode, write_mode, status, started_at, wall, step_count, "
+                f"failed_steps, error FROM runs {where} ORDER BY started_at DESC, run_id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+        runs = [self._run(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(runs[-1]["started_at"], runs[-1]["run_id"]) if len(rows) > limit else None
+        return {"runs": runs, "next_cursor": next_cursor}
+
+    def get_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT run_id, filename, inputs_hash, mode, write_mode, status, started_at, wall, step_count, "
+                "failed_steps, error FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            steps = self._connection.execute(
+                "SELECT step_number, step_name, action, status, wall, error FROM run_steps WHERE run_id = ? "
+                "ORDER BY step_number", (run_id,)
+            ).fetchall()
+        run = self._run(row)
+        run["steps"] = [dict(zip(("step_number", "step_name", "action", "status", "wall", "error"), step))
+                        for step in steps]
+        return run
+
+    def workflow_stats(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Per workflow: runs, failed runs, and mean and max wall time.
+        """
+        where, params = ("WHERE started_at >= ?", [since]) if since is not None else ("", [])
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT filename, COUNT(*), SUM(status = ?), AVG(wall), MAX(wall), MAX(started_at) FROM runs "
+                f"{where} GROUP BY filename ORDER BY filename", [FAILED] + params
+            ).fetchall()
+        return [{"filename": filename, "runs": runs, "failed": failed, "mean_wall": mean_wall, "max_wall": max_wall,
+                 "last_started_at": last_started_at}
+                for filename, runs, failed, mean_wall, max_wall, last_started_at in rows]
+
+    def compact(self, older_than: float) -> int:
+        """
+        Delete runs started before older_than (a Unix time) and release the space.
+        Returns the number of runs deleted.
+        """
+        with self._lock:
+            connection = self._connection
+            with connection:
+                connection.execute("BEGIN")
+                connection.execute("DELETE FROM run_steps WHERE run_id IN "
+                                   "(SELECT run_id FROM runs WHERE started_at < ?)", (older_than,))
+                deleted = connection.execute("DELETE FROM runs WHERE started_at < ?", (older_than,)).rowcount
+            if deleted:
+                connection.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    @staticmethod
+    def _run(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        return dict(zip(("run_id", "filename", "inputs_hash", "mode", "write_mode", "status", "started_at", "wall",
+                         "step_count", "failed_steps", "error"), row))
+
+
+class RunHistoryRecorder(InstrumentationHook):
+    """
+    Records every finished run reported through the instrumentation hooks.
+    """
+    def __init__(self, store: RunHistoryStore):
+        self.store = store
+
+    def on_run(self, run: Dict[str, Any]) -> None:
+        if run.get("run_id"):
+            self.store.record_run(run)
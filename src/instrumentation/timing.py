@@ -0,0 +1,113 @@
+# src/instrumentation/timing.py
+
+import contextlib
+import contextvars
+import time
+from typing import Any, Dict, List, Optional
+
+from src.instrumentation.hooks import hooks
+
+# Timings of the step running in the current thread or asyncio task
+_current_step: contextvars.ContextVar = contextvars.ContextVar("current_step_timings", default=None)
+
+
+class PhaseTimings:
+    """
+    Accumulated wall-clock and CPU seconds per named phase.
+
+    CPU time is the calling thread's; on the asyncio path it also includes other
+    tasks that ran on the loop during the phase.
+    """
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def add(self, phase: str, wall: float, cpu: float) -> None:
+        totals = self.phases.setdefault(phase, {"wall": 0.0, "cpu": 0.0})
+        totals["wall"] += wall
+        totals["cpu"] += cpu
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start)
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(totals) for name, totals in self.phases.items()}
+
+
+class StepTimings(PhaseTimings):
+    """
+    Phase timings of one step plus the Port API calls it made.
+    """
+    def __init__(self):
+        super().__init__()
+        self.http: List[Dict[str, Any]] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"phases": super().as_dict(), "http": list(self.http)}
+
+
+def current_step_timings() -> Optional[StepTimings]:
+    return _current_step.get()
+
+
+@contextlib.contextmanager
+def step_scope(timings: StepTimings):
+    """
+    Attribute phases and HTTP calls made inside the block to timings.
+    """
+    token = _current_step.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_step.reset(token)
+
+
+@contextlib.contextmanager
+def timed_phase(name: str):
+    """
+    Time a phase of the current step; a no-op outside of a step.
+    """
+    timings = _current_step.get()
+    if timings is None:
+        yield
+        return
+    with timings.phase(name):
+        yield
+
+
+@contextlib.contextmanager
+def timed_global_phase(name: str, **labels: Any):
+    """
+    Time a phase that isn't part of a step and report it to the hooks.
+    """
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        hooks.emit_phase(name, time.perf_counter() - wall_start, time.thread_time() - cpu_start, labels)
+
+
+def endpoint_label(path: str) -> str:
+    """
+    Collapse identifiers in an API path so it can be used as a metric label,
+    e.g. /blueprints/service/scorecards -> /blueprints/:id/scorecards.
+    """
+    path = path.split("?", 1)[0]
+    if path.startswith("/auth/"):
+        return path
+    parts = [part for part in path.split("/") if part]
+    return "/" + "/".join(part if index % 2 == 0 else ":id" for index, part in enumerate(parts))
+
+
+def record_http(record: Dict[str, Any]) -> None:
+    """
+    Report a finished Port API call to the current step and to the hooks.
+    """
+    timings = _current_step.get()
+    if timings is not None:
+        timings.http.append(record)
+    hooks.emit_http(record)
@@ -1,64 +1,450 @@
 # src/web_app/app.py
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 
 from src.yaml_handler.yaml_executor import YAMLExecutor
+from src.yaml_handler.batch_executor import BatchExecutor
+from src.yaml_handler.blueprint_diff import WRITE_MODES
+from src.yaml_handler.checkpoints import FAILED, RUNNING, CheckpointMismatchError, SQLiteCheckpointStore
 from src.yaml_handler.yaml_loader import load_yaml_files
+from src.yaml_handler.workflow_registry import get_registry
 from src.api_clients.port_api import PortAPI
+from src.api_clients.rate_limit import RateLimiter
+from src.web_app.jobs import JobManager, SQLiteJobStore
+from src.web_app.warmup import WarmupState, retry_warm_up_worker, start_warm_up_worker, warm_up_shared
+from src.instrumentation.hooks import hooks
+from src.instrumentation.prometheus import MetricsRegistry
+from src.instrumentation.run_history import MAX_PAGE_SIZE, RunHistoryRecorder, SQLiteRunHistoryStore
+import json
 import os
-from ruamel.yaml import YAML
+import threading
+import time
 
 app = Flask(__name__, static_folder="../../static", template_folder="../../templates")
 
-# Initialize the PortAPI instance
-port_api = PortAPI()
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../../configuration_files")
+# Workflows are parsed once and re-parsed only when their file changes
+workflow_registry = get_registry(YAML_FOLDER)
+
+# Client-side throttle shared by both Port clients: requests per second for reads and
+# writes (0 = unlimited), a cap on requests in flight, and optionally a directory that
+# shares these budgets between processes, e.g. gunicorn workers
+port_rate_limiter = RateLimiter(
+    read_rate=float(os.getenv("PORT_READ_RATE_LIMIT", "0")),
+    write_rate=float(os.getenv("PORT_WRITE_RATE_LIMIT", "0")),
+    max_in_flight=int(os.getenv("PORT_MAX_IN_FLIGHT", "0")),
+    state_dir=os.getenv("PORT_RATE_LIMIT_STATE_DIR") or None
+)
+
+# Initialize the PortAPI instance. PORT_CASSETTE records its traffic to that file
+# (PORT_CASSETTE_MODE=record) or replays it from there without network access
+# (the default), with recorded latencies scaled by PORT_REPLAY_LATENCY_SCALE.
+PORT_CASSETTE = os.getenv("PORT_CASSETTE") or None
+PORT_CASSETTE_MODE = os.getenv("PORT_CASSETTE_MODE", "replay")
+port_api = PortAPI(
+    rate_limiter=port_rate_limiter,
+    cassette=PORT_CASSETTE,
+    cassette_mode=PORT_CASSETTE_MODE,
+    replay_latency_scale=float(os.getenv("PORT_REPLAY_LATENCY_SCALE", "1"))
+)
+# Async client for /execute_steps_async, see get_async_port_api()
+_async_port_api = None
+_async_port_api_lock = threading.Lock()
+
+
+def get_async_port_api():
+    """
+    The async Port client, created on first use so processes that only serve the sync
+    endpoints never import aiohttp. Token state is shared across requests.
+    """
+    global _async_port_api
+    if _async_port_api is None:
+        with _async_port_api_lock:
+            if _async_port_api is None:
+                from src.api_clients.async_port_api import AsyncPortAPI
+                _async_port_api = AsyncPortAPI(rate_limiter=port_rate_limiter)
+    return _async_port_api
+
+
+def async_port_api_to_warm_up():
+    """
+    The async client for the worker warm-up, or None while replaying a cassette: the
+    async client can't replay, and without network access its token request would
+    keep the process unready.
+    """
+    if PORT_CASSETTE and PORT_CASSETTE_MODE == "replay":
+        return None
+    return get_async_port_api()
+
+
+def async_cache_stat(name):
+    return _async_port_api.cache.stats()[name] if _async_port_api is not None else 0
+
+
+# Step, phase and Port API timings aggregated for /metrics
+metrics_registry = hooks.register(MetricsRegistry())
+metrics_registry.gauge("port_api_cache_hits", "Port API read cache hits",
+                       lambda: {"sync": port_api.cache.stats()["hits"], "async": async_cache_stat("hits")},
+                       label_name="client")
+metrics_registry.gauge("port_api_cache_misses", "Port API read cache misses",
+                       lambda: {"sync": port_api.cache.stats()["misses"], "async": async_cache_stat("misses")},
+                       label_name="client")
+metrics_registry.gauge("port_api_rate_limiter", "Requests delayed by the client-side rate limiter, seconds spent "
+                       "waiting and requests in flight", port_rate_limiter.stats, label_name="stat")
+
+# Number of independent workflow steps allowed to run at the same time
+MAX_STEP_WORKERS = int(os.getenv("MAX_STEP_WORKERS", "4"))
+
+# Input sets of one /execute_batch call that run at the same time
+MAX_BATCH_CONCURRENCY = int(os.getenv("MAX_BATCH_CONCURRENCY", "8"))
+
+# Port calls per second allowed for each tenant of a batch; 0 disables the limit
+BATCH_TENANT_RATE_LIMIT = float(os.getenv("BATCH_TENANT_RATE_LIMIT", "0"))
+
+# Per-step results of every run, so failed or interrupted runs can be resumed. Runs not updated
+# for CHECKPOINT_RETENTION_DAYS are deleted as other runs finish (0 keeps everything).
+CHECKPOINT_RETENTION_DAYS = float(os.getenv("CHECKPOINT_RETENTION_DAYS", "30"))
+checkpoint_store = SQLiteCheckpointStore(
+    os.getenv("CHECKPOINT_DB", os.path.join(os.path.dirname(__file__), "../../checkpoints.db")),
+    retention_seconds=CHECKPOINT_RETENTION_DAYS * 86400 if CHECKPOINT_RETENTION_DAYS > 0 else None
+)
+# A run still marked running that hasn't checkpointed a step for this long was interrupted
+# (its process went away) and may be resumed
+INTERRUPTED_RUN_SECONDS = float(os.getenv("INTERRUPTED_RUN_SECONDS", "3600"))
+
+# Summary of every finished run and its steps, for /runs. Runs older than
+# RUN_HISTORY_RETENTION_DAYS are deleted as new ones are recorded (0 keeps everything).
+RUN_HISTORY_RETENTION_DAYS = float(os.getenv("RUN_HISTORY_RETENTION_DAYS", "30"))
+run_history = SQLiteRunHistoryStore(
+    os.getenv("RUN_HISTORY_DB", os.path.join(os.path.dirname(__file__), "../../run_history.db")),
+    retention_seconds=RUN_HISTORY_RETENTION_DAYS * 86400 if RUN_HISTORY_RETENTION_DAYS > 0 else None
+)
+hooks.register(RunHistoryRecorder(run_history))
+
+# Startup warm-up progress of this process, see warm_up() and /ready
+warmup_state = WarmupState()
+
+
+def warm_up(shared=True, worker=True):
+    """
+    Prepare this process before it takes traffic. The shared stage compiles every
+    workflow and may run in a pre-fork master; the worker stage authenticates the
+    Port clients and must run in each worker process (see gunicorn.conf.py). It runs
+    on a background thread, so a slow Port can't hold up the worker's startup.
+    """
+    if shared:
+        warm_up_shared(workflow_registry, warmup_state)
+        get_async_port_api()  # Import aiohttp here too, so forked workers share it
+    if worker:
+        start_warm_up_worker(port_api, warmup_state, async_port_api_to_warm_up())
+
+
+# Number of workflows the background job pool runs at the same time
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
+
+
+def run_job(job, on_step_complete):
+    """
+    Run a queued job's workflow, reporting each filtered step result as it finishes.
+    """
+    yaml_executor = YAMLExecutor(YAML_FOLDER, port_api, job.inputs, max_workers=MAX_STEP_WORKERS,
+                                 batch_writes=job.options.get("batch_writes", False),
+                                 write_mode=job.options.get("mode", "apply"),
+                                 on_step_complete=lambda result: on_step_complete(filter_result(result)),
+                                 checkpoint_store=checkpoint_store, run_id=job.job_id, release_results=True)
+    yaml_executor.use_workflow(workflow_registry.get(job.filename))
+    return filter_results(yaml_executor.execute_steps())
+
+
+# Jobs live in SQLite so any worker process can report a job another one accepted
+job_manager = JobManager(
+    SQLiteJobStore(os.getenv("JOBS_DB", os.path.join(os.path.dirname(__file__), "../../jobs.db"))),
+    run_job, max_workers=MAX_CONCURRENT_JOBS
+)
 
 # Load YAML files and check for required inputs when rendering the main page
 @app.route('/')
 def index():
-    yaml_folder = os.path.join(os.path.dirname(__file__), "../../configuration_files")
-    yaml_data = load_yaml_files(yaml_folder)  # Load YAML data with title, description, and inputs
+    yaml_data = load_yaml_files(YAML_FOLDER)  # Load YAML data with title, description, and inputs
     return render_template('index.html', yaml_data=yaml_data)
 
 
 # Endpoint to execute steps based on YAML and inputs
 @app.route('/execute_steps', methods=['POST'])
 def execute_steps():
+    data = request.get_json()
+    # "apply" (default), "diff" to skip writes Port already reflects, or "dry_run" to only report them
+    mode = data.get("mode", "apply")
+    if mode not in WRITE_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(WRITE_MODES)}"}), 400
+    filename, inputs, run_id, error = run_target(data)
+    if error:
+        return error
+
+    # Get the compiled workflow
+    try:
+        workflow = workflow_registry.get(filename)
+    except FileNotFoundError:
+        return jsonify({"error": "YAML file not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    # Pass the inputs and take a fresh copy of the execution plan
+    yaml_executor = YAMLExecutor(YAML_FOLDER, port_api, inputs, max_workers=MAX_STEP_WORKERS,
+                                 batch_writes=bool(data.get("batch_writes", False)), write_mode=mode,
+                                 checkpoint_store=checkpoint_store, run_id=run_id, release_results=True)
+    yaml_executor.use_workflow(workflow)
+
+    # Execute the steps and filter the response
+    try:
+        results = yaml_executor.execute_steps()
+    except CheckpointMismatchError as e:
+        return jsonify({"error": str(e)}), 409
+
+    # Return the filtered execution results with per-step timings
+    return jsonify({"run_id": yaml_executor.run_id, "execution_results": filter_results(results),
+                    "timings": yaml_executor.timing_report()})
+
+
+# Async variant of /execute_steps: steps await Port calls on the event loop instead of holding a thread each.
+# Flask runs the view on its own event loop inside a WSGI worker thread, which stays busy for the whole run,
+# so this saves threads within a run but doesn't raise how many runs a worker serves at once.
+@app.route('/execute_steps_async', methods=['POST'])
+async def execute_steps_async():
+    data = request.get_json()
+    mode = data.get("mode", "apply")
+    if mode not in WRITE_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(WRITE_MODES)}"}), 400
+    filename, inputs, run_id, error = run_target(data)
+    if error:
+        return error
+
+    try:
+        workflow = workflow_registry.get(filename)
+    except FileNotFoundError:
+        return jsonify({"error": "YAML file not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    yaml_executor = YAMLExecutor(YAML_FOLDER, port_api, inputs, max_workers=MAX_STEP_WORKERS,
+                                 async_port_api=get_async_port_api(),
+                                 batch_writes=bool(data.get("batch_writes", False)),
+                                 write_mode=mode, checkpoint_store=checkpoint_store, run_id=run_id,
+                                 release_results=True)
+    yaml_executor.use_workflow(workflow)
+    try:
+        results = await yaml_executor.execute_steps_async()
+    except CheckpointMismatchError as e:
+        return jsonify({"error": str(e)}), 409
+    return jsonify({"run_id": yaml_executor.run_id, "execution_results": filter_results(results),
+                    "timings": yaml_executor.timing_report()})
+
+
+# Run one workflow for many input sets, streaming one JSON line per input set as it finishes
+@app.route('/execute_batch', methods=['POST'])
+def execute_batch():
     data = request.get_json()
     filename = data.get("filename")
-    inputs = data.get("inputs", {})
+    mode = data.get("mode", "apply")
+    if mode not in WRITE_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(WRITE_MODES)}"}), 400
+    inputs_list = data.get("inputs", [])
+    if not isinstance(inputs_list, list) or not all(isinstance(inputs, dict) for inputs in inputs_list):
+        return jsonify({"error": "inputs must be a list of objects"}), 400
+    try:
+        max_concurrency = int(data.get("max_concurrency", MAX_BATCH_CONCURRENCY))
+        rate_limit = float(data.get("rate_limit", BATCH_TENANT_RATE_LIMIT))
+        if max_concurrency <= 0 or not 0 <= rate_limit < float("inf"):
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({"error": "max_concurrency must be a positive integer "
+                                 "and rate_limit a non-negative number"}), 400
+
+    try:
+        workflow = workflow_registry.get(filename)
+    except FileNotFoundError:
+        return jsonify({"error": "YAML file not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    batch_executor = BatchExecutor(
+        YAML_FOLDER, port_api, workflow,
+        max_concurrency=min(max_concurrency, MAX_BATCH_CONCURRENCY),
+        tenant_rate_limit=rate_limit,
+        tenant_key=data.get("tenant_key"),
+        max_step_workers=MAX_STEP_WORKERS,
+        batch_writes=bool(data.get("batch_writes", False)),
+        write_mode=mode
+    )
 
-    # Load the YAML file content
-    yaml_folder = os.path.join(os.path.dirname(__file__), "../../configuration_files")
-    yaml_executor = YAMLExecutor(yaml_folder, port_api)
+    def generate():
+        counts = {}
+        for report in batch_executor.run(inputs_list):
+            counts[report["status"]] = counts.get(report["status"], 0) + 1
+            if "execution_results" in report:
+                report["execution_results"] = filter_results(report["execution_results"])
+            yield json.dumps(dict(report, type="result")) + "\n"
+        yield json.dumps({"type": "summary", "total": len(inputs_list), "statuses": counts,
+                          "reads": batch_executor.reads.stats()}) + "\n"
 
-    # Load the YAML content
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# Queue a workflow as a background job and return its id right away
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    data = request.get_json()
+    filename = data.get("filename")
+    mode = data.get("mode", "apply")
+    if mode not in WRITE_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(WRITE_MODES)}"}), 400
+
+    # Reject unknown workflows before queueing
     try:
-        yaml_content = yaml_executor.load_yaml(filename)
+        workflow_registry.get(filename)
     except FileNotFoundError:
         return jsonify({"error": "YAML file not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    # Pass the inputs and build the execution plan
-    yaml_executor.inputs = inputs
-    execution_plan = yaml_executor.build_execution_plan(yaml_content)
+    job = job_manager.submit(filename, data.get("inputs", {}),
+                             {"batch_writes": bool(data.get("batch_writes", False)), "mode": mode})
+    return jsonify({"job_id": job.job_id, "status": job.status}), 202
 
-    # Execute the steps and filter the response
-    results = yaml_executor.execute_steps()
-    filtered_results = [
-        {
-            "step_number": result.get("step_number"),
-            "step_name": result.get("step_name"),
-            "action": result.get("action"),
-            "status": result.get("status")
-        }
-        for result in results
-    ]
 
-    # Return the filtered execution results
-    return jsonify({"execution_results": filtered_results})
+# Current state of a job, including the final report once it has finished
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_manager.store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.report())
+
+
+# Server-sent events with per-step results and status changes until the job finishes
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    if job_manager.store.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    def generate():
+        index = 0
+        while True:
+            events, finished = job_manager.store.wait_for_events(job_id, index, timeout=15)
+            for event in events:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+            index += len(events)
+            if finished and not events:
+                return
+            if not events:
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+# Hit/miss/eviction counters of the PortAPI read caches, and how many reads shared an in-flight request.
+# The async client is included once it has been created.
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    stats = {"port_api": port_api.cache.stats(), "single_flight": {"port_api": port_api.flights.stats()}}
+    # Only once the async client exists, so a scrape doesn't load aiohttp in sync-only workers
+    async_port_api = _async_port_api
+    if async_port_api is not None:
+        stats["async_port_api"] = async_port_api.cache.stats()
+        stats["single_flight"]["async_port_api"] = async_port_api.flights.stats()
+    return jsonify(stats)
+
+
+# Recorded runs, newest first, filtered by workflow, status and start time (Unix seconds).
+# Pages hold up to `limit` runs; pass the returned next_cursor as `cursor` for the next one.
+@app.route('/runs', methods=['GET'])
+def list_runs():
+    try:
+        since = request.args.get("since", type=float)
+        until = request.args.get("until", type=float)
+        limit = min(int(request.args.get("limit", 50)), MAX_PAGE_SIZE)
+        page = run_history.list_runs(filename=request.args.get("workflow"), status=request.args.get("status"),
+                                     since=since, until=until, limit=limit, cursor=request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "limit, since, until and cursor must be valid"}), 400
+    return jsonify(page)
+
+
+# Run counts, failures and wall time per workflow, optionally since a Unix time
+@app.route('/runs/stats', methods=['GET'])
+def run_stats():
+    return jsonify({"workflows": run_history.workflow_stats(since=request.args.get("since", type=float))})
+
+
+# One recorded run with the status, duration and error of each step
+@app.route('/runs/<run_id>', methods=['GET'])
+def get_run(run_id):
+    run = run_history.get_run(run_id)
+    if run is None:
+        return jsonify({"error": "Run not found"}), 404
+    return jsonify(run)
+
+
+# Readiness for load balancers: 200 once this process has finished warming up, 503 until then.
+# A failed worker warm-up is retried here, with backoff, until it succeeds.
+@app.route('/ready', methods=['GET'])
+def ready():
+    retry_warm_up_worker(port_api, warmup_state, async_port_api_to_warm_up())
+    report = warmup_state.as_dict()
+    return jsonify(report), 200 if report["ready"] else 503
+
+
+# Executor and Port API metrics in the Prometheus text format
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def run_target(data):
+    """
+    Workflow file, inputs and run id for an execute request. With "resume_run_id" they
+    come from that checkpointed run, and its completed steps are not executed again.
+    Returns (filename, inputs, run_id, error response or None).
+    """
+    run_id = data.get("resume_run_id")
+    if not run_id:
+        return data.get("filename"), data.get("inputs", {}), None, None
+
+    saved = checkpoint_store.load_run(run_id)
+    if saved is None:
+        return None, None, None, (jsonify({"error": "Run not found"}), 404)
+    interrupted = saved.status == RUNNING and time.time() - saved.updated_at >= INTERRUPTED_RUN_SECONDS
+    if saved.status == RUNNING and not interrupted:
+        return None, None, None, (jsonify({"error": "Run is still running"}), 409)
+    if saved.status not in (FAILED, RUNNING):
+        return None, None, None, (jsonify({"error": f"Run already {saved.status}"}), 409)
+    return saved.filename, saved.inputs, run_id, None
+
+
+def filter_result(result):
+    """
+    Keep only the fields of a step result that are returned to the client.
+    """
+    filtered = {
+        "step_number": result.get("step_number"),
+        "step_name": result.get("step_name"),
+        "action": result.get("action"),
+        "status": result.get("status")
+    }
+    # Steps skipped because a resumed run had already completed them
+    if result.get("resumed"):
+        filtered["resumed"] = True
+    # Diff and dry-run modes report what was (or would be) changed
+    if "changes" in result:
+        filtered["changes"] = result["changes"]
+        filtered["unchanged"] = result["unchanged"]
+    return filtered
+
 
+def filter_results(results):
+    return [filter_result(result) for result in results]
 
 if __name__ == "__main__":
+    warm_up()
     app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
@@ -0,0 +1,303 @@
+# src/web_app/jobs.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Job states; "completed" and "failed" are final
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINAL_STATES = (COMPLETED, FAILED)
+
+
+@dataclass
+class Job:
+    job_id: str
+    filename: str
+    inputs: Dict[str, Any]
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    results: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    events: List[Dict[str, Any]] = field(default_factory=list)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "execution_results": self.results,
+            "error": self.error
+        }
+
+
+class JobStore(ABC):
+    """
+    Storage interface for workflow jobs. Implementations must be thread-safe.
+    """
+    @abstractmethod
+    def create(self, job: Job) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def wait_for_events(self, job_id: str, after: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Events after index `after`, blocking up to timeout seconds for new ones.
+        Also returns whether the job has reached a final state.
+        """
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Keeps jobs in process memory. Finished jobs beyond max_finished_jobs are dropped, oldest first.
+    """
+    def __init__(self, max_finished_jobs: int = 1000):
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: Dict[str, Job] = {}
+        self._condition = threading.Condition()
+
+    def create(self, job: Job) -> None:
+        with self._condition:
+            self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._condition:
+            job = self._jobs[job_id]
+            for name, value in fields.items():
+                setattr(job, name, value)
+            if job.status in FINAL_STATES:
+                self._prune()
+            self._condition.notify_all()
+
+    def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        with self._condition:
+            self._jobs[job_id].events.append(event)
+            self._condition.notify_all()
+
+    def wait_for_events(self, job_id: str, after: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return [], True
+                finished = job.status in FINAL_STATES
+                if len(job.events) > after or finished:
+                    return job.events[after:], finished
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._condition.wait(remaining)
+
+    def _prune(self) -> None:
+        finished = sorted((job for job in self._jobs.values() if job.status in FINAL_STATES),
+                          key=lambda job: job.finished_at or 0)
+        for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job.job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    Keeps jobs in a local SQLite database, so every worker process of the app sees
+    the jobs any of them accepted. Finished jobs beyond max_finished_jobs are dropped,
+    oldest first. Waiting for events polls the database every poll_interval seconds,
+    since writes from other processes can't wake this one.
+    """
+    poll_interval = 0.1
+    _COLUMNS = ("filename", "inputs", "options", "status", "created_at", "started_at", "finished_at", "results",
+                "error")
+    _JSON_COLUMNS = ("inputs", "options", "results")
+
+    def __init__(self, path: str, max_finished_jobs: int = 1000):
+        self.path = path
+        self.max_finished_jobs = max_finished_jobs
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Wakes waiters in this process as soon as one of its threads writes
+        self._condition = threading.Condition(self._lock)
+        self._pid: Optional[int] = None
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    inputs TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    results TEXT,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    PRIMARY KEY (job_id, position)
+                );
+            """)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), e.g. when created in a pre-fork
+        # server's master, so each process opens its own. Callers hold self._lock.
+        if self._pid != os.getpid():
+            self._open_connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._open_connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._open_connection
+
+    def _encode(self, name: str, value: Any) -> Any:
+        return json.dumps(value, default=str) if name in self._JSON_COLUMNS and value is not None else value
+
+    def create(self, job: Job) -> None:
+        with self._condition:
+            self._connection.execute(
+                f"INSERT INTO jobs (job_id, {', '.join(self._COLUMNS)}) VALUES (?{', ?' * len(self._COLUMNS)})",
+                (job.job_id,) + tuple(self._encode(name, getattr(job, name)) for name in self._COLUMNS)
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._condition:
+            row = self._connection.execute(f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?",
+                                           (job_id,)).fetchone()
+            if row is None:
+                return None
+            events = self._events(job_id, 0)
+        fields = {name: json.loads(value) if name in self._JSON_COLUMNS and value is not None else value
+                  for name, value in zip(self._COLUMNS, row)}
+        return Job(job_id=job_id, events=events, **fields)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        unknown = set(fields) - set(self._COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        with self._condition:
+            connection = self._connection
+            # Commits, or rolls back if a statement fails so the connection isn't left inside a transaction
+            with connection:
+                connection.execute("BEGIN")
+                connection.execute(f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE job_id = ?",
+                                   tuple(self._encode(name, value) for name, value in fields.items()) + (job_id,))
+                if fields.get("status") in FINAL_STATES:
+                    self._prune(connection)
+            self._condition.notify_all()
+
+    def append_event(self, job_id: str, event: Dict[str, Any]) -> None:
+        with self._condition:
+            # One statement, so concurrent writers can't pick the same position
+            self._connection.execute(
+                "INSERT INTO job_events (job_id, position, event) "
+                "SELECT ?, COALESCE(MAX(position) + 1, 0), ? FROM job_events WHERE job_id = ?",
+                (job_id, json.dumps(event, default=str), job_id)
+            )
+            self._condition.notify_all()
+
+    def wait_for_events(self, job_id: str, after: int, timeout: float) -> Tuple[List[Dict[str, Any]], bool]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                row = self._connection.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if row is None:
+                    return [], True
+                finished = row[0] in FINAL_STATES
+                events = self._events(job_id, after)
+                if events or finished:
+                    return events, finished
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._condition.wait(min(remaining, self.poll_interval))
+
+    def _events(self, job_id: str, after: int) -> List[Dict[str, Any]]:
+        # Callers hold self._lock
+        rows = self._connection.execute(
+            "SELECT event FROM job_events WHERE job_id = ? AND position >= ? ORDER BY position", (job_id, after)
+        ).fetchall()
+        return [json.loads(event) for event, in rows]
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        expired = [job_id for job_id, in connection.execute(
+            "SELECT job_id FROM jobs WHERE status IN (?, ?) ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+            FINAL_STATES + (self.max_finished_jobs,)
+        )]
+        for job_id in expired:
+            connection.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            connection.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+
+class JobManager:
+    """
+    Runs workflows on a bounded worker pool, recording progress in a JobStore.
+
+    run_workflow(job, on_step_complete) executes the job's workflow, calls
+    on_step_complete with each step result as it finishes and returns the final results.
+    """
+    def __init__(self, store: JobStore, run_workflow: Callable[[Job, Callable[[Dict[str, Any]], None]], List[Dict[str, Any]]],
+                 max_workers: int = 4):
+        self.store = store
+        self.run_workflow = run_workflow
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="workflow-job")
+
+    def submit(self, filename: str, inputs: Dict[str, Any], options: Optional[Dict[str, Any]] = None) -> Job:
+        job = Job(job_id=uuid.uuid4().hex, filename=filename, inputs=inputs, options=options or {})
+        self.store.create(job)
+        self.store.append_event(job.job_id, {"type": "status", "status": QUEUED})
+        self.pool.submit(self._run, job)
+        return job
+
+    def _run(self, job: Job) -> None:
+        self.store.update(job.job_id, status=RUNNING, started_at=time.time())
+        self.store.append_event(job.job_id, {"type": "status", "status": RUNNING})
+
+        def on_step_complete(result: Dict[str, Any]) -> None:
+            self.store.append_event(job.job_id, {"type": "step", "result": result})
+
+        try:
+            results = self.run_workflow(job, on_step_complete)
+        except Exception as e:
+            self.store.append_event(job.job_id, {"type": "status", "status": FAILED, "error": str(e)})
+            self.store.update(job.job_id, status=FAILED, error=str(e), finished_at=time.time())
+            return
+
+        self.store.append_event(job.job_id, {"type": "status", "status": COMPLETED})
+        self.store.update(job.job_id, status=COMPLETED, results=results, finished_at=time.time())
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,134 @@
+# src/web_app/warmup.py
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from src.yaml_handler.workflow_registry import WorkflowRegistry
+
+
+class WarmupState:
+    """
+    Progress of the startup warm-up of one process, reported by /ready.
+
+    The shared stage compiles every workflow and can run before workers are forked;
+    the worker stage authenticates the Port clients and must run in each worker,
+    since connections can't be shared across a fork.
+
+    A failed stage may be run again once retry_due() says so, after a backoff that
+    doubles with every failure from retry_backoff up to retry_backoff_max seconds.
+    Each run replaces the stage's earlier errors.
+    """
+    def __init__(self, retry_backoff: float = 1.0, retry_backoff_max: float = 60.0):
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._lock = threading.Lock()
+        self.stages: Dict[str, float] = {}  # Completed stage -> seconds it took
+        self.workflows = 0
+        self._errors: Dict[str, List[str]] = {}
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    @property
+    def errors(self) -> List[str]:
+        with self._lock:
+            return [error for errors in self._errors.values() for error in errors]
+
+    @property
+    def ready(self) -> bool:
+        return self.as_dict()["ready"]
+
+    def finish(self, stage: str, seconds: float, errors: List[str]) -> None:
+        with self._lock:
+            self.stages[stage] = seconds
+            self._errors[stage] = list(errors)
+            if errors:
+                self._failures[stage] = self._failures.get(stage, 0) + 1
+                backoff = min(self.retry_backoff_max, self.retry_backoff * 2 ** (self._failures[stage] - 1))
+                self._retry_at[stage] = time.monotonic() + backoff
+            else:
+                self._failures.pop(stage, None)
+                self._retry_at.pop(stage, None)
+
+    def retry_due(self, stage: str) -> bool:
+        """
+        True if the stage failed and its backoff has passed. Only one caller gets True
+        until the retry has finished.
+        """
+        with self._lock:
+            retry_at = self._retry_at.get(stage)
+            if retry_at is None or time.monotonic() < retry_at:
+                return False
+            del self._retry_at[stage]
+            return True
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            errors = [error for errors in self._errors.values() for error in errors]
+            return {"ready": "worker" in self.stages and not errors, "stages": dict(self.stages),
+                    "workflows": self.workflows, "errors": errors}
+
+
+def warm_up_shared(registry: WorkflowRegistry, state: WarmupState) -> None:
+    """
+    Parse and compile every workflow file. The compiled plans are read-only, so
+    workers forked afterwards share them copy-on-write. Makes no network calls.
+    """
+    start = time.perf_counter()
+    errors = []
+    try:
+        state.workflows = len(registry.list_workflows())
+    except Exception as e:  # A broken workflow file should fail readiness, not startup
+        errors.append(f"workflows: {e}")
+    state.finish("shared", time.perf_counter() - start, errors)
+
+
+async def _authenticate_async(async_port_api: Any) -> None:
+    async with async_port_api.session():
+        await async_port_api.ensure_token()
+
+
+def warm_up_worker(port_api: Any, state: WarmupState, async_port_api: Optional[Any] = None) -> None:
+    """
+    Fetch Port tokens before the process takes traffic. The sync client's token
+    request also leaves a keep-alive connection in its pool for the first call.
+    The async client keeps only its token, as its sessions belong to an event loop.
+    """
+    start = time.perf_counter()
+    errors = []
+    try:
+        port_api.ensure_token()
+    except Exception as e:
+        errors.append(f"port_api: {e}")
+    if async_port_api is not None:
+        try:
+            asyncio.run(_authenticate_async(async_port_api))
+        except Exception as e:
+            errors.append(f"async_port_api: {e}")
+    state.finish("worker", time.perf_counter() - start, errors)
+
+
+def start_warm_up_worker(port_api: Any, state: WarmupState, async_port_api: Optional[Any] = None) -> threading.Thread:
+    """
+    Run warm_up_worker on a background thread. With Port slow or down its token
+    requests can outlast gunicorn's worker timeout, so post_fork must not wait for
+    them: the worker starts serving and heartbeating right away, and /ready reports
+    503 until the thread has finished.
+    """
+    thread = threading.Thread(target=warm_up_worker, args=(port_api, state, async_port_api),
+                              name="worker-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def retry_warm_up_worker(port_api: Any, state: WarmupState,
+                         async_port_api: Optional[Any] = None) -> Optional[threading.Thread]:
+    """
+    Start the worker stage again if it failed and its backoff has passed, so a Port
+    failure at startup doesn't keep the process unready for good. Called by /ready.
+    Returns the warm-up thread, or None when no retry was due.
+    """
+    if state.retry_due("worker"):
+        return start_warm_up_worker(port_api, state, async_port_api)
+    return None
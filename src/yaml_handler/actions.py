@@ -0,0 +1,123 @@
+# src/yaml_handler/actions.py
+
+import importlib.util
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Installed packages register actions under this entry point group, e.g. in pyproject.toml:
+#   [project.entry-points."experience_infra.actions"]
+#   my_action = "my_package.actions:MY_ACTION"
+ENTRY_POINT_GROUP = "experience_infra.actions"
+
+
+@dataclass(frozen=True)
+class ActionPlugin:
+    """
+    A workflow action implemented outside YAMLExecutor.
+
+    handler(executor, step) returns the step result. An async_handler coroutine with
+    the same signature is used by execute_steps_async instead of running handler in a
+    worker thread. A batch_handler(executor, steps) returns one result per step and
+    lets consecutive, independent steps of the action be handled by a single call.
+    """
+    name: str
+    handler: Callable[[Any, Any], Dict[str, Any]]
+    async_handler: Optional[Callable[[Any, Any], Awaitable[Dict[str, Any]]]] = None
+    batch_handler: Optional[Callable[[Any, List[Any]], List[Dict[str, Any]]]] = None
+    description: str = ""
+
+    @property
+    def batchable(self) -> bool:
+        return self.batch_handler is not None
+
+    @property
+    def async_capable(self) -> bool:
+        return self.async_handler is not None
+
+
+class ActionRegistry:
+    """
+    Actions available to workflows by name. A plugin registered under the name of a
+    built-in action replaces it.
+    """
+    def __init__(self, plugins: Iterable[ActionPlugin] = ()):
+        self._plugins: Dict[str, ActionPlugin] = {}
+        for plugin in plugins:
+            self.register(plugin)
+
+    def register(self, plugin: ActionPlugin) -> ActionPlugin:
+        if not isinstance(plugin, ActionPlugin):
+            raise TypeError(f"Expected an ActionPlugin, got {type(plugin).__name__}")
+        self._plugins[plugin.name] = plugin
+        return plugin
+
+    def get(self, name: str) -> Optional[ActionPlugin]:
+        return self._plugins.get(name)
+
+    def __iter__(self):
+        return iter(list(self._plugins.values()))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._plugins
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """
+        Register the actions installed packages expose under the entry point group. An
+        entry point refers to an ActionPlugin or to a list of them.
+        """
+        for entry_point in entry_points(group=group):
+            try:
+                self._register_exported(entry_point.load())
+            except Exception:  # One broken package must not take every workflow down
+                logger.exception("Could not load action plugin %s", entry_point.name)
+
+    def load_directory(self, directory: str) -> None:
+        """
+        Register the actions of every .py file in directory; each file lists its
+        ActionPlugins in a module-level ACTIONS.
+        """
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith(".py") or filename.startswith("_"):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                spec = importlib.util.spec_from_file_location(f"workflow_actions.{filename[:-3]}", path)
+                module = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(module)
+                self._register_exported(getattr(module, "ACTIONS", []))
+            except Exception:
+                logger.exception("Could not load action plugins from %s", path)
+
+    def _register_exported(self, exported: Any) -> None:
+        for plugin in exported if isinstance(exported, (list, tuple)) else [exported]:
+            self.register(plugin)
+
+
+_default_registry: Optional[ActionRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_action_registry() -> ActionRegistry:
+    """
+    The process-wide registry: the bundled plugins, then installed entry points, then
+    the files in ACTION_PLUGIN_DIR if set. Loaded once, on first use.
+    """
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                from src.yaml_handler.bulk_entities import BULK_UPSERT_ENTITIES
+
+                registry = ActionRegistry([BULK_UPSERT_ENTITIES])
+                registry.load_entry_points()
+                plugin_dir = os.getenv("ACTION_PLUGIN_DIR")
+                if plugin_dir:
+                    registry.load_directory(plugin_dir)
+                _default_registry = registry
+    return _default_registry
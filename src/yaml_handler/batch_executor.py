@@ -0,0 +1,170 @@
+# src/yaml_handler/batch_executor.py
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.api_clients.rate_limit import TokenBucket
+from src.api_clients.streaming import normalize_fields
+from src.yaml_handler.workflow_registry import CompiledWorkflow
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+
+class SharedReads:
+    """
+    Deduplicates identical Port reads across every run in a batch.
+
+    The first run to request a resource fetches it; concurrent and later runs get
+    the same response, so every run in the batch sees the resource as it was when
+    first read, even after another run has written to it. Responses are shared and
+    must be treated as read-only.
+    """
+    def __init__(self):
+        self._reads: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.shared = 0
+
+    def get(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._reads.get(key)
+            owner = future is None
+            if owner:
+                future = self._reads[key] = Future()
+                self.fetches += 1
+            else:
+                self.shared += 1
+
+        if owner:
+            try:
+                future.set_result(fetch())
+            except BaseException as e:
+                # Don't remember failures; the next run retries the read
+                with self._lock:
+                    if self._reads.get(key) is future:
+                        del self._reads[key]
+                future.set_exception(e)
+        return future.result()
+
+    def stats(self) -> Dict[str, int]:
+        return {"fetches": self.fetches, "shared": self.shared}
+
+
+class TenantPortAPI:
+    """
+    The PortAPI view of one run in a batch: reads go through the batch's SharedReads
+    and every call that reaches Port first takes a token from the tenant's bucket.
+    """
+    def __init__(self, port_api: Any, reads: SharedReads, bucket: Optional[TokenBucket] = None):
+        self.port_api = port_api
+        self.reads = reads
+        self.bucket = bucket
+
+    def _limited(self, call: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return call(*args, **kwargs)
+
+    def get_blueprint_data(self, blueprint_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self.reads.get(("blueprint", blueprint_id, normalize_fields(fields)),
+                              lambda: self._limited(self.port_api.get_blueprint_data, blueprint_id,
+                                                    **({"fields": fields} if fields else {})))
+
+    def get_integration_data(self, integration_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self.reads.get(("integration", integration_id, normalize_fields(fields)),
+                              lambda: self._limited(self.port_api.get_integration_data, integration_id,
+                                                    **({"fields": fields} if fields else {})))
+
+    def get_scorecards(self, blueprint_identifier: str) -> List[Dict[str, Any]]:
+        # Not shared: runs in the batch create scorecards, so later runs must see them
+        return self._limited(self.port_api.get_scorecards, blueprint_identifier)
+
+    def update_blueprint(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Any:
+        return self._limited(self.port_api.update_blueprint, blueprint_identifier, payload)
+
+    def create_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self._limited(self.port_api.create_scorecard, blueprint_identifier, payload)
+
+    def update_scorecard(self, blueprint_identifier: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self._limited(self.port_api.update_scorecard, blueprint_identifier, payload)
+
+    def bulk_upsert_entities(self, blueprint_identifier: str, entities: List[Dict[str, Any]],
+                             merge: bool = True) -> Dict[str, Any]:
+        return self._limited(self.port_api.bulk_upsert_entities, blueprint_identifier, entities, merge=merge)
+
+
+def tenant_of(inputs: Dict[str, Any], index: int, tenant_key: Optional[str]) -> str:
+    """
+    The tenant an input set belongs to: the value of its tenant_key input, or its
+    position in the batch when no key is configured or the input is missing.
+    """
+    if tenant_key and inputs.get(tenant_key) not in (None, ""):
+        return str(inputs[tenant_key])
+    return str(index)
+
+
+class BatchExecutor:
+    """
+    Runs one compiled workflow once per input set.
+
+    The plan is compiled once and instantiated per run, identical reads are shared
+    between runs, at most max_concurrency runs execute at a time, and each tenant's
+    Port calls are limited to tenant_rate_limit per second (0 disables the limit).
+    """
+    def __init__(self, yaml_folder: str, port_api: Any, workflow: CompiledWorkflow,
+                 max_concurrency: int = 8, tenant_rate_limit: float = 0.0, tenant_key: Optional[str] = None,
+                 max_step_workers: int = 1, batch_writes: bool = False, write_mode: str = "apply"):
+        self.yaml_folder = yaml_folder
+        self.port_api = port_api
+        self.workflow = workflow
+        self.max_concurrency = max(1, max_concurrency)
+        self.tenant_rate_limit = tenant_rate_limit
+        self.tenant_key = tenant_key
+        self.max_step_workers = max_step_workers
+        self.batch_writes = batch_writes
+        self.write_mode = write_mode
+        self.reads = SharedReads()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def bucket_for(self, tenant: str) -> Optional[TokenBucket]:
+        if self.tenant_rate_limit <= 0:
+            return None
+        with self._buckets_lock:
+            bucket = self._buckets.get(tenant)
+            if bucket is None:
+                bucket = self._buckets[tenant] = TokenBucket(self.tenant_rate_limit)
+            return bucket
+
+    def run_one(self, index: int, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        tenant = tenant_of(inputs, index, self.tenant_key)
+        tenant_api = TenantPortAPI(self.port_api, self.reads, self.bucket_for(tenant))
+        yaml_executor = YAMLExecutor(self.yaml_folder, tenant_api, inputs, max_workers=self.max_step_workers,
+                                     batch_writes=self.batch_writes, write_mode=self.write_mode,
+                                     release_results=True)
+        yaml_executor.use_workflow(self.workflow)
+        results = yaml_executor.execute_steps()
+        failed = any(result.get("status") in ("failed", "error") for result in results)
+        return {"index": index, "tenant": tenant, "status": "failed" if failed else "success",
+                "execution_results": results}
+
+    def run(self, inputs_list: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield one report per input set, in completion order. A run that raises is
+        reported with status "error" and does not stop the batch.
+
+        Closing the iterator early (e.g. the client disconnected) cancels runs that
+        have not started yet.
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="workflow-batch")
+        try:
+            futures = {pool.submit(self.run_one, index, inputs): index for index, inputs in enumerate(inputs_list)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {"index": index, "tenant": tenant_of(inputs_list[index], index, self.tenant_key),
+                           "status": "error", "error": str(e)}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,102 @@
+# src/yaml_handler/blueprint_diff.py
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# How add_properties_to_blueprint and add_scorecards_to_blueprint send their writes:
+# "apply" always writes, "diff" writes only what differs from the current blueprint
+# state and "dry_run" reports that difference without writing anything
+WRITE_MODES = ("apply", "diff", "dry_run")
+
+
+def matches(desired: Any, current: Any) -> bool:
+    """
+    Whether current already satisfies desired. Extra keys in current (defaults Port
+    adds, metadata) are ignored, as are desired keys set to None (an optional field the
+    workflow left out), and lists of objects with an identifier are compared by
+    identifier rather than by position.
+    """
+    if isinstance(desired, dict):
+        return isinstance(current, dict) and all(
+            value is None or (key in current and matches(value, current[key])) for key, value in desired.items()
+        )
+    if isinstance(desired, list):
+        if not isinstance(current, list) or len(desired) != len(current):
+            return False
+        if _keyed(desired) and _keyed(current):
+            current_by_id = {item["identifier"]: item for item in current}
+            return all(matches(item, current_by_id.get(item["identifier"])) for item in desired)
+        return all(matches(item, other) for item, other in zip(desired, current))
+    return desired == current
+
+
+def _keyed(items: List[Any]) -> bool:
+    return all(isinstance(item, dict) and "identifier" in item for item in items)
+
+
+def loaded_blueprint(blueprint_data: Any) -> Optional[Dict[str, Any]]:
+    """
+    The blueprint inside a load_resource result (or a raw Port blueprint response), if any.
+    A load_resource result that selected `fields` holds only part of the blueprint, so
+    it doesn't count: diffing against it would report every other setting as changed.
+    """
+    if not isinstance(blueprint_data, dict) or blueprint_data.get("fields"):
+        return None
+    data = blueprint_data.get("data", blueprint_data)
+    blueprint = data.get("blueprint") if isinstance(data, dict) else None
+    return blueprint if isinstance(blueprint, dict) else None
+
+
+def _diff_section(kind: str, desired: Dict[str, Any], current: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[str]]:
+    changed, changes, unchanged = {}, [], []
+    for identifier, definition in desired.items():
+        before = current.get(identifier)
+        if before is not None and matches(definition, before):
+            unchanged.append(identifier)
+            continue
+        changed[identifier] = definition
+        changes.append({"kind": kind, "identifier": identifier, "change": "update" if before is not None else "create",
+                        "before": before, "after": definition})
+    return changed, changes, unchanged
+
+
+def diff_properties_payload(payload: Dict[str, Any], blueprint: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare an add_properties_to_blueprint PATCH payload with the current blueprint.
+
+    Returns the minimal payload (None when nothing would change), the list of
+    changes and the identifiers that are already up to date.
+    """
+    properties, property_changes, unchanged = _diff_section(
+        "property", payload.get("schema", {}).get("properties", {}),
+        (blueprint.get("schema") or {}).get("properties") or {}
+    )
+    aggregations, aggregation_changes, unchanged_aggregations = _diff_section(
+        "aggregationProperty", payload.get("aggregationProperties", {}), blueprint.get("aggregationProperties") or {}
+    )
+    minimal = None
+    if properties or aggregations:
+        minimal = {"identifier": payload["identifier"], "schema": {"properties": properties},
+                   "aggregationProperties": aggregations}
+    return {"payload": minimal, "changes": property_changes + aggregation_changes,
+            "unchanged": unchanged + unchanged_aggregations}
+
+
+def diff_scorecards(payloads: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare scorecard payloads with the blueprint's existing scorecards.
+
+    Returns the writes to send as (index into payloads, "create" or "update") pairs,
+    the list of changes and the identifiers that are already up to date.
+    """
+    current_by_id = {scorecard.get("identifier"): scorecard for scorecard in current or []}
+    writes, changes, unchanged = [], [], []
+    for index, payload in enumerate(payloads):
+        before = current_by_id.get(payload["identifier"])
+        if before is not None and matches(payload, before):
+            unchanged.append(payload["identifier"])
+            continue
+        change = "update" if before is not None else "create"
+        writes.append((index, change))
+        changes.append({"kind": "scorecard", "identifier": payload["identifier"], "change": change,
+                        "before": before, "after": payload})
+    return {"writes": writes, "changes": changes, "unchanged": unchanged}
@@ -0,0 +1,354 @@
+# src/yaml_handler/bulk_entities.py
+"""
+The bulk_upsert_entities action: stream entities from a local CSV or JSONL file and
+upsert them through Port's bulk entity endpoint.
+
+    - name: Import services
+      action: bulk_upsert_entities
+      blueprint_identifier: service        # or blueprint_data: "{{ steps.Load.result }}"
+      file: entities/services.csv          # relative to, and inside, the workflow folder
+      mapping:                             # optional, see below
+        identifier: id
+        title: name
+        properties: {tier: tier, on_call: on_call}
+        relations: {team: team_id}
+      types: {on_call: boolean}            # CSV only: string (default), number, boolean or json
+      chunk_size: 20
+      concurrency: 4
+
+Without a mapping, CSV files need an `identifier` column, `title` is used when present
+and every other column becomes a property; each JSONL line is taken as a Port entity
+as-is. Empty CSV cells are left out, so they don't clear existing values.
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice, zip_longest
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.yaml_handler.actions import ActionPlugin
+from src.yaml_handler.yaml_executor import get_blueprint_identifier, resolved_identifier
+
+ACTION = "bulk_upsert_entities"
+# Port's bulk endpoint accepts at most 20 entities per request
+MAX_CHUNK_SIZE = 20
+# Failed entity identifiers reported per step; the counts are always complete
+MAX_REPORTED_FAILURES = 50
+
+_EMPTY = object()
+
+
+def _number(value: str) -> Any:
+    if value == "":
+        return _EMPTY
+    number = float(value)
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+def _boolean(value: str) -> Any:
+    if value == "":
+        return _EMPTY
+    return value.strip().lower() in ("true", "1", "yes", "y")
+
+
+CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    "string": lambda value: value if value != "" else _EMPTY,
+    "number": _number,
+    "boolean": _boolean,
+    "json": lambda value: json.loads(value) if value != "" else _EMPTY,
+}
+
+
+def csv_chunk_builder(header: List[str], mapping: Dict[str, Any],
+                      types: Dict[str, str]) -> Callable[[List[List[str]]], List[Dict[str, Any]]]:
+    """
+    A function turning a chunk of CSV rows into entity payloads. Column positions and
+    converters are resolved once; each chunk is transposed so every column is
+    converted in a single pass.
+    """
+    index = {name: position for position, name in enumerate(header)}
+
+    def column_index(column: str) -> int:
+        if column not in index:
+            raise ValueError(f"Column {column!r} not found in CSV header")
+        return index[column]
+
+    identifier = column_index(mapping.get("identifier", "identifier"))
+    title_column = mapping.get("title", "title" if "title" in index else None)
+    title = column_index(title_column) if title_column else None
+    relations = {name: column_index(column) for name, column in (mapping.get("relations") or {}).items()}
+    if mapping.get("properties") is not None:
+        properties = {name: column_index(column) for name, column in mapping["properties"].items()}
+    else:
+        used = {identifier, title, *relations.values()}
+        properties = {name: position for name, position in index.items() if position not in used}
+    for name, kind in types.items():
+        if kind not in CONVERTERS:
+            raise ValueError(f"Unknown type {kind!r} for {name!r}")
+    converters = {name: CONVERTERS[types.get(name, "string")] for name in properties}
+
+    def build(rows: List[List[str]]) -> List[Dict[str, Any]]:
+        columns = list(zip_longest(*rows, fillvalue=""))
+        blank = ("",) * len(rows)
+
+        def column(position: int) -> Tuple[str, ...]:
+            return columns[position] if position < len(columns) else blank
+
+        def fields(named_positions: Dict[str, int], convert: Dict[str, Callable[[str], Any]]) -> List[Dict[str, Any]]:
+            names = list(named_positions)
+            if not names:
+                return [{} for _ in rows]
+            values = [list(map(convert[name], column(named_positions[name]))) for name in names]
+            return [{name: value for name, value in zip(names, row) if value is not _EMPTY} for row in zip(*values)]
+
+        property_values = fields(properties, converters)
+        relation_values = fields(relations, {name: CONVERTERS["string"] for name in relations})
+        titles = column(title) if title is not None else blank
+        entities = []
+        for entity_id, entity_title, entity_properties, entity_relations in zip(
+                column(identifier), titles, property_values, relation_values):
+            entity: Dict[str, Any] = {"identifier": entity_id, "properties": entity_properties}
+            if entity_title:
+                entity["title"] = entity_title
+            if entity_relations:
+                entity["relations"] = entity_relations
+            entities.append(entity)
+        return entities
+
+    return build
+
+
+def jsonl_chunk_builder(mapping: Optional[Dict[str, Any]]) -> Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    A function turning a chunk of JSONL objects into entity payloads.
+    """
+    if not mapping:
+        return lambda records: records
+
+    identifier = mapping.get("identifier", "identifier")
+    title = mapping.get("title", "title")
+    properties = mapping.get("properties")
+    relations = mapping.get("relations") or {}
+
+    def build(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entities = []
+        for record in records:
+            if properties is not None:
+                entity_properties = {name: record[key] for name, key in properties.items() if key in record}
+            else:
+                skip = {identifier, title, *relations.values()}
+                entity_properties = {key: value for key, value in record.items() if key not in skip}
+            entity = {"identifier": record[identifier], "properties": entity_properties}
+            if record.get(title):
+                entity["title"] = record[title]
+            entity_relations = {name: record[key] for name, key in relations.items() if key in record}
+            if entity_relations:
+                entity["relations"] = entity_relations
+            entities.append(entity)
+        return entities
+
+    return build
+
+
+def jsonl_records(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    The objects on the lines of a JSONL file. Any other JSON value can't be an
+    entity, so it raises ValueError with its line number, as invalid JSON does.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number} is not valid JSON: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+        yield record
+
+
+def read_entity_chunks(path: str, chunk_size: int, mapping: Optional[Dict[str, Any]] = None,
+                       types: Optional[Dict[str, str]] = None,
+                       file_format: Optional[str] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield entity payloads from a CSV or JSONL file, chunk_size at a time. Only one
+    chunk of rows is held in memory.
+    """
+    file_format = file_format or ("csv" if path.endswith(".csv") else "jsonl")
+    with open(path, newline="" if file_format == "csv" else None, encoding="utf-8") as file:
+        if file_format == "csv":
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            build = csv_chunk_builder(header, mapping or {}, types or {})
+            rows: Iterator[Any] = (row for row in reader if row)
+        elif file_format == "jsonl":
+            build = jsonl_chunk_builder(mapping)
+            rows = jsonl_records(file)
+        else:
+            raise ValueError(f"Unsupported file format: {file_format}")
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield build(chunk)
+
+
+def new_report() -> Dict[str, Any]:
+    return {"entities": 0, "chunks": 0, "failed": 0, "failed_entities": [], "errors": []}
+
+
+def entity_file_path(yaml_folder: str, file_name: str) -> Optional[str]:
+    """
+    The resolved path of an entity file, or None when it lies outside the workflow
+    folder. file can come from run inputs, so neither an absolute path nor ".." (or a
+    symlink) may reach other files on the server.
+    """
+    folder = os.path.realpath(yaml_folder or os.curdir)
+    path = os.path.realpath(os.path.join(folder, file_name))
+    return path if os.path.commonpath([folder, path]) == folder else None
+
+
+def prepare_bulk_step(executor: Any, step: Any) -> Dict[str, Any]:
+    """
+    Settings of one bulk_upsert_entities step, or a failed step result.
+    """
+    details = step.details
+    if "blueprint_identifier" in details:
+        identifier = resolved_identifier(details["blueprint_identifier"])
+    else:
+        identifier = get_blueprint_identifier(details.get("blueprint_data") or {}).get("identifier")
+    if not identifier:
+        return {"status": "failed", "action": ACTION, "error": "Blueprint identifier not found in data"}
+    if not details.get("file") or not isinstance(details["file"], str):
+        return {"status": "failed", "action": ACTION, "error": "No entity file given"}
+    path = entity_file_path(executor.yaml_folder, details["file"])
+    if path is None:
+        return {"status": "failed", "action": ACTION, "error": "Entity file must be inside the workflow folder",
+                "details": details["file"]}
+    try:
+        chunk_size = int(details.get("chunk_size", MAX_CHUNK_SIZE))
+        concurrency = int(details.get("concurrency", executor.write_concurrency))
+    except (TypeError, ValueError) as e:
+        return {"status": "failed", "action": ACTION, "error": "chunk_size and concurrency must be integers",
+                "details": str(e)}
+
+    return {
+        "status": "ready",
+        "identifier": identifier,
+        "path": path,
+        "chunk_size": max(1, min(chunk_size, MAX_CHUNK_SIZE)),
+        "concurrency": max(1, concurrency),
+        "merge": bool(details.get("merge", True)),
+        "mapping": details.get("mapping"),
+        "types": details.get("types") or {},
+        "format": details.get("format"),
+    }
+
+
+def upsert_entity_files(executor: Any, prepared: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Send every chunk of every prepared step through one pool of `concurrency` threads.
+    Files are read as chunks are needed, so at most twice `concurrency` chunks are
+    held at once. Returns one report per prepared step.
+    """
+    reports = [new_report() for _ in prepared]
+    dry_run = executor.write_mode == "dry_run"
+
+    def chunks() -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        for position, settings in enumerate(prepared):
+            try:
+                for chunk in read_entity_chunks(settings["path"], settings["chunk_size"], settings["mapping"],
+                                                settings["types"], settings["format"]):
+                    reports[position]["entities"] += len(chunk)
+                    reports[position]["chunks"] += 1
+                    yield position, chunk
+            except (OSError, ValueError, KeyError) as e:
+                reports[position]["errors"].append(f"{type(e).__name__}: {e}")
+
+    def send(position: int, chunk: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]], Dict[str, Any]]:
+        settings = prepared[position]
+        return position, chunk, executor.port_api.bulk_upsert_entities(settings["identifier"], chunk,
+                                                                       merge=settings["merge"])
+
+    def record(position: int, chunk: List[Dict[str, Any]], response: Dict[str, Any]) -> None:
+        if response.get("status") == "success":
+            # A partially applied chunk lists the entities Port rejected
+            errors = (response.get("data") or {}).get("errors") or []
+            failed = [error.get("identifier") for error in errors]
+            message = errors[0].get("message", "entity rejected") if errors else None
+        else:
+            failed = [entity.get("identifier") for entity in chunk]
+            message = response.get("error", "unknown error")
+        if not failed:
+            return
+        report = reports[position]
+        report["failed"] += len(failed)
+        room = MAX_REPORTED_FAILURES - len(report["failed_entities"])
+        report["failed_entities"].extend(failed[:max(room, 0)])
+        if len(report["errors"]) < 5:
+            report["errors"].append(message)
+
+    if dry_run:
+        for _ in chunks():
+            pass
+        return reports
+
+    concurrency = max(settings["concurrency"] for settings in prepared)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+        for position, chunk in chunks():
+            if len(in_flight) >= 2 * concurrency:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(*future.result())
+            in_flight.add(pool.submit(send, position, chunk))
+        for future in in_flight:
+            record(*future.result())
+    return reports
+
+
+def bulk_result(report: Dict[str, Any], dry_run: bool) -> Dict[str, Any]:
+    if dry_run and not report["errors"]:
+        status = "dry_run"
+    elif report["failed"] or report["errors"]:
+        status = "failed"
+    else:
+        status = "success"
+    result = {"status": status, "action": ACTION, "entities": report["entities"], "chunks": report["chunks"],
+              "failed": report["failed"]}
+    if report["failed_entities"]:
+        result["failed_entities"] = report["failed_entities"]
+    if report["errors"]:
+        result["error"] = report["errors"][0]
+        result["details"] = report["errors"]
+    return result
+
+
+def bulk_upsert_entities_batch(executor: Any, steps: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Handle consecutive bulk_upsert_entities steps together, so the chunks of all their
+    files share one bounded pool of requests.
+    """
+    prepared = [prepare_bulk_step(executor, step) for step in steps]
+    ready = [settings for settings in prepared if settings["status"] == "ready"]
+    reports = iter(upsert_entity_files(executor, ready) if ready else [])
+    dry_run = executor.write_mode == "dry_run"
+    return [bulk_result(next(reports), dry_run) if settings["status"] == "ready" else settings
+            for settings in prepared]
+
+
+def bulk_upsert_entities(executor: Any, step: Any) -> Dict[str, Any]:
+    return bulk_upsert_entities_batch(executor, [step])[0]
+
+
+BULK_UPSERT_ENTITIES = ActionPlugin(
+    name=ACTION,
+    handler=bulk_upsert_entities,
+    batch_handler=bulk_upsert_entities_batch,
+    description="Upsert entities from a CSV or JSONL file through Port's bulk endpoint"
+)
@@ -0,0 +1,166 @@
+# src/yaml_handler/checkpoints.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Run states; a run that is still "running" after its process went away was interrupted
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Step results that are final and may be reused when a run is resumed
+COMPLETED_STEP_STATUSES = ("success", "mock_done_nothing")
+
+
+class CheckpointMismatchError(ValueError):
+    """
+    Raised when resuming a run whose workflow has changed since it was checkpointed.
+    """
+
+
+def plan_fingerprint(steps: List[Any]) -> str:
+    """
+    Hash of an unresolved execution plan, used to refuse resuming a run after its
+    workflow file has changed.
+    """
+    plan = [[step.step_number, step.step_name, step.action, step.resource_type, step.resource_id, step.details]
+            for step in steps]
+    return hashlib.sha256(json.dumps(plan, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class CheckpointedRun:
+    run_id: str
+    filename: Optional[str]
+    inputs: Dict[str, Any]
+    fingerprint: str
+    status: str
+    step_results: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    updated_at: float = 0.0  # Unix time the run last started, checkpointed a step or finished
+
+
+class CheckpointStore(ABC):
+    """
+    Storage interface for per-step checkpoints of workflow runs. Implementations must be thread-safe.
+    """
+    @abstractmethod
+    def start_run(self, run_id: str, filename: Optional[str], inputs: Dict[str, Any], fingerprint: str) -> None:
+        """
+        Record a new run, or mark an existing one as running again when it is resumed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_step(self, run_id: str, step_number: int, result: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def finish_run(self, run_id: str, status: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_run(self, run_id: str) -> Optional[CheckpointedRun]:
+        raise NotImplementedError
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """
+    Keeps checkpoints in a local SQLite database. Step results are stored as JSON, and
+    are dropped once a run completes since there is nothing left to resume. With
+    retention_seconds, runs not updated for that long are deleted as runs finish.
+    """
+    def __init__(self, path: str, retention_seconds: Optional[float] = None):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS checkpoint_runs (
+                    run_id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    inputs TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS checkpoint_steps (
+                    run_id TEXT NOT NULL,
+                    step_number INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    PRIMARY KEY (run_id, step_number)
+                );
+                CREATE INDEX IF NOT EXISTS checkpoint_runs_updated_at ON checkpoint_runs (updated_at);
+            """)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not be used across fork(), e.g. when created in a pre-fork
+        # server's master, so each process opens its own. Callers hold self._lock.
+        if self._pid != os.getpid():
+            self._open_connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._open_connection.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._open_connection
+
+    def start_run(self, run_id: str, filename: Optional[str], inputs: Dict[str, Any], fingerprint: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO checkpoint_runs (run_id, filename, inputs, fingerprint, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at",
+                (run_id, filename, json.dumps(inputs, default=str), fingerprint, RUNNING, time.time())
+            )
+
+    def save_step(self, run_id: str, step_number: int, result: Dict[str, Any]) -> None:
+        with self._lock:
+            connection = self._connection
+            with connection:
+                connection.execute("BEGIN")
+                connection.execute(
+                    "INSERT OR REPLACE INTO checkpoint_steps (run_id, step_number, result) VALUES (?, ?, ?)",
+                    (run_id, step_number, json.dumps(result, default=str))
+                )
+                # Shows the run is still making progress, see updated_at
+                connection.execute("UPDATE checkpoint_runs SET updated_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def finish_run(self, run_id: str, status: str) -> None:
+        with self._lock:
+            connection = self._connection
+            # Commits, or rolls back if a statement fails so the connection isn't left inside a transaction
+            with connection:
+                connection.execute("BEGIN")
+                connection.execute("UPDATE checkpoint_runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                                   (status, time.time(), run_id))
+                if status == COMPLETED:
+                    connection.execute("DELETE FROM checkpoint_steps WHERE run_id = ?", (run_id,))
+                if self.retention_seconds is not None:
+                    cutoff = time.time() - self.retention_seconds
+                    connection.execute("DELETE FROM checkpoint_steps WHERE run_id IN "
+                                       "(SELECT run_id FROM checkpoint_runs WHERE updated_at < ?)", (cutoff,))
+                    connection.execute("DELETE FROM checkpoint_runs WHERE updated_at < ?", (cutoff,))
+
+    def load_run(self, run_id: str) -> Optional[CheckpointedRun]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT filename, inputs, fingerprint, status, updated_at FROM checkpoint_runs WHERE run_id = ?",
+                (run_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            steps = self._connection.execute(
+                "SELECT step_number, result FROM checkpoint_steps WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        filename, inputs, fingerprint, status, updated_at = row
+        return CheckpointedRun(run_id, filename, json.loads(inputs), fingerprint, status,
+                               {step_number: json.loads(result) for step_number, result in steps}, updated_at)
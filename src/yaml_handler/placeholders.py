@@ -0,0 +1,208 @@
+# src/yaml_handler/placeholders.py
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Mapping, Set, Tuple, Union
+
+# {{ inputs.<key> }} - <key> can include word characters and spaces
+INPUT_PLACEHOLDER_PATTERN = re.compile(r"{{\s*inputs\.([\w\s]+)\s*}}")
+# {{ steps.<step_name>.result }} - <step_name> can include alphanumeric characters, spaces, and underscores,
+# optionally followed by a path into the result such as .data.blueprint.identifier
+STEP_RESULT_PLACEHOLDER_PATTERN = re.compile(r"{{\s*steps\.([a-zA-Z0-9_ ]+)\.result((?:\.[\w-]+)*)\s*}}")
+# Both placeholder kinds in one pass
+PLACEHOLDER_PATTERN = re.compile(
+    r"{{\s*(?:inputs\.(?P<input>[\w\s]+)|steps\.(?P<step>[a-zA-Z0-9_ ]+)\.result(?P<path>(?:\.[\w-]+)*))\s*}}"
+)
+
+_MISSING = object()
+
+
+def lookup_path(value: Any, path: Tuple[str, ...]) -> Any:
+    """
+    Follow a path of dict keys / list indexes into value. Returns None if any part is missing.
+    """
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key, _MISSING)
+        elif isinstance(value, (list, tuple)) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+        if value is _MISSING:
+            return None
+    return value
+
+
+def parse_path(path: str) -> Tuple[str, ...]:
+    return tuple(part for part in path.split(".") if part)
+
+
+class InputRef:
+    __slots__ = ("key",)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def unresolved(self) -> str:
+        return f"{{{{ inputs.{self.key} }}}}"
+
+
+class StepRef:
+    __slots__ = ("name", "path")
+
+    def __init__(self, name: str, path: Tuple[str, ...] = ()):
+        self.name = name
+        self.path = path
+
+    def unresolved(self) -> str:
+        suffix = "".join(f".{key}" for key in self.path)
+        return f"{{{{ steps.{self.name}.result{suffix} }}}}"
+
+    def resolve(self, steps_by_name: Mapping[str, Any]) -> Any:
+        """
+        The referenced step result (or the value at path inside it), or None if it isn't available yet.
+        """
+        step = steps_by_name.get(self.name)
+        result = step.result if step is not None else None
+        if result is None or not self.path:
+            return result
+        return lookup_path(result, self.path)
+
+
+class Template:
+    """
+    A string split once into literal text and placeholder references.
+
+    A string that is exactly one step result placeholder binds the referenced
+    Python object itself rather than its str() form, so large results are
+    passed to later steps without being copied or re-parsed.
+    """
+    __slots__ = ("source", "segments", "step_refs")
+
+    def __init__(self, source: str, segments: Tuple[Any, ...]):
+        self.source = source
+        self.segments = segments
+        self.step_refs = frozenset(segment.name for segment in segments if isinstance(segment, StepRef))
+
+    def render(self, inputs: Mapping[str, Any], steps_by_name: Mapping[str, Any]) -> Any:
+        if len(self.segments) == 1 and isinstance(self.segments[0], StepRef):
+            value = self.segments[0].resolve(steps_by_name)
+            return self.segments[0].unresolved() if value is None else value
+
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+            elif isinstance(segment, InputRef):
+                # Leave the placeholder unresolved if the input was not provided
+                parts.append(str(inputs[segment.key]) if segment.key in inputs else segment.unresolved())
+            else:
+                value = segment.resolve(steps_by_name)
+                # Leave the placeholder unresolved until the step has a result
+                parts.append(segment.unresolved() if value is None else str(value))
+        return "".join(parts)
+
+
+class ContainerTemplate:
+    """
+    A dict or list with placeholders somewhere inside it. Only the entries listed in
+    `templated` are rendered; everything else is reused as-is.
+    """
+    __slots__ = ("value", "templated", "step_refs")
+
+    def __init__(self, value: Any, templated: Dict[Any, Any]):
+        self.value = value
+        self.templated = templated
+        refs: Set[str] = set()
+        for node in templated.values():
+            refs |= node.step_refs
+        self.step_refs = frozenset(refs)
+
+    def render(self, inputs: Mapping[str, Any], steps_by_name: Mapping[str, Any]) -> Any:
+        if isinstance(self.value, dict):
+            rendered = dict(self.value)
+        else:
+            rendered = list(self.value)
+        for key, node in self.templated.items():
+            rendered[key] = node.render(inputs, steps_by_name)
+        return rendered
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> Any:
+    """
+    Compile a string into a Template, or return it unchanged when it has no placeholders.
+    """
+    segments = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+        if match.group("input") is not None:
+            segments.append(InputRef(match.group("input").strip()))
+        else:
+            segments.append(StepRef(match.group("step").strip(), parse_path(match.group("path"))))
+        position = match.end()
+
+    if not segments:
+        return text
+    if position < len(text):
+        segments.append(text[position:])
+    return Template(text, tuple(segments))
+
+
+def compile_value(value: Any) -> Any:
+    """
+    Compile placeholders anywhere inside value, recursing into dicts and lists.
+    Values without placeholders are returned unchanged.
+    """
+    if isinstance(value, str):
+        return compile_template(value)
+    if isinstance(value, dict):
+        templated = {}
+        for key, item in value.items():
+            node = compile_value(item)
+            if is_template(node):
+                templated[key] = node
+        return ContainerTemplate(value, templated) if templated else value
+    if isinstance(value, list):
+        templated = {}
+        for index, item in enumerate(value):
+            node = compile_value(item)
+            if is_template(node):
+                templated[index] = node
+        return ContainerTemplate(value, templated) if templated else value
+    return value
+
+
+def is_template(node: Any) -> bool:
+    return isinstance(node, (Template, ContainerTemplate))
+
+
+def render_value(node: Any, inputs: Mapping[str, Any], steps_by_name: Mapping[str, Any]) -> Any:
+    """
+    Resolve a compiled value. steps_by_name maps step names to Step objects.
+    """
+    if is_template(node):
+        return node.render(inputs, steps_by_name)
+    return node
+
+
+def step_references(node: Any) -> Set[str]:
+    """
+    Names of the steps whose results a compiled value refers to.
+    """
+    return set(node.step_refs) if is_template(node) else set()
+
+
+def placeholder_references(node: Any) -> Iterator[Union[InputRef, StepRef]]:
+    """
+    Every input and step result reference inside a compiled value, in document order.
+    """
+    if isinstance(node, Template):
+        for segment in node.segments:
+            if not isinstance(segment, str):
+                yield segment
+    elif isinstance(node, ContainerTemplate):
+        for child in node.templated.values():
+            yield from placeholder_references(child)
@@ -0,0 +1,126 @@
+# src/yaml_handler/scheduler.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from src.yaml_handler.placeholders import compile_value, step_references
+
+
+def find_step_references(value: Any) -> Set[str]:
+    """
+    Collect the names of all steps referenced through {{ steps.<name>.result }}
+    anywhere inside value, recursing into nested dicts and lists.
+    """
+    return step_references(compile_value(value))
+
+
+def step_dependencies(step: Any) -> Set[str]:
+    """
+    Names of the steps a step reads results from, taken from its compiled
+    templates when the plan has them.
+    """
+    compiled = getattr(step, "compiled", None)
+    if compiled is None:
+        return (find_step_references(step.resource_type) | find_step_references(step.resource_id)
+                | find_step_references(step.details))
+    return (step_references(compiled["resource_type"]) | step_references(compiled["resource_id"])
+            | step_references(compiled["details"]))
+
+
+def build_dependency_graph(steps: List[Any]) -> Dict[int, Set[int]]:
+    """
+    Map each step's position in the plan to the positions of the steps it depends on.
+
+    A step depends on every earlier step whose result it references, plus any step
+    listed under its optional `depends_on` key. References to unknown or later steps
+    are ignored, the same way they are left unresolved when executing sequentially,
+    so the resulting graph is always acyclic.
+    """
+    positions_by_name: Dict[str, int] = {}
+    dependencies: Dict[int, Set[int]] = {}
+
+    for position, step in enumerate(steps):
+        referenced_names = step_dependencies(step)
+
+        explicit = step.details.get("depends_on") or []
+        if isinstance(explicit, str):
+            explicit = [explicit]
+        referenced_names |= {name.strip() for name in explicit}
+
+        dependencies[position] = {positions_by_name[name] for name in referenced_names
+                                  if name in positions_by_name}
+
+        # The first step with a given name wins, matching placeholder resolution
+        name = step.details.get("name")
+        if name is not None and name not in positions_by_name:
+            positions_by_name[name] = position
+
+    return dependencies
+
+
+def run_dependency_graph(steps: List[Any], dependencies: Dict[int, Set[int]],
+                         run_step: Callable[[Any], Any], max_workers: int) -> List[Any]:
+    """
+    Run run_step for every step on a bounded thread pool. A step is submitted as soon
+    as all the steps it depends on have finished, without waiting for the rest of its
+    wave. Returns the outputs of run_step in plan order.
+    """
+    outputs: List[Any] = [None] * len(steps)
+    remaining = {position: set(deps) for position, deps in dependencies.items()}
+    dependents: Dict[int, Set[int]] = {position: set() for position in remaining}
+    for position, deps in remaining.items():
+        for dep in deps:
+            dependents[dep].add(position)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+
+        def submit_ready():
+            for position in sorted(remaining):
+                if not remaining[position]:
+                    del remaining[position]
+                    running[pool.submit(run_step, steps[position])] = position
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                position = running.pop(future)
+                outputs[position] = future.result()
+                for dependent in dependents[position]:
+                    remaining[dependent].discard(position)
+            submit_ready()
+
+    return outputs
+
+
+async def run_dependency_graph_async(steps: List[Any], dependencies: Dict[int, Set[int]],
+                                     run_step: Callable[[Any], Awaitable[Any]], max_concurrency: int) -> List[Any]:
+    """
+    asyncio counterpart of run_dependency_graph: every step becomes a task that awaits
+    the tasks it depends on, with at most max_concurrency steps running at once.
+    Returns the outputs of run_step in plan order. If a step raises, the other steps
+    are cancelled and awaited before the exception propagates.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks: Dict[int, asyncio.Task] = {}
+
+    async def run(position: int):
+        if dependencies[position]:
+            await asyncio.gather(*(tasks[dep] for dep in dependencies[position]))
+        async with semaphore:
+            return await run_step(steps[position])
+
+    # Dependencies always point at earlier steps, so creating tasks in plan order is enough
+    for position in range(len(steps)):
+        tasks[position] = asyncio.ensure_future(run(position))
+
+    try:
+        return list(await asyncio.gather(*(tasks[position] for position in range(len(steps)))))
+    except BaseException:
+        # gather leaves the other tasks running when one of them raises
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
@@ -0,0 +1,224 @@
+# src/yaml_handler/validate.py
+"""
+Check workflow files before they run, and cache their parsed content.
+
+    python -m src.yaml_handler.validate [folder] [--no-cache] [--strict]
+
+Every workflow in the folder (configuration_files by default) is parsed and checked
+for problems that would otherwise only show up once earlier steps have already
+called Port: unknown actions, references to unknown or later steps, undeclared
+inputs, invalid embedded JSON and missing required fields. The parsed files are
+then written to the folder's plan cache, which WorkflowRegistry compiles from
+instead of parsing the files again. Exits with 1 when any workflow has an error (or, with
+--strict, a warning).
+"""
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from src.yaml_handler.actions import ActionRegistry
+from src.yaml_handler.bulk_entities import entity_file_path
+from src.yaml_handler.placeholders import InputRef, StepRef, placeholder_references
+from src.yaml_handler.workflow_registry import CompiledWorkflow, WorkflowRegistry, compile_workflow, write_plan_cache
+from src.yaml_handler.yaml_executor import EMBEDDED_JSON_FIELDS, EmbeddedJSON, StepSpec, YAMLExecutor
+
+DEFAULT_FOLDER = os.path.join(os.path.dirname(__file__), "../../configuration_files")
+
+ERROR = "error"
+WARNING = "warning"
+
+# Resource types load_resource can read
+LOADABLE_RESOURCE_TYPES = ("blueprint", "integration")
+# Actions that write to a blueprint identified by blueprint_identifier or blueprint_data
+BLUEPRINT_ACTIONS = ("add_properties_to_blueprint", "add_scorecards_to_blueprint", "bulk_upsert_entities")
+REQUIRED_RULE_FIELDS = ("identifier", "title", "level", "query")
+
+
+@dataclass(frozen=True)
+class Issue:
+    filename: str
+    step: Optional[str]  # "<number> (<name>)", or None for the whole file
+    message: str
+    severity: str = ERROR
+
+    def __str__(self) -> str:
+        where = f"{self.filename}, step {self.step}" if self.step else self.filename
+        return f"{self.severity}: {where}: {self.message}"
+
+
+def available_actions(actions: Optional[ActionRegistry] = None) -> Set[str]:
+    """
+    Names of every action an executor would accept: the built-ins plus plugins.
+    """
+    return set(YAMLExecutor("", None, actions=actions).action_registry)
+
+
+def json_problems(value: Any) -> Iterable[str]:
+    """
+    Errors in the embedded JSON fields inside value. Fields the plan compiler parsed
+    are valid; fields with placeholders can only be checked once resolved.
+    """
+    if isinstance(value, list):
+        for item in value:
+            yield from json_problems(item)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            if key in EMBEDDED_JSON_FIELDS and isinstance(item, str) and not isinstance(item, EmbeddedJSON) \
+                    and "{{" not in item:
+                try:
+                    json.loads(item)
+                except ValueError as e:
+                    yield f"{key} is not valid JSON: {e}"
+            else:
+                yield from json_problems(item)
+
+
+def action_problems(spec: StepSpec, yaml_folder: str) -> Iterable[str]:
+    """
+    Missing or invalid fields of the built-in actions, as far as they can be checked
+    before placeholders are resolved.
+    """
+    details = spec.details
+    if spec.action == "load_resource":
+        if spec.resource_id in (None, ""):
+            yield "load_resource needs a resource_id"
+        if isinstance(spec.resource_type, str) and "{{" not in spec.resource_type and \
+                spec.resource_type not in LOADABLE_RESOURCE_TYPES:
+            yield f"Unsupported resource type: {spec.resource_type}"
+        elif spec.resource_type is None:
+            yield "load_resource needs a resource_type"
+    if spec.action in BLUEPRINT_ACTIONS and not (details.get("blueprint_identifier") or details.get("blueprint_data")):
+        yield f"{spec.action} needs blueprint_identifier or blueprint_data"
+    if spec.action == "add_scorecards_to_blueprint":
+        scorecards = details.get("scorecards") or []
+        if not scorecards:
+            yield "No scorecards provided"
+        for scorecard in scorecards:
+            label = scorecard.get("identifier", "?")
+            for field_name in ("identifier", "name"):
+                if field_name not in scorecard:
+                    yield f"Scorecard {label} needs a {field_name}"
+            for rule in scorecard.get("rules") or []:
+                missing = [field_name for field_name in REQUIRED_RULE_FIELDS if field_name not in rule]
+                if missing:
+                    yield f"Rule {rule.get('identifier', '?')} of scorecard {label} needs {', '.join(missing)}"
+    if spec.action == "add_properties_to_blueprint":
+        for prop in (details.get("properties") or []) + (details.get("aggregationProperties") or []):
+            if "identifier" not in prop:
+                yield "Every property needs an identifier"
+    if spec.action == "bulk_upsert_entities":
+        file_name = details.get("file")
+        if not file_name:
+            yield "No entity file given"
+        elif "{{" not in file_name:
+            path = entity_file_path(yaml_folder, file_name)
+            if path is None:
+                yield f"Entity file is outside the workflow folder: {file_name}"
+            elif not os.path.exists(path):
+                yield f"Entity file not found: {file_name}"
+
+
+def validate_workflow(workflow: CompiledWorkflow, actions: Set[str], yaml_folder: str = "") -> List[Issue]:
+    """
+    Problems in a compiled workflow, in plan order.
+    """
+    issues = []
+    declared_inputs = {item["name"] for item in workflow.inputs}
+    # Names usable by the step at each position, matching steps_by_name: the first step with a name wins
+    earlier: Set[str] = set()
+    all_names = {spec.details.get("name") for spec in workflow.plan}
+
+    if not workflow.plan:
+        issues.append(Issue(workflow.filename, None, "Workflow has no steps", WARNING))
+    for spec in workflow.plan:
+        label = f"{spec.step_number} ({spec.step_name})" if spec.step_name else str(spec.step_number)
+
+        def report(message: str, severity: str = ERROR) -> None:
+            issues.append(Issue(workflow.filename, label, message, severity))
+
+        if not spec.action:
+            report("Step has no action")
+        elif spec.action not in actions:
+            report(f"Unknown action: {spec.action}")
+        if not spec.step_name:
+            report("Step has no name, so no other step can refer to it", WARNING)
+        elif spec.step_name in earlier:
+            report(f"Another step is already named {spec.step_name!r}; references resolve to the first", WARNING)
+
+        compiled = spec.compiled or {}
+        for field_name in ("resource_type", "resource_id", "details"):
+            for reference in placeholder_references(compiled.get(field_name)):
+                if isinstance(reference, InputRef) and reference.key not in declared_inputs:
+                    report(f"Input {reference.key!r} is not declared under inputs")
+                elif isinstance(reference, StepRef) and reference.name not in earlier:
+                    problem = "a later step" if reference.name in all_names else "an unknown step"
+                    report(f"{reference.unresolved()} refers to {problem} and is never resolved")
+
+        depends_on = spec.details.get("depends_on") or []
+        for name in [depends_on] if isinstance(depends_on, str) else depends_on:
+            if name.strip() not in earlier:
+                report(f"depends_on {name!r} is not an earlier step")
+
+        for message in json_problems(spec.details):
+            report(message)
+        for message in action_problems(spec, yaml_folder):
+            report(message)
+
+        if spec.step_name:
+            earlier.add(spec.step_name)
+    return issues
+
+
+def validate_folder(yaml_folder: str, actions: Optional[ActionRegistry] = None,
+                    write_cache: bool = False) -> Dict[str, List[Issue]]:
+    """
+    Parse and check every workflow in yaml_folder. Files that compile are written to
+    the plan cache when write_cache is set, whatever their issues: the cache only
+    saves parsing, and the executor meets the same problems either way.
+    """
+    registry = WorkflowRegistry(yaml_folder, plan_cache=False)
+    known_actions = available_actions(actions)
+    filenames = sorted(filename for filename in os.listdir(yaml_folder)
+                       if filename.endswith(".yaml") or filename.endswith(".yml"))
+    report: Dict[str, List[Issue]] = {}
+    documents = {}
+    for filename in filenames:
+        try:
+            data = registry.parse(filename)
+            workflow = compile_workflow(filename, data)
+        except Exception as e:
+            report[filename] = [Issue(filename, None, f"Could not parse: {e}")]
+            continue
+        documents[filename] = data
+        report[filename] = validate_workflow(workflow, known_actions, yaml_folder)
+    if write_cache:
+        write_plan_cache(yaml_folder, documents)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate workflow files and precompile their plans")
+    parser.add_argument("folder", nargs="?", default=DEFAULT_FOLDER, help="Folder with the workflow files")
+    parser.add_argument("--no-cache", action="store_true", help="Only validate; don't write the plan cache")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    args = parser.parse_args(argv)
+
+    report = validate_folder(args.folder, write_cache=not args.no_cache)
+    failing = (ERROR, WARNING) if args.strict else (ERROR,)
+    failed = False
+    for filename, issues in report.items():
+        for issue in issues:
+            print(issue)
+        failed = failed or any(issue.severity in failing for issue in issues)
+    errors = sum(issue.severity == ERROR for issues in report.values() for issue in issues)
+    warnings = sum(issue.severity == WARNING for issues in report.values() for issue in issues)
+    print(f"{len(report)} workflow(s) checked: {errors} error(s), {warnings} warning(s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+# src/yaml_handler/workflow_registry.py
+
+import hashlib
+import importlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from ruamel.yaml import YAML, __version__ as ruamel_yaml_version
+
+from src.instrumentation.timing import timed_global_phase
+from src.yaml_handler.yaml_executor import Step, StepSpec, create_execution_plan
+
+logger = logging.getLogger(__name__)
+
+# Parsed workflow files written by `python -m src.yaml_handler.validate`, kept next to the workflow files
+PLAN_CACHE_FILENAME = ".compiled_workflows.json"
+# Bumped whenever the layout of the cache file changes
+PLAN_CACHE_VERSION = 2
+# Modules whose code turns a workflow file into a plan; a cache written by other code is ignored
+COMPILER_MODULES = ("src.yaml_handler.workflow_registry", "src.yaml_handler.yaml_executor",
+                    "src.yaml_handler.placeholders")
+
+
+@dataclass(frozen=True)
+class CompiledWorkflow:
+    """
+    A workflow file parsed once: its metadata, inputs and the Step plan.
+
+    The plan is shared by every request and must not be mutated; call instantiate()
+    to get a copy that an executor can run.
+    """
+    filename: str
+    title: str
+    description: str
+    inputs: Tuple[Dict[str, Any], ...]
+    plan: Tuple[StepSpec, ...]
+    mtime_ns: int
+    size: int
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        The metadata shown on the index page.
+        """
+        return {
+            "title": self.title,
+            "description": self.description,
+            "filename": self.filename,
+            "inputs": [dict(item) for item in self.inputs]
+        }
+
+    def instantiate(self) -> List[Step]:
+        """
+        Fresh per-run Step state for one run. Nothing is copied: each Step points at
+        its shared spec until resolve_step replaces the fields that hold placeholders.
+        """
+        return [Step.from_spec(spec) for spec in self.plan]
+
+
+def compile_workflow(filename: str, data: Dict[str, Any], mtime_ns: int = 0, size: int = 0) -> CompiledWorkflow:
+    """
+    Build a CompiledWorkflow from already parsed YAML content.
+    """
+    data = data or {}
+    inputs = tuple({"name": name, "type": (details or {}).get("type", "text")}
+                   for name, details in (data.get("inputs") or {}).items())
+    return CompiledWorkflow(
+        filename=filename,
+        title=data.get("title", "No Title"),
+        description=data.get("description", "No Description"),
+        inputs=inputs,
+        plan=tuple(create_execution_plan(data)),
+        mtime_ns=mtime_ns,
+        size=size
+    )
+
+
+def file_digest(file_path: str) -> str:
+    with open(file_path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+_compiler_digest: Optional[str] = None
+
+
+def compiler_digest() -> str:
+    """
+    Digest of the YAML parser version and the source of COMPILER_MODULES.
+    """
+    global _compiler_digest
+    if _compiler_digest is None:
+        digest = hashlib.sha256(ruamel_yaml_version.encode())
+        for name in COMPILER_MODULES:
+            with open(importlib.import_module(name).__file__, "rb") as file:
+                digest.update(file.read())
+        _compiler_digest = digest.hexdigest()
+    return _compiler_digest
+
+
+def json_safe(data: Any) -> bool:
+    """
+    True if data survives a JSON round trip unchanged. YAML can hold values JSON
+    can't, e.g. timestamps or non-string keys; such files are left out of the cache.
+    """
+    try:
+        return json.loads(json.dumps(data)) == data
+    except (TypeError, ValueError):
+        return False
+
+
+def write_plan_cache(yaml_folder: str, documents: Dict[str, Any]) -> str:
+    """
+    Save parsed workflow files (filename -> YAML content) to the folder's plan cache,
+    keyed by the digest of each file. Returns the cache path.
+    """
+    path = os.path.join(yaml_folder, PLAN_CACHE_FILENAME)
+    entries = {filename: {"digest": file_digest(os.path.join(yaml_folder, filename)), "data": data}
+               for filename, data in documents.items() if json_safe(data)}
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump({"version": PLAN_CACHE_VERSION, "compiler": compiler_digest(), "workflows": entries}, file)
+    os.replace(temporary_path, path)  # Readers never see a partly written cache
+    return path
+
+
+def read_plan_cache(yaml_folder: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Filename -> {"digest", "data"} from the folder's plan cache; empty when there is
+    none or it was written by another version of the compiler. The cache holds only
+    plain data, so whoever can write it can do no more than edit the workflows.
+    """
+    path = os.path.join(yaml_folder, PLAN_CACHE_FILENAME)
+    try:
+        with open(path) as file:
+            cache = json.load(file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):  # A corrupt cache only costs parsing the files again
+        logger.warning("Ignoring unreadable plan cache %s", path, exc_info=True)
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != PLAN_CACHE_VERSION or \
+            cache.get("compiler") != compiler_digest():
+        return {}
+    workflows = cache.get("workflows")
+    return workflows if isinstance(workflows, dict) else {}
+
+
+class WorkflowRegistry:
+    """
+    Parses each workflow file in a folder once and serves the compiled form.
+    Entries are re-parsed when the file's mtime or size changes.
+
+    With plan_cache, a file whose content matches the folder's plan cache is compiled
+    from the content stored there instead of being parsed again.
+    """
+    def __init__(self, yaml_folder: str, plan_cache: bool = True):
+        self.yaml_folder = yaml_folder
+        self._workflows: Dict[str, CompiledWorkflow] = {}
+        self._lock = threading.Lock()
+        self.plan_cache = plan_cache
+        self._precompiled: Optional[Dict[str, Dict[str, Any]]] = None
+        # The safe loader builds plain dicts/lists and is much faster than round-trip parsing
+        self._yaml = YAML(typ="safe")
+
+    def parse(self, filename: str) -> Any:
+        """
+        The YAML content of a workflow file.
+        """
+        with timed_global_phase("yaml_parse", filename=filename), \
+                open(os.path.join(self.yaml_folder, filename), "r") as file:
+            return self._yaml.load(file)
+
+    def get(self, filename: str) -> CompiledWorkflow:
+        """
+        Return the compiled workflow for filename, parsing it if it is new or changed.
+        Raises FileNotFoundError if the file does not exist.
+        """
+        file_path = os.path.join(self.yaml_folder, filename)
+        stat = os.stat(file_path)
+
+        workflow = self._workflows.get(filename)
+        if workflow and (workflow.mtime_ns, workflow.size) == (stat.st_mtime_ns, stat.st_size):
+            return workflow
+
+        with self._lock:
+            workflow = self._workflows.get(filename)
+            if workflow and (workflow.mtime_ns, workflow.size) == (stat.st_mtime_ns, stat.st_size):
+                return workflow
+            data = self._cached_document(filename, file_path)
+            if data is None:
+                data = self.parse(filename)
+            with timed_global_phase("plan_compile", filename=filename):
+                workflow = compile_workflow(filename, data, stat.st_mtime_ns, stat.st_size)
+            self._workflows[filename] = workflow
+            return workflow
+
+    def _cached_document(self, filename: str, file_path: str) -> Optional[Any]:
+        """
+        The plan cache's content for filename if it was stored for the file's current
+        content. Content is compared rather than mtime, which checkouts and copies reset.
+        Called with self._lock held.
+        """
+        if not self.plan_cache:
+            return None
+        if self._precompiled is None:
+            with timed_global_phase("plan_cache_load"):
+                self._precompiled = read_plan_cache(self.yaml_folder)
+        entry = self._precompiled.get(filename)
+        if not isinstance(entry, dict) or entry.get("digest") != file_digest(file_path):
+            return None
+        return entry.get("data")
+
+    def list_workflows(self) -> List[CompiledWorkflow]:
+        """
+        Compiled workflows for every YAML file currently in the folder.
+        """
+        filenames = [filename for filename in os.listdir(self.yaml_folder)
+                     if filename.endswith(".yaml") or filename.endswith(".yml")]
+
+        # Forget files that have been removed
+        with self._lock:
+            for filename in set(self._workflows) - set(filenames):
+                del self._workflows[filename]
+
+        return [self.get(filename) for filename in filenames]
+
+
+_registries: Dict[str, WorkflowRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(yaml_folder: str) -> WorkflowRegistry:
+    """
+    Shared registry for a folder, so every caller benefits from the same parsed files.
+    """
+    key = os.path.abspath(yaml_folder)
+    with _registries_lock:
+        registry: Optional[WorkflowRegistry] = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = WorkflowRegistry(yaml_folder)
+        return registry
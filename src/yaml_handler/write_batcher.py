@@ -0,0 +1,88 @@
+# src/yaml_handler/write_batcher.py
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+
+
+@dataclass
+class BlueprintBatch:
+    """
+    Property changes from one or more steps, merged into a single PATCH for one blueprint.
+    """
+    identifier: str
+    payload: Dict[str, Any]
+    entries: List[Dict[str, Any]] = field(default_factory=list)  # {"step_number", "payload", "result"}
+
+
+def merge_properties_payloads(identifier: str, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge add_properties_to_blueprint payloads in plan order; a later step wins when
+    two steps define the same property identifier.
+    """
+    properties: Dict[str, Any] = {}
+    aggregation_properties: Dict[str, Any] = {}
+    for payload in payloads:
+        properties.update(payload.get("schema", {}).get("properties", {}))
+        aggregation_properties.update(payload.get("aggregationProperties", {}))
+    return {
+        "identifier": identifier,
+        "schema": {
+            "properties": properties
+        },
+        "aggregationProperties": aggregation_properties
+    }
+
+
+class BlueprintWriteBatcher:
+    """
+    Collects property updates per blueprint identifier instead of sending them right away.
+
+    Each deferred step immediately gets a 'pending' result dictionary; when the batch is
+    sent, that same dictionary is updated in place with the step's final result, so the
+    executor's per-step results stay accurate.
+    """
+    def __init__(self):
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, identifier: str, step_number: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"status": "pending", "action": "add_properties_to_blueprint", "blueprint": identifier}
+        with self._lock:
+            self._pending.setdefault(identifier, []).append(
+                {"step_number": step_number, "payload": payload, "result": result}
+            )
+        return result
+
+    def pending_steps(self) -> Set[int]:
+        with self._lock:
+            return {entry["step_number"] for entries in self._pending.values() for entry in entries}
+
+    def drain(self) -> List[BlueprintBatch]:
+        """
+        Take every pending update, merged into one batch per blueprint.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        batches = []
+        for identifier, entries in pending.items():
+            entries.sort(key=lambda entry: entry["step_number"])
+            payload = merge_properties_payloads(identifier, [entry["payload"] for entry in entries])
+            batches.append(BlueprintBatch(identifier, payload, entries))
+        return batches
+
+    @staticmethod
+    def complete(batch: BlueprintBatch, response: Dict[str, Any]) -> None:
+        """
+        Report the outcome of a batch PATCH back to every step that contributed to it.
+        """
+        batched_steps = [entry["step_number"] for entry in batch.entries]
+        for entry in batch.entries:
+            result = entry["result"]
+            result.pop("blueprint", None)
+            if response["status"] == "success":
+                result.update({"status": "success", "properties_added": entry["payload"]})
+            else:
+                result.update({"status": "failed", "error": response["error"], "details": response["details"]})
+            result["batched_steps"] = batched_steps
@@ -1,32 +1,117 @@
 # src/yaml_handler/yaml_executor.py
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import contextvars
+import time
+import uuid
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Optional, Set
+import asyncio
 import json
+import threading
 import requests
 from ruamel.yaml import YAML
 import os
 import ast
-import re
 from src.api_clients.port_api import PortAPI  # Import the PortAPI class
+from src.yaml_handler.placeholders import (
+    INPUT_PLACEHOLDER_PATTERN, STEP_RESULT_PLACEHOLDER_PATTERN, StepRef, compile_template, compile_value,
+    is_template, parse_path, render_value
+)
+from src.instrumentation.hooks import hooks
+from src.yaml_handler.actions import ActionRegistry, get_action_registry
+from src.instrumentation.timing import PhaseTimings, StepTimings, step_scope, timed_phase
+from src.yaml_handler.checkpoints import (
+    COMPLETED, COMPLETED_STEP_STATUSES, FAILED, CheckpointMismatchError, CheckpointStore, plan_fingerprint
+)
+from src.yaml_handler.blueprint_diff import WRITE_MODES, diff_properties_payload, diff_scorecards, loaded_blueprint
+from src.yaml_handler.write_batcher import BlueprintWriteBatcher
+from src.yaml_handler.scheduler import build_dependency_graph, run_dependency_graph, run_dependency_graph_async
 
+if TYPE_CHECKING:
+    # aiohttp is only imported once an AsyncPortAPI is created, keeping sync-only startup light
+    from src.api_clients.async_port_api import AsyncPortAPI
 
-@dataclass
-class Step:
+
+@dataclass(frozen=True, slots=True)
+class StepSpec:
+    """
+    One step of a parsed workflow, shared by every run of the plan. `details` holds
+    the step's remaining YAML keys and must not be mutated.
+    """
     step_number: int
     step_name: str
     action: str
-    resource_type: str
-    resource_id: str
+    resource_type: Any
+    resource_id: Any
     details: Dict[str, Any] = field(default_factory=dict)
+    # Placeholder templates for resource_type, resource_id and details, compiled once per plan
+    compiled: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class Step:
+    """
+    Per-run state of a step. It starts out pointing at its spec's unresolved values;
+    resolve_step replaces only the fields that hold placeholders.
+    """
+    spec: StepSpec
+    resource_type: Any
+    resource_id: Any
+    details: Dict[str, Any]
     result: Any = None
 
+    @classmethod
+    def from_spec(cls, spec: StepSpec) -> "Step":
+        return cls(spec, spec.resource_type, spec.resource_id, spec.details)
+
+    @property
+    def step_number(self) -> int:
+        return self.spec.step_number
+
+    @property
+    def step_name(self) -> str:
+        return self.spec.step_name
+
+    @property
+    def action(self) -> str:
+        return self.spec.action
+
+    @property
+    def compiled(self) -> Optional[Dict[str, Any]]:
+        return self.spec.compiled
+
+
+def compile_step(step: Any) -> Dict[str, Any]:
+    """
+    Compile the placeholders of a step's fields into templates.
+    """
+    return {
+        "resource_type": compile_value(step.resource_type),
+        "resource_id": compile_value(step.resource_id),
+        "details": compile_value(step.details)
+    }
+
+def resolved_identifier(value: Any) -> Optional[str]:
+    """
+    value if it can identify a resource: a non-empty string that holds no placeholder
+    left unresolved, e.g. because the step it refers to returned no blueprint.
+    """
+    if isinstance(value, str) and value.strip() and "{{" not in value:
+        return value
+    return None
+
+
 def get_blueprint_identifier(blueprint_data: Any) -> Dict[str, Any]:
     """
     Helper function to parse blueprint data and extract the blueprint identifier.
     Returns a dictionary with either a 'status' key for failure or an 'identifier' key for success.
+
+    blueprint_data is normally the load_resource result bound by a whole-value
+    placeholder; a string is only seen when the placeholder was embedded in other text.
     """
-    # Parse blueprint_data if it is a JSON string
+    # Parse blueprint_data if it is a string representation of the result
 
     try:
         blueprint_data = ast.literal_eval(blueprint_data) if isinstance(blueprint_data,
@@ -35,12 +120,62 @@ def get_blueprint_identifier(blueprint_data: Any) -> Dict[str, Any]:
         return {"status": "failed", "error": "Invalid JSON in blueprint_data"}
 
     # Extract the blueprint identifier
-    blueprint_identifier = blueprint_data.get("data", {}).get("blueprint", {}).get("identifier")
+    blueprint_identifier = resolved_identifier(blueprint_data.get("data", {}).get("blueprint", {}).get("identifier"))
     if not blueprint_identifier:
         return {"status": "failed", "error": "Blueprint identifier not found in data"}
 
     return {"status": "success", "identifier": blueprint_identifier}
 
+# Step fields holding JSON text that handlers send to Port as objects
+EMBEDDED_JSON_FIELDS = ("calculationSpec", "query")
+
+
+class EmbeddedJSON(str):
+    """
+    JSON text from a workflow file, parsed once when the plan is compiled. It is
+    still the original string everywhere else, e.g. in step results.
+    """
+    def __new__(cls, text: str, parsed: Any):
+        value = super().__new__(cls, text)
+        value.parsed = parsed
+        return value
+
+    def __reduce__(self):
+        return EmbeddedJSON, (str(self), self.parsed)
+
+
+def load_embedded_json(value: Any) -> Any:
+    """
+    The object an embedded JSON field stands for. Text the plan compiler couldn't
+    parse ahead of time, e.g. because it holds placeholders, is parsed here. The
+    result may be shared with other runs and must not be mutated.
+    """
+    if isinstance(value, EmbeddedJSON):
+        return value.parsed
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def preparse_embedded_json(value: Any) -> Any:
+    """
+    Replace the EMBEDDED_JSON_FIELDS inside value that are valid JSON without
+    placeholders with EmbeddedJSON. Anything else is left for the handler, which
+    reports it when the step runs.
+    """
+    if isinstance(value, list):
+        return [preparse_embedded_json(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    prepared = {}
+    for key, item in value.items():
+        if key in EMBEDDED_JSON_FIELDS and isinstance(item, str) and "{{" not in item:
+            try:
+                item = EmbeddedJSON(item, json.loads(item))
+            except ValueError:
+                pass
+        prepared[key] = preparse_embedded_json(item)
+    return prepared
+
+
 def prepare_aggregation_properties(properties: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Prepares the aggregation properties for the PATCH payload.
@@ -51,7 +186,7 @@ def prepare_aggregation_properties(properties: List[Dict[str, Any]]) -> Dict[str
             "title": prop.get("title"),
             "type": prop.get("type"),
             "target": prop.get("target"),
-            "calculationSpec": json.loads(prop.get("calculationSpec", "{}"))
+            "calculationSpec": load_embedded_json(prop.get("calculationSpec", "{}"))
         }
     return result
 
@@ -69,12 +204,176 @@ def prepare_standard_properties(properties: List[Dict[str, Any]]) -> Dict[str, A
     return result
 
 
+def create_execution_plan(yaml_content: Dict[str, Any]) -> List[StepSpec]:
+    """
+    Convert each step of the YAML content into a StepSpec without resolving placeholders.
+    """
+    steps = yaml_content.get("steps", [])
+    execution_plan = []
+    for i, step_data in enumerate(steps, start=1):
+        action = step_data.get("action")
+        step_name = step_data.get("name")
+
+        # Capture resource type and id without resolving placeholders
+        resource_type = step_data.get("resource_type")
+        resource_id = step_data.get("resource_id")
+
+        # Capture all other fields as part of `details`, with embedded JSON parsed once here
+        details = preparse_embedded_json({key: value for key, value in step_data.items() if
+                                          key not in ["action", "resource_type", "resource_id"]})
+
+        # Create the StepSpec with additional details
+        spec = StepSpec(
+            step_number=i,
+            step_name=step_name,
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            details=details
+        )
+        execution_plan.append(replace(spec, compiled=compile_step(spec)))
+    return execution_plan
+
+
+def unsupported_resource_result(resource_type: str) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "message": f"Unsupported resource type: {resource_type}"
+    }
+
+
+def loaded_resource_result(resource_type: str, resource_id: str, resource_data: Any,
+                           fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    result = {
+        "status": "success",
+        "action": "load_resource",
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "data": resource_data
+    }
+    if fields:
+        # Marks the data as partial, see loaded_blueprint
+        result["fields"] = fields
+    return result
+
+
+def release_result(result: Any) -> None:
+    """
+    Drop the loaded data of a step result that no remaining step references. The
+    result itself stays, marked as released, so its status is still reported.
+    """
+    if isinstance(result, dict) and result.pop("data", None) is not None:
+        result["released"] = True
+
+
+def properties_update_result(payload: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turns the PortAPI response to a blueprint PATCH into the add_properties_to_blueprint step result.
+    """
+    if response['status'] == 'success':
+        return {"status": "success", "action": "add_properties_to_blueprint", "properties_added": payload}
+    else:
+        return {"status": "failed", "action": "add_properties_to_blueprint", "error": response['error'], "details": response['details']}
+
+
+def field_selection(step: Step) -> Dict[str, Any]:
+    """
+    Keyword arguments selecting the `fields` a load_resource step declared, so the
+    response is trimmed to them while it is parsed. Empty when all fields are wanted.
+    """
+    fields = step.details.get("fields")
+    return {"fields": [fields] if isinstance(fields, str) else list(fields)} if fields else {}
+
+
+def with_diff(result: Dict[str, Any], diff: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Attach the changes and up-to-date identifiers of a diff-mode write to its step result.
+    """
+    if diff is not None:
+        result["changes"] = diff["changes"]
+        result["unchanged"] = diff["unchanged"]
+    return result
+
+
+def dry_run_result(action: str, diff: Dict[str, Any]) -> Dict[str, Any]:
+    return {"status": "dry_run", "action": action, "changes": diff["changes"], "unchanged": diff["unchanged"]}
+
+
+def build_scorecard_payload(scorecard: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prepares the payload for the scorecard creation API.
+    """
+    return {
+        "identifier": scorecard["identifier"],
+        "title": scorecard["name"],
+        "rules": [
+            {
+                "identifier": rule["identifier"],
+                "title": rule["title"],
+                "level": rule["level"],
+                "query": load_embedded_json(rule["query"])  # Usually parsed when the plan was compiled
+            } for rule in scorecard["rules"]
+        ]
+    }
+
+
+def scorecard_creation_result(scorecards: List[Dict[str, Any]], responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turns the PortAPI responses to the scorecard POSTs into the add_scorecards_to_blueprint step result.
+    """
+    added = [scorecard for scorecard, response in zip(scorecards, responses) if response["status"] == "success"]
+    failures = [(scorecard, response) for scorecard, response in zip(scorecards, responses)
+                if response["status"] != "success"]
+
+    if not failures:
+        return {"status": "success", "action": "add_scorecards_to_blueprint", "scorecards_added": added}
+    else:
+        result = {"status": "failed", "action": "add_scorecards_to_blueprint", "error": failures[0][1]["error"],
+                  "details": failures[0][1]["details"]}
+        if len(scorecards) > 1:
+            result["scorecards_added"] = added
+            result["scorecards_failed"] = [scorecard["identifier"] for scorecard, _ in failures]
+        return result
+
+
 class YAMLExecutor:
-    def __init__(self, yaml_folder: str, port_api: PortAPI, inputs: Dict[str, Any] = None):
+    def __init__(self, yaml_folder: str, port_api: PortAPI, inputs: Dict[str, Any] = None,
+                 max_workers: int = 1, async_port_api: Optional["AsyncPortAPI"] = None,
+                 batch_writes: bool = False, write_concurrency: int = 4,
+                 on_step_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 write_mode: str = "apply", checkpoint_store: Optional[CheckpointStore] = None,
+                 run_id: Optional[str] = None, release_results: bool = False,
+                 actions: Optional[ActionRegistry] = None):
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
         self.yaml_folder = yaml_folder
         self.port_api = port_api
+        self.async_port_api = async_port_api  # Used by execute_steps_async
         self.inputs = inputs or {}  # Store user inputs
-        self.steps: List[Step] = []
+        self.max_workers = max_workers  # Steps allowed to run at the same time
+        self.write_concurrency = write_concurrency  # Concurrent writes within a single step or flush
+        # When enabled, property updates to the same blueprint are merged into one PATCH
+        self.batch_writes = batch_writes
+        # "diff" skips writes the blueprint already reflects, "dry_run" only reports them
+        self.write_mode = write_mode
+        self.write_batcher = BlueprintWriteBatcher()
+        self.step_dependencies: Dict[int, Set[int]] = {}
+        self._flush_lock = threading.Lock()
+        # Called with each step result as soon as it is final, e.g. to stream progress
+        self.on_step_complete = on_step_complete
+        # Wall/CPU time per run-level phase and per step, see timing_report()
+        self.run_timings = PhaseTimings()
+        self.step_timings: Dict[int, StepTimings] = {}
+        # Per-step results are saved under run_id so a failed or interrupted run can be resumed
+        self.checkpoint_store = checkpoint_store
+        self.run_id = run_id or uuid.uuid4().hex
+        self.workflow_filename: Optional[str] = None
+        self.restored: Dict[int, Dict[str, Any]] = {}
+        # When enabled, a step's loaded data is dropped once every step that references it has run
+        self.release_results = release_results
+        self._unfinished_consumers: Dict[int, int] = {}
+        self._release_lock = threading.Lock()
+        self.steps = []
 
         # Define a function registry for action handlers
         self.action_registry = {
@@ -84,13 +383,44 @@ class YAMLExecutor:
             "upsert_integration": self.upsert_integration
         }
 
+        # Native coroutine handlers for execute_steps_async; other actions run in a worker thread
+        self.async_action_registry = {
+            "load_resource": self.load_resource_async,
+            "add_properties_to_blueprint": self.add_properties_to_blueprint_async,
+            "add_scorecards_to_blueprint": self.add_scorecards_to_blueprint_async
+        }
+
+        # Plugin actions (see src/yaml_handler/actions.py); a plugin may replace a built-in action
+        self.batch_action_registry: Dict[str, Callable[[List[Step]], List[Dict[str, Any]]]] = {}
+        for plugin in actions if actions is not None else get_action_registry():
+            self.action_registry[plugin.name] = partial(plugin.handler, self)
+            if plugin.async_capable:
+                self.async_action_registry[plugin.name] = partial(plugin.async_handler, self)
+            else:
+                self.async_action_registry.pop(plugin.name, None)
+            if plugin.batchable:
+                self.batch_action_registry[plugin.name] = partial(plugin.batch_handler, self)
+
+    @property
+    def steps(self) -> List[Step]:
+        return self._steps
+
+    @steps.setter
+    def steps(self, steps: List[Step]) -> None:
+        self._steps = steps
+        # Index steps by name for placeholder resolution; the first step with a name wins
+        self.steps_by_name: Dict[str, Step] = {}
+        for step in steps:
+            self.steps_by_name.setdefault(step.details.get("name"), step)
+        self.steps_by_number: Dict[int, Step] = {step.step_number: step for step in steps}
+
     def load_yaml(self, filename: str) -> Dict[str, Any]:
         """
         Load the YAML file and return its content as a dictionary.
         """
         file_path = os.path.join(self.yaml_folder, filename)
         yaml = YAML()
-        with open(file_path, 'r') as file:
+        with self.run_timings.phase("yaml_parse"), open(file_path, 'r') as file:
             return yaml.load(file)
 
     def build_execution_plan(self, yaml_content: Dict[str, Any]) -> List[Step]:
@@ -98,84 +428,56 @@ class YAMLExecutor:
         Parse the YAML content and convert each step into a Step object
         without resolving placeholders.
         """
-        steps = yaml_content.get("steps", [])
-        execution_plan = []
-        for i, step_data in enumerate(steps, start=1):
-            action = step_data.get("action")
-            step_name = step_data.get("name")
-
-            # Capture resource type and id without resolving placeholders
-            resource_type = step_data.get("resource_type")
-            resource_id = step_data.get("resource_id")
-
-            # Capture all other fields as part of `details`
-            details = {key: value for key, value in step_data.items() if
-                       key not in ["action", "resource_type", "resource_id"]}
-
-            # Create the Step object with additional details
-            step = Step(
-                step_number=i,
-                step_name=step_name,
-                action=action,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                details=details
-            )
-            execution_plan.append(step)
+        with self.run_timings.phase("plan_build"):
+            execution_plan = [Step.from_spec(spec) for spec in create_execution_plan(yaml_content)]
         self.steps = execution_plan
         return execution_plan
 
-    def resolve_placeholders(self, text: str) -> str:
+    def use_workflow(self, workflow: Any) -> List[Step]:
+        """
+        Take a fresh copy of the plan of a CompiledWorkflow from the workflow registry
+        instead of loading and parsing the YAML file again.
+        """
+        with self.run_timings.phase("plan_instantiate"):
+            self.steps = workflow.instantiate()
+        self.workflow_filename = workflow.filename
+        return self.steps
+
+    def resolve_placeholders(self, text: str) -> Any:
         """
-        Detects and resolves placeholders in the given text by delegating to
-        specific resolvers for inputs or step results.
+        Detects and resolves placeholders in the given text, using inputs and the
+        results of previous steps. Text that is a single step result placeholder
+        resolves to the result object itself.
         """
         if not text or not isinstance(text, str):
             return text
 
-        # Resolve inputs placeholders
-        text = self.resolve_input_placeholder(text)
-
-        # Resolve step result placeholders
-        text = self.resolve_step_result_placeholder(text)
-
-        return text
+        return render_value(compile_template(text), self.inputs, self.steps_by_name)
 
     def resolve_input_placeholder(self, text: str) -> str:
         """
         Resolves placeholders in the format {{ inputs.<key> }} using values from self.inputs.
         """
-        pattern = r"{{\s*inputs\.([\w\s]+)\s*}}"
-
         def replacer(match):
             key = match.group(1).strip()
             return str(self.inputs.get(key, f"{{{{ inputs.{key} }}}}"))  # Leave unresolved if not found
 
-        return re.sub(pattern, replacer, text)
+        return INPUT_PLACEHOLDER_PATTERN.sub(replacer, text)
 
     def resolve_step_result_placeholder(self, text: str) -> str:
         """
         Resolves placeholders in the format {{ steps.<step_name>.result }} using values
         from the results of previous steps in self.steps.
         """
-        # Updated pattern to match placeholders like {{ steps.<step_name>.result }}
-        # <step_name> can include alphanumeric characters, spaces, and underscores
-        pattern = r"{{\s*steps\.([a-zA-Z0-9_ ]+)\.result\s*}}"
-
         def replacer(match):
-            # Extract the step name from the matched pattern
-            step_name = match.group(1).strip()
+            # Extract the step name and optional path from the matched pattern
+            reference = StepRef(match.group(1).strip(), parse_path(match.group(2)))
 
-            # Find the step by name and get its result
-            for step in self.steps:
-                if step.details.get("name") == step_name:
-                    # Return the resolved result or leave the placeholder unresolved if result is None
-                    return str(step.result) if step.result is not None else f"{{{{ steps.{step_name}.result }}}}"
-
-            # If no matching step is found, return the placeholder as-is
-            return f"{{{{ steps.{step_name}.result }}}}"
+            # Return the resolved result or leave the placeholder unresolved if there is none yet
+            value = reference.resolve(self.steps_by_name)
+            return reference.unresolved() if value is None else str(value)
 
-        return re.sub(pattern, replacer, text)
+        return STEP_RESULT_PLACEHOLDER_PATTERN.sub(replacer, text)
 
     def load_resource(self, step: Step) -> Dict[str, Any]:
         """
@@ -186,23 +488,16 @@ class YAMLExecutor:
         resource_id = step.resource_id
 
         try:
-            if resource_type == "blueprint":
-                resource_data = self.port_api.get_blueprint_data(resource_id)
-            elif resource_type == "integration":
-                resource_data = self.port_api.get_integration_data(resource_id)  # Hypothetical method
-            else:
-                return {
-                    "status": "error",
-                    "message": f"Unsupported resource type: {resource_type}"
-                }
+            with timed_phase("port_call"):
+                if resource_type == "blueprint":
+                    resource_data = self.port_api.get_blueprint_data(resource_id, **field_selection(step))
+                elif resource_type == "integration":
+                    resource_data = self.port_api.get_integration_data(resource_id, **field_selection(step))
+                else:
+                    return unsupported_resource_result(resource_type)
 
-            return {
-                "status": "success",
-                "action": "load_resource",
-                "resource_type": resource_type,
-                "resource_id": resource_id,
-                "data": resource_data
-            }
+            return loaded_resource_result(resource_type, resource_id, resource_data,
+                                          field_selection(step).get("fields"))
 
         except requests.RequestException as e:
             return {
@@ -211,21 +506,27 @@ class YAMLExecutor:
                 "error": str(e)
             }
 
-    def add_properties_to_blueprint(self, step: Step) -> Dict[str, Any]:
+    def prepare_properties_update(self, step: Step) -> Dict[str, Any]:
         """
-        Action handler for adding properties to a blueprint.
+        Build the PATCH payload for add_properties_to_blueprint.
+        Returns a 'ready' dictionary with identifier and payload, or a failed step result.
         """
-        # Parse blueprint_data if it is a JSON string
-        blueprint_data_str = step.details.get("blueprint_data", "")
-        try:
-            blueprint_data = ast.literal_eval(blueprint_data_str) if isinstance(blueprint_data_str,
-                                                                                str) else blueprint_data_str
-        except (ValueError, SyntaxError) as e:
-            return {"status": "failed", "action": "add_properties_to_blueprint",
-                    "error": "Invalid format in blueprint_data", "details": str(e)}
+        # An explicit identifier, e.g. "{{ steps.X.result.data.blueprint.identifier }}", skips blueprint_data
+        if "blueprint_identifier" in step.details:
+            blueprint_identifier = resolved_identifier(step.details["blueprint_identifier"])
+        else:
+            # Parse blueprint_data if it is a string representation of the result
+            blueprint_data_str = step.details.get("blueprint_data", "")
+            try:
+                blueprint_data = ast.literal_eval(blueprint_data_str) if isinstance(blueprint_data_str,
+                                                                                    str) else blueprint_data_str
+            except (ValueError, SyntaxError) as e:
+                return {"status": "failed", "action": "add_properties_to_blueprint",
+                        "error": "Invalid format in blueprint_data", "details": str(e)}
 
-        # Extract the blueprint identifier from the parsed data
-        blueprint_identifier = blueprint_data.get("data", {}).get("blueprint", {}).get("identifier")
+            # Extract the blueprint identifier from the parsed data
+            blueprint_identifier = resolved_identifier(
+                blueprint_data.get("data", {}).get("blueprint", {}).get("identifier"))
 
         if not blueprint_identifier:
             return {"status": "failed", "action": "add_properties_to_blueprint",
@@ -243,57 +544,228 @@ class YAMLExecutor:
             },
             "aggregationProperties": prepare_aggregation_properties(aggregation_properties)
         }
+        return {"status": "ready", "identifier": blueprint_identifier, "payload": payload}
+
+    def add_properties_to_blueprint(self, step: Step) -> Dict[str, Any]:
+        """
+        Action handler for adding properties to a blueprint.
+        """
+        with timed_phase("payload"):
+            prepared = self.prepare_properties_update(step)
+        if prepared["status"] != "ready":
+            return prepared
+
+        diff = None
+        if self.write_mode != "apply":
+            try:
+                with timed_phase("port_call"):
+                    blueprint = self.current_blueprint(step, prepared["identifier"])
+            except requests.RequestException as e:
+                return {"status": "failed", "action": "add_properties_to_blueprint",
+                        "error": "Could not load the current blueprint", "details": str(e)}
+            diff = diff_properties_payload(prepared["payload"], blueprint)
+            if self.write_mode == "dry_run":
+                return dry_run_result("add_properties_to_blueprint", diff)
+            if diff["payload"] is None:
+                return with_diff({"status": "success", "action": "add_properties_to_blueprint",
+                                  "properties_added": {}}, diff)
+            prepared["payload"] = diff["payload"]
+
+        if self.batch_writes:
+            # Merged with other steps' changes to the same blueprint and sent by flush_writes
+            return with_diff(self.write_batcher.add(prepared["identifier"], step.step_number, prepared["payload"]),
+                             diff)
 
         # Send the PATCH request to update the blueprint
-        response = self.port_api.update_blueprint(blueprint_identifier, payload)
-        if response['status'] == 'success':
-            return {"status": "success", "action": "add_properties_to_blueprint", "properties_added": payload}
-        else:
-            return {"status": "failed", "action": "add_properties_to_blueprint", "error": response['error'], "details": response['details']}
+        with timed_phase("port_call"):
+            response = self.port_api.update_blueprint(prepared["identifier"], prepared["payload"])
+        return with_diff(properties_update_result(prepared["payload"], response), diff)
 
-    def add_scorecards_to_blueprint(self, step: Step) -> Dict[str, Any]:
+    def current_blueprint(self, step: Step, identifier: str) -> Dict[str, Any]:
         """
-        Action handler for adding scorecards to a blueprint.
+        The blueprint state a diff-mode write is compared with: the blueprint the step
+        received from load_resource, or a fresh read when it only has an identifier or
+        loaded just some fields.
+        """
+        blueprint = loaded_blueprint(step.details.get("blueprint_data"))
+        if blueprint is None or blueprint.get("identifier") != identifier:
+            blueprint = loaded_blueprint(self.port_api.get_blueprint_data(identifier))
+        return blueprint or {}
+
+    def prepare_scorecard_creation(self, step: Step) -> Dict[str, Any]:
+        """
+        Build the scorecard creation payloads for add_scorecards_to_blueprint.
+        Returns a 'ready' dictionary with identifier, scorecards and payloads, or a failed step result.
         """
         blueprint_data = step.details.get("blueprint_data", "")
         scorecards = step.details.get("scorecards", [])
 
-        # Use the helper function to get the blueprint identifier
-        result = get_blueprint_identifier(blueprint_data)
-        if result["status"] == "failed":
-            return {"status": "failed", "action": "add_scorecards_to_blueprint", "error": result["error"]}
+        if "blueprint_identifier" in step.details:
+            blueprint_identifier = resolved_identifier(step.details["blueprint_identifier"])
+            if not blueprint_identifier:
+                return {"status": "failed", "action": "add_scorecards_to_blueprint",
+                        "error": "Blueprint identifier not found in data"}
+        else:
+            # Use the helper function to get the blueprint identifier
+            result = get_blueprint_identifier(blueprint_data)
+            if result["status"] == "failed":
+                return {"status": "failed", "action": "add_scorecards_to_blueprint", "error": result["error"]}
 
-        blueprint_identifier = result["identifier"]
+            blueprint_identifier = result["identifier"]
 
         # Ensure there is at least one scorecard
         if not scorecards:
             return {"status": "failed", "action": "add_scorecards_to_blueprint", "error": "No scorecards provided"}
 
-        # Take only the first scorecard
-        scorecard = scorecards[0]
+        return {"status": "ready", "identifier": blueprint_identifier, "scorecards": list(scorecards),
+                "payloads": [build_scorecard_payload(scorecard) for scorecard in scorecards]}
 
-        # Prepare the payload for the scorecard creation API
-        payload = {
-            "identifier": scorecard["identifier"],
-            "title": scorecard["name"],
-            "rules": [
-                {
-                    "identifier": rule["identifier"],
-                    "title": rule["title"],
-                    "level": rule["level"],
-                    "query": json.loads(rule["query"])  # Parse the query string to a JSON object
-                } for rule in scorecard["rules"]
-            ]
-        }
+    def add_scorecards_to_blueprint(self, step: Step) -> Dict[str, Any]:
+        """
+        Action handler for adding scorecards to a blueprint.
+        """
+        with timed_phase("payload"):
+            prepared = self.prepare_scorecard_creation(step)
+        if prepared["status"] != "ready":
+            return prepared
 
-        # Send the request to create the scorecard in Port
-        response = self.port_api.create_scorecard(blueprint_identifier, payload)
+        identifier = prepared["identifier"]
+        payloads = prepared["payloads"]
+        diff = None
+        writes = [(index, "create") for index in range(len(payloads))]
+        if self.write_mode != "apply":
+            try:
+                with timed_phase("port_call"):
+                    current = self.port_api.get_scorecards(identifier)
+            except requests.RequestException as e:
+                return {"status": "failed", "action": "add_scorecards_to_blueprint",
+                        "error": "Could not load the current scorecards", "details": str(e)}
+            diff = diff_scorecards(payloads, current)
+            if self.write_mode == "dry_run":
+                return dry_run_result("add_scorecards_to_blueprint", diff)
+            writes = diff["writes"]
 
-        if response["status"] == "success":
-            return {"status": "success", "action": "add_scorecards_to_blueprint", "scorecards_added": [scorecard]}
-        else:
-            return {"status": "failed", "action": "add_scorecards_to_blueprint", "error": response["error"],
-                    "details": response["details"]}
+        # Create (or update) the scorecards in Port, at most write_concurrency at a time
+        with timed_phase("port_call"):
+            if len(writes) <= 1:
+                responses = [self.write_scorecard(identifier, change, payloads[index]) for index, change in writes]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.write_concurrency, len(writes))) as pool:
+                    # Each call runs in a copy of this context so its HTTP timings land on this step
+                    futures = [pool.submit(contextvars.copy_context().run, self.write_scorecard,
+                                           identifier, change, payloads[index]) for index, change in writes]
+                    responses = [future.result() for future in futures]
+        scorecards = [prepared["scorecards"][index] for index, _ in writes]
+        return with_diff(scorecard_creation_result(scorecards, responses), diff)
+
+    def write_scorecard(self, identifier: str, change: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if change == "update":
+            return self.port_api.update_scorecard(identifier, payload)
+        return self.port_api.create_scorecard(identifier, payload)
+
+    async def load_resource_async(self, step: Step) -> Dict[str, Any]:
+        """
+        Async action handler for loading a resource through AsyncPortAPI.
+        """
+        resource_type = step.resource_type
+        resource_id = step.resource_id
+
+        try:
+            with timed_phase("port_call"):
+                if resource_type == "blueprint":
+                    resource_data = await self.async_port_api.get_blueprint_data(resource_id, **field_selection(step))
+                elif resource_type == "integration":
+                    resource_data = await self.async_port_api.get_integration_data(resource_id,
+                                                                                   **field_selection(step))
+                else:
+                    return unsupported_resource_result(resource_type)
+
+            return loaded_resource_result(resource_type, resource_id, resource_data,
+                                          field_selection(step).get("fields"))
+
+        except self.async_port_api.REQUEST_ERRORS as e:
+            return {
+                "status": "error",
+                "action": "load_resource",
+                "error": str(e)
+            }
+
+    async def add_properties_to_blueprint_async(self, step: Step) -> Dict[str, Any]:
+        """
+        Async action handler for adding properties to a blueprint.
+        """
+        with timed_phase("payload"):
+            prepared = self.prepare_properties_update(step)
+        if prepared["status"] != "ready":
+            return prepared
+
+        diff = None
+        if self.write_mode != "apply":
+            try:
+                with timed_phase("port_call"):
+                    blueprint = await self.current_blueprint_async(step, prepared["identifier"])
+            except self.async_port_api.REQUEST_ERRORS as e:
+                return {"status": "failed", "action": "add_properties_to_blueprint",
+                        "error": "Could not load the current blueprint", "details": str(e)}
+            diff = diff_properties_payload(prepared["payload"], blueprint)
+            if self.write_mode == "dry_run":
+                return dry_run_result("add_properties_to_blueprint", diff)
+            if diff["payload"] is None:
+                return with_diff({"status": "success", "action": "add_properties_to_blueprint",
+                                  "properties_added": {}}, diff)
+            prepared["payload"] = diff["payload"]
+
+        if self.batch_writes:
+            return with_diff(self.write_batcher.add(prepared["identifier"], step.step_number, prepared["payload"]),
+                             diff)
+
+        with timed_phase("port_call"):
+            response = await self.async_port_api.update_blueprint(prepared["identifier"], prepared["payload"])
+        return with_diff(properties_update_result(prepared["payload"], response), diff)
+
+    async def current_blueprint_async(self, step: Step, identifier: str) -> Dict[str, Any]:
+        blueprint = loaded_blueprint(step.details.get("blueprint_data"))
+        if blueprint is None or blueprint.get("identifier") != identifier:
+            blueprint = loaded_blueprint(await self.async_port_api.get_blueprint_data(identifier))
+        return blueprint or {}
+
+    async def add_scorecards_to_blueprint_async(self, step: Step) -> Dict[str, Any]:
+        """
+        Async action handler for adding scorecards to a blueprint.
+        """
+        with timed_phase("payload"):
+            prepared = self.prepare_scorecard_creation(step)
+        if prepared["status"] != "ready":
+            return prepared
+
+        identifier = prepared["identifier"]
+        payloads = prepared["payloads"]
+        diff = None
+        writes = [(index, "create") for index in range(len(payloads))]
+        if self.write_mode != "apply":
+            try:
+                with timed_phase("port_call"):
+                    current = await self.async_port_api.get_scorecards(identifier)
+            except self.async_port_api.REQUEST_ERRORS as e:
+                return {"status": "failed", "action": "add_scorecards_to_blueprint",
+                        "error": "Could not load the current scorecards", "details": str(e)}
+            diff = diff_scorecards(payloads, current)
+            if self.write_mode == "dry_run":
+                return dry_run_result("add_scorecards_to_blueprint", diff)
+            writes = diff["writes"]
+
+        semaphore = asyncio.Semaphore(self.write_concurrency)
+
+        async def write(index, change):
+            async with semaphore:
+                if change == "update":
+                    return await self.async_port_api.update_scorecard(identifier, payloads[index])
+                return await self.async_port_api.create_scorecard(identifier, payloads[index])
+
+        with timed_phase("port_call"):
+            responses = await asyncio.gather(*(write(index, change) for index, change in writes))
+        scorecards = [prepared["scorecards"][index] for index, _ in writes]
+        return with_diff(scorecard_creation_result(scorecards, list(responses)), diff)
 
     def upsert_integration(self, step: Step) -> Dict[str, Any]:
         """
@@ -303,26 +775,324 @@ class YAMLExecutor:
         # Simulate upserting an integration
         return {"status": "mock_done_nothing", "action": "upsert_integration", "integration_data": integration_data}
 
-    def execute_steps(self) -> List[Dict[str, Any]]:
+    def resolve_step(self, step: Step) -> None:
         """
-        Execute each step in the execution plan, resolving placeholders as needed.
+        Resolve placeholders in a step just before it runs, including inside nested
+        lists and dicts. Only fields and containers that hold placeholders are copied;
+        everything else stays shared with the step's spec.
         """
-        results = []
-        for step in self.steps:
-            # Resolve placeholders just before executing the step
-            step.resource_type = self.resolve_placeholders(step.resource_type)
-            step.resource_id = self.resolve_placeholders(step.resource_id)
-            step.details = {key: self.resolve_placeholders(value) for key, value in step.details.items()}
+        compiled = step.compiled or compile_step(step.spec)
+        if is_template(compiled["resource_type"]):
+            step.resource_type = render_value(compiled["resource_type"], self.inputs, self.steps_by_name)
+        if is_template(compiled["resource_id"]):
+            step.resource_id = render_value(compiled["resource_id"], self.inputs, self.steps_by_name)
+        if is_template(compiled["details"]):
+            step.details = render_value(compiled["details"], self.inputs, self.steps_by_name)
+
+    def finish_step(self, step: Step, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Tag a step result with its position and name, and report it to the step hooks
+        and on_step_complete.
+        """
+        result["step_number"] = step.step_number
+        result["step_name"] = step.step_name
+        # Batched writes are reported by flush_writes once their PATCH has been sent
+        if result.get("status") != "pending":
+            self.report_step(step, result)
+        self.release_finished(step)
+        return result
+
+    def report_step(self, step: Step, result: Dict[str, Any]) -> None:
+        timings = self.step_timings.get(step.step_number)
+        hooks.emit_step({"step_number": step.step_number, "step_name": step.step_name, "action": step.action,
+                         "status": result.get("status"), "timings": timings.as_dict() if timings else {}})
+        self.notify_step_complete(result)
+
+    def notify_step_complete(self, result: Dict[str, Any]) -> None:
+        if self.checkpointing and not result.get("resumed"):
+            self.checkpoint_store.save_step(self.run_id, result["step_number"], result)
+        if self.on_step_complete is not None:
+            self.on_step_complete(result)
+
+    def release_finished(self, step: Step) -> None:
+        """
+        Count a finished step against the steps it references, and release the data of
+        each one (this step included) that no step still waiting to run references.
+        """
+        if not self.release_results:
+            return
+        with self._release_lock:
+            done = [dependency for dependency in self.step_dependencies.get(step.step_number, ())
+                    if self._consumer_finished(dependency)]
+            if not self._unfinished_consumers.get(step.step_number):
+                done.append(step.step_number)
+        for step_number in done:
+            release_result(self.steps_by_number[step_number].result)
+
+    def _consumer_finished(self, step_number: int) -> bool:
+        self._unfinished_consumers[step_number] -= 1
+        return self._unfinished_consumers[step_number] == 0
+
+    def execute_step(self, step: Step) -> Dict[str, Any]:
+        """
+        Resolve placeholders for a single step and run its action handler.
+        """
+        if step.step_number in self.restored:
+            step.result = dict(self.restored[step.step_number], resumed=True)
+            return self.finish_step(step, step.result)
+
+        timings = self.step_timings[step.step_number] = StepTimings()
+        with step_scope(timings):
+            if self.depends_on_pending_writes(step):
+                with timings.phase("flush_writes"):
+                    self.flush_writes()
+            with timings.phase("resolve"):
+                self.resolve_step(step)
 
             # Look up the handler based on the action name
             handler = self.action_registry.get(step.action)
             if handler:
-                result = handler(step)
+                with timings.phase("handler"):
+                    result = handler(step)
+                step.result = result
+            else:
+                result = {"step_number": step.step_number, "status": "unknown action", "action": step.action}
+
+        return self.finish_step(step, result)
+
+    def execute_step_batch(self, steps: List[Step]) -> List[Dict[str, Any]]:
+        """
+        Run consecutive, independent steps of a batchable plugin action with a single
+        handler call. The handler's time is recorded on the first step.
+        """
+        for step in steps:
+            timings = self.step_timings[step.step_number] = StepTimings()
+            with step_scope(timings):
+                if self.depends_on_pending_writes(step):
+                    with timings.phase("flush_writes"):
+                        self.flush_writes()
+                with timings.phase("resolve"):
+                    self.resolve_step(step)
+
+        timings = self.step_timings[steps[0].step_number]
+        with step_scope(timings), timings.phase("handler"):
+            results = self.batch_action_registry[steps[0].action](steps)
+        for step, result in zip(steps, results):
+            step.result = result
+        return [self.finish_step(step, result) for step, result in zip(steps, results)]
+
+    def batch_groups(self) -> List[List[Step]]:
+        """
+        Split the plan into runs of steps executed together: consecutive steps of one
+        batchable action, none of which depends on another, or single steps.
+        """
+        groups: List[List[Step]] = []
+        for step in self.steps:
+            group = groups[-1] if groups else None
+            if (group and step.action == group[0].action and step.action in self.batch_action_registry
+                    and step.step_number not in self.restored and group[0].step_number not in self.restored
+                    and not self.step_dependencies.get(step.step_number, set()) & {s.step_number for s in group}):
+                group.append(step)
+            else:
+                groups.append([step])
+        return groups
+
+    async def execute_step_async(self, step: Step) -> Dict[str, Any]:
+        """
+        Async counterpart of execute_step. Actions without a coroutine handler run
+        in a worker thread so they don't block the event loop.
+        """
+        if step.step_number in self.restored:
+            step.result = dict(self.restored[step.step_number], resumed=True)
+            return self.finish_step(step, step.result)
+
+        timings = self.step_timings[step.step_number] = StepTimings()
+        with step_scope(timings):
+            if self.depends_on_pending_writes(step):
+                with timings.phase("flush_writes"):
+                    await self.flush_writes_async()
+            with timings.phase("resolve"):
+                self.resolve_step(step)
+
+            async_handler = self.async_action_registry.get(step.action)
+            handler = self.action_registry.get(step.action)
+            if async_handler:
+                with timings.phase("handler"):
+                    result = await async_handler(step)
+                step.result = result
+            elif handler:
+                with timings.phase("handler"):
+                    result = await asyncio.to_thread(handler, step)
                 step.result = result
             else:
                 result = {"step_number": step.step_number, "status": "unknown action", "action": step.action}
 
-            result["step_number"] = step.step_number
-            result["step_name"] = step.step_name
-            results.append(result)
-        return results
\ No newline at end of file
+        return self.finish_step(step, result)
+
+    @property
+    def checkpointing(self) -> bool:
+        # Dry runs change nothing, so there is nothing worth resuming
+        return self.checkpoint_store is not None and self.write_mode != "dry_run"
+
+    def restore_checkpoint(self) -> None:
+        """
+        Start this run in the checkpoint store, or resume it if run_id was checkpointed
+        before: steps that completed in an earlier attempt keep their saved results
+        (also for placeholders) and are not executed again.
+        """
+        if not self.checkpointing:
+            return
+        fingerprint = plan_fingerprint(self.steps)
+        saved = self.checkpoint_store.load_run(self.run_id)
+        if saved is not None:
+            if saved.fingerprint != fingerprint:
+                raise CheckpointMismatchError(f"Workflow changed since run {self.run_id} was checkpointed")
+            for step in self.steps:
+                result = saved.step_results.get(step.step_number)
+                if result is not None and result.get("status") in COMPLETED_STEP_STATUSES:
+                    self.restored[step.step_number] = result
+                    step.result = result
+        self.checkpoint_store.start_run(self.run_id, self.workflow_filename, self.inputs, fingerprint)
+
+    def finish_checkpoint(self, results: List[Dict[str, Any]]) -> None:
+        if not self.checkpointing:
+            return
+        completed = all(result.get("status") in COMPLETED_STEP_STATUSES for result in results)
+        self.checkpoint_store.finish_run(self.run_id, COMPLETED if completed else FAILED)
+
+    def timing_report(self) -> Dict[str, Any]:
+        """
+        Wall/CPU seconds per run-level phase, and per step: phases plus every Port API call.
+        """
+        steps = []
+        for step in self.steps:
+            timings = self.step_timings.get(step.step_number)
+            if timings is not None:
+                steps.append({"step_number": step.step_number, "step_name": step.step_name,
+                              "action": step.action, **timings.as_dict()})
+        return {"run": self.run_timings.as_dict(), "steps": steps}
+
+    def run_report(self, mode: str, started_at: float, wall: float,
+                   results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        What hooks.emit_run reports about a finished run: its identity and timings, plus
+        each step's status, wall seconds and error.
+        """
+        steps = []
+        for step, result in zip(self.steps, results):
+            timings = self.step_timings.get(step.step_number)
+            # payload and port_call are measured inside handler, so they're not added again
+            wall_seconds = sum(timings.phases.get(phase, {}).get("wall", 0.0)
+                               for phase in ("flush_writes", "resolve", "handler")) if timings is not None else 0.0
+            steps.append({"step_number": step.step_number, "step_name": step.step_name, "action": step.action,
+                          "status": result.get("status"), "wall": wall_seconds, "error": result.get("error")})
+        return {"mode": mode, "run_id": self.run_id, "filename": self.workflow_filename, "inputs": self.inputs,
+                "write_mode": self.write_mode, "started_at": started_at, "wall": wall, "steps": len(self.steps),
+                "phases": self.run_timings.as_dict(), "results": steps}
+
+    def depends_on_pending_writes(self, step: Step) -> bool:
+        """
+        True when the step depends on a batched write that hasn't been sent yet.
+        """
+        if not self.batch_writes:
+            return False
+        return bool(self.step_dependencies.get(step.step_number, set()) & self.write_batcher.pending_steps())
+
+    def flush_writes(self) -> None:
+        """
+        Send every pending batched property update, one PATCH per blueprint.
+        """
+        with self._flush_lock:
+            batches = self.write_batcher.drain()
+            if not batches:
+                return
+            with ThreadPoolExecutor(max_workers=min(self.write_concurrency, len(batches))) as pool:
+                responses = list(pool.map(lambda batch: self.port_api.update_blueprint(batch.identifier,
+                                                                                       batch.payload), batches))
+            for batch, response in zip(batches, responses):
+                self.write_batcher.complete(batch, response)
+                for entry in batch.entries:
+                    self.report_step(self.steps_by_number[entry["step_number"]], entry["result"])
+
+    async def flush_writes_async(self) -> None:
+        """
+        Async counterpart of flush_writes.
+        """
+        async with self._async_flush_lock:
+            batches = self.write_batcher.drain()
+            semaphore = asyncio.Semaphore(self.write_concurrency)
+
+            async def send(batch):
+                async with semaphore:
+                    response = await self.async_port_api.update_blueprint(batch.identifier, batch.payload)
+                self.write_batcher.complete(batch, response)
+                for entry in batch.entries:
+                    self.report_step(self.steps_by_number[entry["step_number"]], entry["result"])
+
+            await asyncio.gather(*(send(batch) for batch in batches))
+
+    def _index_dependencies(self) -> Dict[int, Set[int]]:
+        dependencies = build_dependency_graph(self.steps)
+        self.step_dependencies = {
+            self.steps[position].step_number: {self.steps[dep].step_number for dep in deps}
+            for position, deps in dependencies.items()
+        }
+        self._unfinished_consumers = {step.step_number: 0 for step in self.steps}
+        for deps in self.step_dependencies.values():
+            for dependency in deps:
+                self._unfinished_consumers[dependency] += 1
+        return dependencies
+
+    def execute_steps(self) -> List[Dict[str, Any]]:
+        """
+        Execute each step in the execution plan, resolving placeholders as needed.
+
+        With max_workers > 1, steps run as soon as the steps whose results they
+        reference (or list under `depends_on`) have finished, so independent steps
+        overlap. Results are always returned in plan order.
+
+        With batch_writes, property updates are held back and merged per blueprint.
+        They are sent before any step that depends on them runs, and at the end of the run.
+
+        When steps run in order, consecutive independent steps of a batchable plugin
+        action are handed to the plugin together.
+        """
+        started_at, start = time.time(), time.perf_counter()
+        self.restore_checkpoint()
+        dependencies = self._index_dependencies()
+        with self.run_timings.phase("execute"):
+            if self.max_workers <= 1:
+                results = []
+                for group in self.batch_groups():
+                    results.extend(self.execute_step_batch(group) if len(group) > 1 else
+                                   [self.execute_step(group[0])])
+            else:
+                results = run_dependency_graph(self.steps, dependencies, self.execute_step, self.max_workers)
+
+        with self.run_timings.phase("flush_writes"):
+            self.flush_writes()
+        self.finish_checkpoint(results)
+        hooks.emit_run(self.run_report("sync", started_at, time.perf_counter() - start, results))
+        return results
+
+    async def execute_steps_async(self) -> List[Dict[str, Any]]:
+        """
+        Execute the plan on the running event loop using async_port_api, following
+        the same dependency rules as execute_steps. Results are returned in plan order.
+        """
+        if self.async_port_api is None:
+            raise ValueError("execute_steps_async requires an AsyncPortAPI instance")
+
+        started_at, start = time.time(), time.perf_counter()
+        self.restore_checkpoint()
+        dependencies = self._index_dependencies()
+        self._async_flush_lock = asyncio.Lock()
+        async with self.async_port_api.session():
+            with self.run_timings.phase("execute"):
+                results = await run_dependency_graph_async(self.steps, dependencies, self.execute_step_async,
+                                                           max(self.max_workers, 1))
+            with self.run_timings.phase("flush_writes"):
+                await self.flush_writes_async()
+        self.finish_checkpoint(results)
+        hooks.emit_run(self.run_report("async", started_at, time.perf_counter() - start, results))
+        return results
@@ -0,0 +1,194 @@
+# tests/conftest.py
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.api_clients.streaming import normalize_fields, project
+from src.yaml_handler.workflow_registry import CompiledWorkflow, compile_workflow
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+
+class PortStub:
+    """
+    Minimal local stand-in for the Port API. Responses are queued per (method, path);
+    when a queue is empty the route's default response is returned.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.queued = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.token_counter = 0
+        self.expires_in = 3600
+        self.delay = 0.0  # Seconds each response is held back, to make concurrent requests overlap
+        self.add_route("GET", "/v1/blueprints/service",
+                       200, {"ok": True, "blueprint": {"identifier": "service"}})
+
+    def add_route(self, method, path, status, body, headers=None):
+        self.routes[(method, path)] = (status, body, headers or {})
+
+    def queue(self, method, path, status, body, headers=None):
+        self.queued.setdefault((method, path), []).append((status, body, headers or {}))
+
+    def respond(self, method, path, body):
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.requests.append((method, path, body))
+            if (method, path) == ("POST", "/v1/auth/access_token"):
+                self.token_counter += 1
+                return 200, {"accessToken": f"token-{self.token_counter}",
+                             "expiresIn": self.expires_in}, {}
+            if self.queued.get((method, path)):
+                return self.queued[(method, path)].pop(0)
+            return self.routes.get((method, path), (404, {"ok": False}, {}))
+
+    def count(self, method, path):
+        return sum(1 for request in self.requests if request[:2] == (method, path))
+
+
+class FakePortAPI:
+    """
+    In-process stand-in for PortAPI in executor tests. Every call is recorded in calls
+    as (method, identifier, argument); reads return blueprint and scorecards, writes
+    echo their payload back.
+    """
+    READS = ("get_blueprint_data", "get_integration_data", "get_scorecards")
+
+    def __init__(self, blueprint=None, scorecards=(), delay=0.0, fail_writes=False, reject=()):
+        self.blueprint = blueprint  # None: a blueprint with just the requested identifier
+        self.scorecards = list(scorecards)
+        self.delay = delay  # Seconds each call takes, to make concurrent calls overlap
+        self.fail_writes = fail_writes  # Writes get Port's error result instead of succeeding
+        self.reject = set(reject)  # Entity identifiers bulk upserts report as rejected
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def _call(self, method, identifier, argument=None):
+        with self.lock:
+            self.calls.append((method, identifier, argument))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+    def _write(self, method, identifier, payload):
+        self._call(method, identifier, payload)
+        if self.fail_writes:
+            return {"status": "error", "error": "503 Server Error", "details": ""}
+        return {"status": "success", "data": payload}
+
+    def count(self, method):
+        return sum(1 for call in self.calls if call[0] == method)
+
+    def arguments(self, method):
+        return [call[2] for call in self.calls if call[0] == method]
+
+    @property
+    def writes(self):
+        return [call for call in self.calls if call[0] not in self.READS]
+
+    def get_blueprint_data(self, blueprint_id, fields=None):
+        self._call("get_blueprint_data", blueprint_id, fields)
+        data = {"ok": True, "blueprint": self.blueprint or {"identifier": blueprint_id}}
+        return project(data, normalize_fields(fields)) if fields else data
+
+    def get_integration_data(self, integration_id, fields=None):
+        self._call("get_integration_data", integration_id, fields)
+        data = {"ok": True, "integration": {"identifier": integration_id}}
+        return project(data, normalize_fields(fields)) if fields else data
+
+    def get_scorecards(self, blueprint_identifier):
+        self._call("get_scorecards", blueprint_identifier)
+        return self.scorecards
+
+    def update_blueprint(self, blueprint_identifier, payload):
+        return self._write("update_blueprint", blueprint_identifier, payload)
+
+    def create_scorecard(self, blueprint_identifier, payload):
+        return self._write("create_scorecard", blueprint_identifier, payload)
+
+    def update_scorecard(self, blueprint_identifier, payload):
+        return self._write("update_scorecard", blueprint_identifier, payload)
+
+    def bulk_upsert_entities(self, blueprint_identifier, entities, merge=True):
+        self._call("bulk_upsert_entities", blueprint_identifier, entities)
+        errors = [{"identifier": entity["identifier"], "message": "rejected"} for entity in entities
+                  if entity["identifier"] in self.reject]
+        return {"status": "success", "data": {"ok": True, "errors": errors}}
+
+
+def run_workflow(port_api, workflow, inputs=None, filename="workflow.yml", **options):
+    """
+    Run a workflow, given as a compiled plan or as parsed YAML, and return the executor and its results.
+    """
+    if not isinstance(workflow, CompiledWorkflow):
+        workflow = compile_workflow(filename, workflow)
+    executor = YAMLExecutor(options.pop("yaml_folder", ""), port_api, inputs or {}, **options)
+    executor.use_workflow(workflow)
+    return executor, executor.execute_steps()
+
+
+@pytest.fixture
+def port_stub():
+    stub = PortStub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            status, body, headers = stub.respond(self.command, self.path, json.loads(raw) if raw else None)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def web_app(tmp_path_factory):
+    """
+    The Flask app module, imported once with its databases in a temporary folder.
+    Tests swap its Port client with monkeypatch.setattr(web_app, "port_api", ...).
+    """
+    folder = tmp_path_factory.mktemp("web_app")
+    databases = {name: str(folder / f"{name.lower()}.db") for name in ("CHECKPOINT_DB", "RUN_HISTORY_DB", "JOBS_DB")}
+    previous = {name: os.environ.get(name) for name in databases}
+    os.environ.update(databases)
+    try:
+        from src.web_app import app
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name)
+            else:
+                os.environ[name] = value
+    return app
+
@@ -0,0 +1,140 @@
+# tests/test_actions.py
+
+import json
+
+from conftest import FakePortAPI
+
+from src.yaml_handler.actions import ActionPlugin, ActionRegistry
+from src.yaml_handler.bulk_entities import BULK_UPSERT_ENTITIES, read_entity_chunks
+from src.yaml_handler.workflow_registry import compile_workflow
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+CSV = "id,name,tier,on_call,team\n" + "".join(f"svc-{n},Service {n},{n % 3},{'true' if n % 2 else ''},t{n}\n"
+                                              for n in range(45))
+
+
+def test_csv_chunks_are_mapped_and_typed(tmp_path):
+    path = tmp_path / "services.csv"
+    path.write_text(CSV)
+    mapping = {"identifier": "id", "title": "name", "properties": {"tier": "tier", "on_call": "on_call"},
+               "relations": {"team": "team"}}
+
+    chunks = list(read_entity_chunks(str(path), 20, mapping, {"tier": "number", "on_call": "boolean"}))
+
+    assert [len(chunk) for chunk in chunks] == [20, 20, 5]
+    assert chunks[0][1] == {"identifier": "svc-1", "title": "Service 1", "properties": {"tier": 1, "on_call": True},
+                            "relations": {"team": "t1"}}
+    # Empty cells are left out instead of clearing the property
+    assert chunks[0][0]["properties"] == {"tier": 0}
+
+
+def test_jsonl_lines_are_taken_as_entities(tmp_path):
+    path = tmp_path / "services.jsonl"
+    path.write_text("\n".join(json.dumps({"identifier": f"svc-{n}", "properties": {}}) for n in range(3)))
+    assert list(read_entity_chunks(str(path), 2)) == [[{"identifier": "svc-0", "properties": {}},
+                                                      {"identifier": "svc-1", "properties": {}}],
+                                                     [{"identifier": "svc-2", "properties": {}}]]
+
+
+def test_jsonl_lines_that_are_not_objects_fail_the_step(tmp_path):
+    (tmp_path / "list.jsonl").write_text('{"identifier": "svc-0", "properties": {}}\n[1, 2]\n')
+    (tmp_path / "mapped.jsonl").write_text('{"id": "svc-0", "name": "Service 0"}\n"svc-1"\n')
+    port_api = FakePortAPI()
+    executor = YAMLExecutor(str(tmp_path), port_api, {}, actions=ActionRegistry([BULK_UPSERT_ENTITIES]))
+    executor.use_workflow(compile_workflow("bulk.yml", {"steps": [
+        {"name": "Unmapped", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": "list.jsonl", "chunk_size": 1},
+        {"name": "Mapped", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": "mapped.jsonl", "mapping": {"identifier": "id", "title": "name"}},
+    ]}))
+
+    results = executor.execute_steps()
+
+    assert [result["status"] for result in results] == ["failed", "failed"]
+    assert all("Line 2 is not a JSON object" in result["error"] for result in results)
+    assert [entity for _, _, entities in port_api.calls for entity in entities] == [
+        {"identifier": "svc-0", "properties": {}}]
+
+
+def bulk_workflow(*files):
+    return compile_workflow("bulk.yml", {"steps": [
+        {"name": f"Import {index}", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": file, "mapping": {"identifier": "id", "title": "name"}, "concurrency": 3}
+        for index, file in enumerate(files)
+    ]})
+
+
+def test_bulk_upsert_sends_chunks_and_reports_rejected_entities(tmp_path):
+    (tmp_path / "a.csv").write_text(CSV)
+    port_api = FakePortAPI(reject={"svc-7"})
+    executor = YAMLExecutor(str(tmp_path), port_api, {}, actions=ActionRegistry([BULK_UPSERT_ENTITIES]))
+    executor.use_workflow(bulk_workflow("a.csv", "missing.csv"))
+
+    results = executor.execute_steps()
+
+    assert sum(len(entities) for _, _, entities in port_api.calls) == 45
+    assert all(len(entities) <= 20 for _, _, entities in port_api.calls)
+    assert results[0]["status"] == "failed"
+    assert (results[0]["entities"], results[0]["failed"], results[0]["failed_entities"]) == (45, 1, ["svc-7"])
+    assert results[1]["status"] == "failed" and "FileNotFoundError" in results[1]["error"]
+
+
+def test_bulk_upsert_rejects_files_outside_the_workflow_folder_and_bad_settings(tmp_path):
+    folder = tmp_path / "workflows"
+    folder.mkdir()
+    (folder / "a.csv").write_text(CSV)
+    (tmp_path / "secret.csv").write_text(CSV)
+    port_api = FakePortAPI()
+    executor = YAMLExecutor(str(folder), port_api, {"file": "../secret.csv"},
+                            actions=ActionRegistry([BULK_UPSERT_ENTITIES]))
+    executor.use_workflow(compile_workflow("bulk.yml", {"steps": [
+        {"name": "Input", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": "{{ inputs.file }}"},
+        {"name": "Absolute", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": str(tmp_path / "secret.csv")},
+        {"name": "Chunks", "action": "bulk_upsert_entities", "blueprint_identifier": "service",
+         "file": "a.csv", "chunk_size": "lots"},
+    ]}))
+
+    results = executor.execute_steps()
+
+    assert [result["error"] for result in results] == ["Entity file must be inside the workflow folder"] * 2 + [
+        "chunk_size and concurrency must be integers"]
+    assert port_api.calls == []
+
+
+def test_consecutive_batchable_steps_share_one_handler_call(tmp_path):
+    (tmp_path / "a.csv").write_text(CSV)
+    batches = []
+
+    def batch_handler(executor, steps):
+        batches.append([step.step_name for step in steps])
+        return BULK_UPSERT_ENTITIES.batch_handler(executor, steps)
+
+    plugin = ActionPlugin("bulk_upsert_entities", BULK_UPSERT_ENTITIES.handler, batch_handler=batch_handler)
+    executor = YAMLExecutor(str(tmp_path), FakePortAPI(), {}, write_mode="dry_run",
+                            actions=ActionRegistry([plugin]))
+    executor.use_workflow(bulk_workflow("a.csv", "a.csv"))
+
+    results = executor.execute_steps()
+
+    assert batches == [["Import 0", "Import 1"]]
+    assert [(result["status"], result["entities"]) for result in results] == [("dry_run", 45), ("dry_run", 45)]
+
+
+def test_plugins_load_from_a_directory_and_replace_built_ins(tmp_path):
+    (tmp_path / "greeting.py").write_text(
+        "from src.yaml_handler.actions import ActionPlugin\n"
+        "ACTIONS = [ActionPlugin('upsert_integration', lambda executor, step: "
+        "{'status': 'success', 'action': 'upsert_integration', 'who': step.details['who']})]\n"
+    )
+    (tmp_path / "broken.py").write_text("raise RuntimeError('not a plugin')\n")
+    registry = ActionRegistry()
+    registry.load_directory(str(tmp_path))
+
+    assert "upsert_integration" in registry
+    executor = YAMLExecutor("", None, {"who": "me"}, actions=registry)
+    executor.use_workflow(compile_workflow("plugin.yml", {"steps": [
+        {"name": "Upsert", "action": "upsert_integration", "who": "{{ inputs.who }}"}
+    ]}))
+    assert executor.execute_steps()[0]["who"] == "me"
@@ -0,0 +1,118 @@
+# tests/test_async_port_api.py
+
+import asyncio
+import os
+
+import pytest
+
+from src.api_clients.async_port_api import AsyncPortAPI, AsyncPortAPIError
+from src.yaml_handler.scheduler import run_dependency_graph_async
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../configuration_files")
+
+
+def make_api(port_stub):
+    port_api = AsyncPortAPI(backoff_factor=0.01)
+    port_api.base_url = port_stub.base_url
+    return port_api
+
+
+def test_async_client_against_stub(port_stub):
+    port_stub.queue("GET", "/v1/blueprints/service", 429, {"ok": False}, {"Retry-After": "0"})
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = make_api(port_stub)
+
+    async def run():
+        async with port_api.session():
+            data = await port_api.get_blueprint_data("service")
+            update = await port_api.update_blueprint("service", {"identifier": "service"})
+            failed = await port_api.create_scorecard("service", {"identifier": "sc"})
+            try:
+                await port_api.get_integration_data("missing")
+            except AsyncPortAPIError as e:
+                missing_status = e.status
+        return data, update, failed, missing_status
+
+    data, update, failed, missing_status = asyncio.run(run())
+
+    assert data["blueprint"]["identifier"] == "service"
+    assert update == {"status": "success", "data": {"ok": True}}
+    assert failed["status"] == "error"
+    assert missing_status == 404
+    assert port_stub.count("POST", "/v1/auth/access_token") == 1
+
+
+def test_async_writes_are_not_retried_after_a_server_error(port_stub):
+    port_stub.queue("POST", "/v1/blueprints/service/scorecards", 503, {"ok": False})
+    port_api = make_api(port_stub)
+
+    async def run():
+        async with port_api.session():
+            return await port_api.create_scorecard("service", {"identifier": "quality"})
+
+    assert asyncio.run(run())["status"] == "error"
+    assert port_stub.count("POST", "/v1/blueprints/service/scorecards") == 1
+
+
+def test_execute_steps_async_runs_pr_metrics(port_stub):
+    for blueprint in ("service", "githubPullRequest"):
+        port_stub.add_route("GET", f"/v1/blueprints/{blueprint}", 200,
+                            {"ok": True, "blueprint": {"identifier": blueprint}})
+        port_stub.add_route("PATCH", f"/v1/blueprints/{blueprint}", 200, {"ok": True})
+    port_stub.add_route("GET", "/v1/integration/53367788", 200, {"ok": True, "integration": {}})
+    port_stub.add_route("POST", "/v1/blueprints/githubPullRequest/scorecards", 200, {"ok": True})
+
+    inputs = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+    executor = YAMLExecutor(YAML_FOLDER, None, inputs, max_workers=4, async_port_api=make_api(port_stub))
+    executor.build_execution_plan(executor.load_yaml("pr_metrics.yml"))
+
+    results = asyncio.run(executor.execute_steps_async())
+
+    assert [result["step_number"] for result in results] == list(range(1, 8))
+    assert [result["status"] for result in results] == ["success"] * 5 + ["mock_done_nothing", "success"]
+
+
+def test_execute_steps_async_route(port_stub, web_app, monkeypatch):
+    for blueprint in ("service", "githubPullRequest"):
+        port_stub.add_route("GET", f"/v1/blueprints/{blueprint}", 200,
+                            {"ok": True, "blueprint": {"identifier": blueprint}})
+        port_stub.add_route("PATCH", f"/v1/blueprints/{blueprint}", 200, {"ok": True})
+    port_stub.add_route("GET", "/v1/integration/53367788", 200, {"ok": True, "integration": {}})
+    port_stub.add_route("POST", "/v1/blueprints/githubPullRequest/scorecards", 200, {"ok": True})
+    monkeypatch.setattr(web_app, "_async_port_api", make_api(port_stub))
+    client = web_app.app.test_client()
+
+    inputs = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+    response = client.post("/execute_steps_async", json={"filename": "pr_metrics.yml", "inputs": inputs})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    statuses = [result["status"] for result in body["execution_results"]]
+    assert statuses == ["success"] * 5 + ["mock_done_nothing", "success"]
+    assert body["run_id"] and body["timings"]
+    assert client.post("/execute_steps_async", json={"filename": "pr_metrics.yml", "mode": "x"}).status_code == 400
+    assert client.post("/execute_steps_async", json={"filename": "missing.yml"}).status_code == 404
+
+
+def test_async_graph_cancels_running_steps_when_one_fails():
+    cancelled = []
+
+    async def run_step(step):
+        if step == "fails":
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(step)
+            raise
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await run_dependency_graph_async(["slow", "fails", "waits"], {0: set(), 1: set(), 2: {0}}, run_step, 4)
+        # Nothing is left pending on the loop
+        assert len(asyncio.all_tasks()) == 1
+
+    asyncio.run(main())
+    assert cancelled == ["slow"]
@@ -0,0 +1,77 @@
+# tests/test_batch_executor.py
+
+import json
+import time
+
+from conftest import FakePortAPI
+
+from src.api_clients.rate_limit import TokenBucket
+from src.yaml_handler.batch_executor import BatchExecutor
+from src.yaml_handler.workflow_registry import compile_workflow
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "{{ inputs.name }}", "name": "{{ inputs.name }}", "type": "string"}]},
+    ]
+}
+
+PR_METRICS_INPUTS = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+
+
+class ExplodingPortAPI(FakePortAPI):
+    def update_blueprint(self, blueprint_identifier, payload):
+        if payload["schema"]["properties"].get("bad"):
+            raise RuntimeError("boom")
+        return super().update_blueprint(blueprint_identifier, payload)
+
+
+def test_batch_shares_reads_and_streams_every_input():
+    # The delay keeps the read in flight while the other runs ask for it
+    port_api = ExplodingPortAPI(delay=0.05)
+    workflow = compile_workflow("batch.yml", WORKFLOW)
+    batch = BatchExecutor("", port_api, workflow, max_concurrency=4)
+
+    reports = list(batch.run([{"name": f"p{index}"} for index in range(4)] + [{"name": "bad"}]))
+
+    assert sorted(report["index"] for report in reports) == [0, 1, 2, 3, 4]
+    assert port_api.count("get_blueprint_data") == 1
+    assert batch.reads.stats() == {"fetches": 1, "shared": 4}
+    statuses = {report["index"]: report["status"] for report in reports}
+    assert statuses == {0: "success", 1: "success", 2: "success", 3: "success", 4: "error"}
+    assert sorted(next(iter(payload["schema"]["properties"])) for payload in port_api.arguments("update_blueprint")) == \
+        ["p0", "p1", "p2", "p3"]
+
+
+def test_execute_batch_route_streams_results_and_a_summary(web_app, monkeypatch):
+    port_api = FakePortAPI()
+    monkeypatch.setattr(web_app, "port_api", port_api)
+    client = web_app.app.test_client()
+
+    response = client.post("/execute_batch", json={"filename": "pr_metrics.yml",
+                                                   "inputs": [PR_METRICS_INPUTS, PR_METRICS_INPUTS]})
+
+    assert response.mimetype == "application/x-ndjson"
+    *results, summary = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(result["index"] for result in results) == [0, 1]
+    assert all(result["type"] == "result" and result["status"] == "success" for result in results)
+    assert summary == {"type": "summary", "total": 2, "statuses": {"success": 2}, "reads": summary["reads"]}
+    assert summary["reads"]["shared"] > 0
+
+
+def test_execute_batch_route_validates_the_request(web_app):
+    client = web_app.app.test_client()
+    for body in ({"inputs": {"service": "service"}}, {"inputs": [], "max_concurrency": 0},
+                 {"inputs": [], "rate_limit": -1}, {"inputs": [], "mode": "x"}):
+        assert client.post("/execute_batch", json=dict(body, filename="pr_metrics.yml")).status_code == 400
+    assert client.post("/execute_batch", json={"filename": "missing.yml", "inputs": []}).status_code == 404
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.05
+    assert TokenBucket(rate=0).try_acquire() == 0.0
@@ -0,0 +1,68 @@
+# tests/test_benchmarks.py
+
+import json
+import os
+import tempfile
+
+from benchmarks import compare, run
+from benchmarks.fake_port import FakePortServer
+from benchmarks.workflows import generate_workflow, write_workflow
+
+
+def test_generated_workflow_shape():
+    workflow = generate_workflow(steps=8, properties=2, rules=4, nesting=1)
+    actions = [step["action"] for step in workflow["steps"]]
+
+    assert len(actions) == 8 and actions[:2] == ["load_resource", "load_resource"]
+    assert len(workflow["steps"][2]["properties"]) == 2
+    assert len(workflow["steps"][3]["scorecards"][0]["rules"]) == 4
+
+
+def test_run_writes_comparable_results(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("CHECKPOINT_DB", raising=False)
+    monkeypatch.delenv("RUN_HISTORY_DB", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    output = tmp_path / "results.json"
+    assert run.main(["--sizes", "4", "--iterations", "2", "--execute-iterations", "1", "--workers", "2",
+                     "--latency", "0", "--skip", "http", "--output", str(output)]) == 0
+
+    # The run leaves neither its work directory nor its database settings behind
+    assert os.listdir(tmp_path) == ["results.json"]
+    assert "CHECKPOINT_DB" not in os.environ and "RUN_HISTORY_DB" not in os.environ
+
+    report = json.loads(output.read_text())
+    names = {result["name"] for result in report["results"]}
+    assert {"yaml_load", "plan_build", "placeholder_resolution", "execute_steps", "execute_steps_async"} <= names
+    assert report["meta"]["fake_port"]["requests_served"] > 0
+
+    slower = dict(report, results=[dict(result, median=result["median"] * 2) for result in report["results"]])
+    rows = compare.compare(report, slower, threshold=0.1)
+    assert rows and all(row["regression"] for row in rows)
+
+
+def test_benchmarks_missing_from_the_current_run_fail(tmp_path):
+    result = {"name": "yaml_load", "params": {"steps": 4}, "median": 0.01}
+    baseline = {"results": [result, dict(result, name="plan_build")]}
+    current = {"results": [result]}
+    rows = compare.compare(baseline, current, threshold=0.1)
+
+    assert [(row["name"], row["current"], row["regression"]) for row in rows] == [
+        ("yaml_load", 0.01, False), ("plan_build", None, True)]
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+    (tmp_path / "current.json").write_text(json.dumps(current))
+    assert compare.main([str(tmp_path / "baseline.json"), str(tmp_path / "current.json")]) == 1
+
+
+def test_http_benchmark_reads_from_the_fake_server_on_every_request(tmp_path, web_app):
+    write_workflow(str(tmp_path), "bench.yml", generate_workflow(4, 1, 1, 0))
+    app_port_api = web_app.port_api
+    misses = app_port_api.cache.stats()["misses"]
+
+    with FakePortServer() as fake:
+        run.bench_http(str(tmp_path), "bench.yml", {}, fake, requests_per_client=3, concurrency=[1])
+        loads = {path: count for (method, path), count in fake.requests.items()
+                 if method == "GET" and "/scorecards" not in path}
+
+    # Each request loads the resources itself instead of getting them from the app's cache
+    assert loads and set(loads.values()) == {3}
+    assert web_app.port_api is app_port_api and app_port_api.cache.stats()["misses"] == misses
@@ -0,0 +1,98 @@
+# tests/test_blueprint_diff.py
+
+from conftest import FakePortAPI, run_workflow
+
+from src.yaml_handler.blueprint_diff import matches
+
+QUERY = '{"combinator": "and", "conditions": []}'
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "a", "name": "A", "type": "string"},
+                        {"identifier": "b", "name": "B", "type": "number"}]},
+        {"name": "Scorecards", "action": "add_scorecards_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "scorecards": [
+             {"identifier": "one", "name": "One", "rules": [{"identifier": "r", "title": "R", "level": "Gold",
+                                                             "query": QUERY}]},
+             {"identifier": "two", "name": "Two", "rules": []},
+             {"identifier": "three", "name": "Three", "rules": []},
+         ]},
+    ]
+}
+
+BLUEPRINT = {
+    "identifier": "service",
+    "schema": {"properties": {"a": {"title": "A", "type": "string", "description": "added by Port"},
+                              "b": {"title": "B", "type": "string"}}},
+    "aggregationProperties": {}
+}
+
+SCORECARDS = [
+    {"identifier": "one", "title": "One", "createdAt": "2024-01-01",
+     "rules": [{"identifier": "r", "title": "R", "level": "Gold", "query": {"combinator": "and", "conditions": []}}]},
+    {"identifier": "two", "title": "Old title", "rules": []},
+]
+
+
+def run(write_mode):
+    port_api = FakePortAPI(blueprint=BLUEPRINT, scorecards=SCORECARDS)
+    _, results = run_workflow(port_api, WORKFLOW, write_mode=write_mode)
+    return results, port_api.writes
+
+
+def test_diff_mode_sends_only_changes():
+    results, writes = run("diff")
+
+    assert writes[0] == ("update_blueprint", "service",
+                         {"identifier": "service", "schema": {"properties": {"b": {"title": "B", "type": "number"}}},
+                          "aggregationProperties": {}})
+    assert sorted((method, payload["identifier"]) for method, _, payload in writes[1:]) == [
+        ("create_scorecard", "three"), ("update_scorecard", "two")]
+    assert results[1]["unchanged"] == ["a"]
+    assert results[2]["unchanged"] == ["one"]
+    assert [change["change"] for change in results[2]["changes"]] == ["update", "create"]
+
+
+def test_dry_run_reports_without_writing():
+    results, writes = run("dry_run")
+
+    assert writes == []
+    assert [result["status"] for result in results[1:]] == ["dry_run", "dry_run"]
+    assert [change["identifier"] for change in results[1]["changes"]] == ["b"]
+
+
+def test_apply_mode_writes_everything():
+    _, writes = run("apply")
+    assert [write[0] for write in writes].count("create_scorecard") == 3
+
+
+def test_matches_ignores_extra_keys_and_rule_order():
+    current = {"rules": [{"identifier": "y", "level": "Silver"}, {"identifier": "x", "level": "Gold", "extra": 1}]}
+    assert matches({"rules": [{"identifier": "x", "level": "Gold"}, {"identifier": "y", "level": "Silver"}]}, current)
+    assert not matches({"rules": [{"identifier": "x", "level": "Bronze"}, {"identifier": "y", "level": "Silver"}]},
+                       current)
+
+
+def test_unset_optional_fields_are_not_changes():
+    port_api = FakePortAPI(blueprint={"identifier": "service", "schema": {"properties": {"a": {"type": "string"}}}})
+    _, results = run_workflow(port_api, {"steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "a", "type": "string"}]},
+    ]}, write_mode="diff")
+
+    assert results[1]["unchanged"] == ["a"]
+    assert port_api.writes == []
+
+
+def test_diff_after_a_field_selected_load_reads_the_whole_blueprint():
+    port_api = FakePortAPI(blueprint=BLUEPRINT, scorecards=SCORECARDS)
+    workflow = {"steps": [dict(WORKFLOW["steps"][0], fields=["blueprint.identifier"]), WORKFLOW["steps"][1]]}
+
+    _, results = run_workflow(port_api, workflow, write_mode="diff")
+
+    assert port_api.arguments("get_blueprint_data") == [["blueprint.identifier"], None]
+    assert results[1]["unchanged"] == ["a"]
+    assert [change["identifier"] for change in results[1]["changes"]] == ["b"]
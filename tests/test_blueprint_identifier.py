@@ -0,0 +1,25 @@
+# tests/test_blueprint_identifier.py
+
+from conftest import FakePortAPI, run_workflow
+
+UNRESOLVED_IDENTIFIER = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint",
+         "blueprint_identifier": "{{ steps.Load.result.data.blueprint.identifier }}",
+         "properties": [{"identifier": "owner", "name": "Owner", "type": "string"}]},
+        {"name": "Scorecards", "action": "add_scorecards_to_blueprint",
+         "blueprint_identifier": "{{ steps.Load.result.data.blueprint.identifier }}",
+         "scorecards": [{"identifier": "quality", "name": "Quality", "rules": []}]},
+    ]
+}
+
+
+def test_unresolved_blueprint_identifier_fails_the_step():
+    # The load succeeds but its blueprint has no identifier, so the placeholder stays unresolved
+    port_api = FakePortAPI(blueprint={"title": "Service"})
+    _, results = run_workflow(port_api, UNRESOLVED_IDENTIFIER)
+
+    assert [result["status"] for result in results] == ["success", "failed", "failed"]
+    assert all(result["error"] == "Blueprint identifier not found in data" for result in results[1:])
+    assert port_api.writes == []
@@ -0,0 +1,125 @@
+# tests/test_cassette.py
+
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from src.api_clients.cassette import RECORDED_TOKEN, CassetteMiss
+from src.api_clients.port_api import PortAPI
+from src.instrumentation.hooks import InstrumentationHook, hooks
+
+# Nothing listens here, so any request that isn't replayed fails
+OFFLINE_URL = "http://127.0.0.1:9/v1"
+
+
+class HTTPRecords(InstrumentationHook):
+    def __init__(self):
+        self.records = []
+
+    def on_http(self, record):
+        self.records.append(record)
+
+
+def record_session(port_stub, path):
+    port_stub.queue("GET", "/v1/blueprints/service", 503, {"ok": False}, {"Retry-After": "0"})
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True, "blueprint": {"identifier": "service"}})
+    port_api = PortAPI(cache_size=0, backoff_factor=0.01, cassette=str(path), cassette_mode="record")
+    port_api.base_url = port_stub.base_url
+    data = port_api.get_blueprint_data("service")
+    update = port_api.update_blueprint("service", {"identifier": "service"})
+    port_api.session.close()
+    return data, update
+
+
+def replay_api(path, latency_scale=0.0):
+    port_api = PortAPI(cache_size=0, backoff_factor=0.01, cassette=str(path), cassette_mode="replay",
+                       replay_latency_scale=latency_scale)
+    port_api.base_url = OFFLINE_URL
+    return port_api
+
+
+def test_replay_reproduces_recorded_responses_and_retries_offline(port_stub, tmp_path):
+    path = tmp_path / "port.jsonl.gz"
+    data, update = record_session(port_stub, path)
+
+    with gzip.open(path, "rt") as file:
+        lines = [json.loads(line) for line in file]
+    assert [(line.get("method"), line.get("status")) for line in lines[1:]] == [
+        ("POST", 200), ("GET", 503), ("GET", 200), ("PATCH", 200)]
+    assert json.loads(lines[1]["content"])["accessToken"] == RECORDED_TOKEN
+
+    port_api = replay_api(path)
+    http = hooks.register(HTTPRecords())
+    try:
+        assert port_api.get_blueprint_data("service") == data
+        # Another payload still replays the PATCH recorded for this blueprint
+        assert port_api.update_blueprint("service", {"identifier": "service", "title": "x"}) == update
+    finally:
+        hooks.unregister(http)
+    assert port_api.token == RECORDED_TOKEN
+    assert [(record["endpoint"], record["retries"]) for record in http.records] == [
+        ("/auth/access_token", 0), ("/blueprints/:id", 1), ("/blueprints/:id", 0)]
+
+    with pytest.raises(CassetteMiss):
+        port_api.get_integration_data("missing")
+    assert isinstance(CassetteMiss(), requests.RequestException)
+
+
+def test_replay_streams_fields_and_scales_latency(port_stub, tmp_path):
+    path = tmp_path / "port.jsonl.gz"
+    port_stub.delay = 0.05
+    record_session(port_stub, path)
+
+    port_api = replay_api(path, latency_scale=2.0)
+    port_api.ensure_token()
+    http = hooks.register(HTTPRecords())
+    try:
+        assert port_api.get_blueprint_data("service", fields=["blueprint.identifier"]) == {
+            "blueprint": {"identifier": "service"}}
+    finally:
+        hooks.unregister(http)
+    # The 503 and the 200 were each recorded at about 50ms and are replayed at twice that
+    assert http.records[0]["wall"] >= 0.18
+
+
+def test_replay_serves_many_concurrent_requests(port_stub, tmp_path):
+    path = tmp_path / "port.jsonl.gz"
+    record_session(port_stub, path)
+    port_api = replay_api(path)
+    port_api.ensure_token()
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        updates = list(pool.map(lambda _: port_api.update_blueprint("service", {"identifier": "service"}),
+                                range(200)))
+    assert all(update["status"] == "success" for update in updates)
+    assert port_api.session.get_adapter(OFFLINE_URL).stats() == {"replayed": 201, "misses": 0}
+
+
+def test_forked_processes_record_to_one_cassette(port_stub, tmp_path):
+    path = tmp_path / "port.jsonl.gz"
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    # As in a preloaded gunicorn app: the client is created before the workers are forked
+    port_api = PortAPI(cache_size=0, cassette=str(path), cassette_mode="record")
+    port_api.base_url = port_stub.base_url
+    # Workers authenticate after the fork; a connection opened before it would be shared
+    port_api.token = "token"
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            port_api.get_blueprint_data("service")
+        finally:
+            port_api.session.close()
+            os._exit(0)
+    port_api.update_blueprint("service", {"identifier": "service"})
+    os.waitpid(pid, 0)
+    port_api.session.close()
+
+    with gzip.open(path, "rt") as file:
+        lines = [json.loads(line) for line in file]
+    assert "version" in lines[0]
+    assert sorted(line["method"] for line in lines[1:]) == ["GET", "PATCH"]
@@ -0,0 +1,115 @@
+# tests/test_checkpoints.py
+
+import os
+import sqlite3
+import time
+
+import pytest
+from conftest import FakePortAPI, run_workflow
+
+from src.yaml_handler.checkpoints import COMPLETED, FAILED, CheckpointMismatchError, SQLiteCheckpointStore
+from src.yaml_handler.workflow_registry import compile_workflow
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "{{ inputs.name }}", "name": "Name", "type": "string"}]},
+    ]
+}
+
+
+def run(store, port_api, workflow, run_id=None, inputs=None):
+    return run_workflow(port_api, workflow, inputs or {"name": "owner"}, checkpoint_store=store, run_id=run_id)
+
+
+def test_failed_run_resumes_from_the_failed_step(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    workflow = compile_workflow("props.yml", WORKFLOW)
+
+    first, results = run(store, FakePortAPI(fail_writes=True), workflow)
+    assert [result["status"] for result in results] == ["success", "failed"]
+    saved = store.load_run(first.run_id)
+    assert saved.status == FAILED and saved.inputs == {"name": "owner"}
+
+    port_api = FakePortAPI()
+    _, results = run(store, port_api, workflow, run_id=first.run_id, inputs=saved.inputs)
+
+    assert port_api.count("get_blueprint_data") == 0
+    assert results[0]["resumed"] and results[0]["data"]["blueprint"]["identifier"] == "service"
+    assert list(port_api.arguments("update_blueprint")[0]["schema"]["properties"]) == ["owner"]
+    saved = store.load_run(first.run_id)
+    assert saved.status == COMPLETED and saved.step_results == {}
+
+
+def test_resume_refuses_a_changed_workflow(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    first, _ = run(store, FakePortAPI(fail_writes=True), compile_workflow("props.yml", WORKFLOW))
+
+    changed = dict(WORKFLOW, steps=WORKFLOW["steps"][:1])
+    with pytest.raises(CheckpointMismatchError):
+        run(store, FakePortAPI(), compile_workflow("props.yml", changed), run_id=first.run_id)
+
+
+def test_failed_finish_is_rolled_back(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.start_run("run", "workflow.yml", {}, "fingerprint")
+    with pytest.raises(sqlite3.Error):
+        store.finish_run("run", {"not": "a status"})
+
+    store.finish_run("run", FAILED)
+    assert store.load_run("run").status == FAILED
+
+
+def test_store_reopens_its_connection_after_fork(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+    store.start_run("before", "workflow.yml", {}, "fingerprint")
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            store.save_step("before", 1, {"status": "success"})
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert store.load_run("before").step_results == {1: {"status": "success"}}
+
+
+PR_METRICS_INPUTS = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+
+
+def test_resume_route_only_accepts_failed_or_interrupted_runs(web_app, monkeypatch):
+    client = web_app.app.test_client()
+    monkeypatch.setattr(web_app, "port_api", FakePortAPI(fail_writes=True))
+    response = client.post("/execute_steps", json={"filename": "pr_metrics.yml", "inputs": PR_METRICS_INPUTS})
+    run_id = response.get_json()["run_id"]
+    assert client.post("/execute_steps", json={"resume_run_id": "missing"}).status_code == 404
+
+    # The run is executing again somewhere else
+    saved = web_app.checkpoint_store.load_run(run_id)
+    web_app.checkpoint_store.start_run(run_id, saved.filename, saved.inputs, saved.fingerprint)
+    response = client.post("/execute_steps", json={"resume_run_id": run_id})
+    assert response.status_code == 409 and response.get_json()["error"] == "Run is still running"
+
+    # Until it hasn't checkpointed for long enough to count as interrupted
+    monkeypatch.setattr(web_app, "INTERRUPTED_RUN_SECONDS", 0)
+    monkeypatch.setattr(web_app, "port_api", FakePortAPI())
+    response = client.post("/execute_steps", json={"resume_run_id": run_id})
+    assert response.status_code == 200
+    assert any(result.get("resumed") for result in response.get_json()["execution_results"])
+
+    response = client.post("/execute_steps", json={"resume_run_id": run_id})
+    assert response.status_code == 409 and response.get_json()["error"] == "Run already completed"
+
+
+def test_runs_past_retention_are_deleted(tmp_path):
+    store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"), retention_seconds=0.05)
+    store.start_run("old", "workflow.yml", {}, "fingerprint")
+    store.save_step("old", 1, {"status": "success"})
+    store.finish_run("old", FAILED)
+    time.sleep(0.06)
+
+    store.start_run("new", "workflow.yml", {}, "fingerprint")
+    store.finish_run("new", FAILED)
+    assert store.load_run("old") is None and store.load_run("new").status == FAILED
@@ -0,0 +1,72 @@
+# tests/test_instrumentation.py
+
+from src.api_clients.port_api import PortAPI
+from src.instrumentation.hooks import hooks
+from src.instrumentation.prometheus import MetricsRegistry
+from src.instrumentation.timing import endpoint_label
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "a", "name": "A", "type": "string"}]},
+    ]
+}
+
+
+def test_step_timings_attribute_http_calls_to_steps(port_stub):
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    metrics = hooks.register(MetricsRegistry())
+    try:
+        executor = YAMLExecutor("", port_api)
+        executor.build_execution_plan(WORKFLOW)
+        executor.execute_steps()
+    finally:
+        hooks.unregister(metrics)
+
+    report = executor.timing_report()
+    assert set(report["run"]) >= {"plan_build", "execute", "flush_writes"}
+    load, props = report["steps"]
+    assert {"resolve", "handler", "port_call"} <= set(load["phases"])
+    assert "payload" in props["phases"]
+
+    # The first step authenticates on a new connection, later calls reuse it
+    auth, get = load["http"]
+    assert auth["endpoint"] == "/auth/access_token" and auth["connect"] is not None
+    assert get["endpoint"] == "/blueprints/:id" and get["connect"] is None
+    assert get["status"] == 200 and get["bytes"] > 0 and get["retries"] == 0
+    assert [record["method"] for record in props["http"]] == ["PATCH"]
+
+    rendered = metrics.render()
+    assert 'port_api_requests_total{endpoint="/blueprints/:id",method="GET",status="200"} 1.0' in rendered
+    assert 'executor_steps_total{action="load_resource",status="success"} 1.0' in rendered
+    assert "# TYPE executor_run_wall_seconds histogram" in rendered
+
+
+def test_endpoint_label_collapses_identifiers():
+    assert endpoint_label("/blueprints/service/scorecards") == "/blueprints/:id/scorecards"
+    assert endpoint_label("/integration/github-ocean") == "/integration/:id"
+
+
+def test_metrics_route_reports_runs_and_cache_counters(port_stub, web_app, monkeypatch):
+    for blueprint in ("service", "githubPullRequest"):
+        port_stub.add_route("PATCH", f"/v1/blueprints/{blueprint}", 200, {"ok": True})
+    port_stub.add_route("GET", "/v1/integration/53367788", 200, {"ok": True, "integration": {}})
+    port_stub.add_route("POST", "/v1/blueprints/githubPullRequest/scorecards", 200, {"ok": True})
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    monkeypatch.setattr(web_app, "port_api", port_api)
+    client = web_app.app.test_client()
+
+    inputs = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+    assert client.post("/execute_steps", json={"filename": "pr_metrics.yml", "inputs": inputs}).status_code == 200
+    response = client.get("/metrics")
+
+    assert response.mimetype == "text/plain"
+    rendered = response.get_data(as_text=True)
+    assert 'executor_steps_total{action="load_resource",status="success"}' in rendered
+    assert 'port_api_requests_total{endpoint="/blueprints/:id",method="PATCH",status="200"}' in rendered
+    assert f'port_api_cache_misses{{client="sync"}} {port_api.cache.stats()["misses"]}' in rendered
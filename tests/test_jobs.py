@@ -0,0 +1,117 @@
+# tests/test_jobs.py
+
+import json
+import threading
+
+import pytest
+from conftest import FakePortAPI
+
+from src.web_app.jobs import COMPLETED, FAILED, InMemoryJobStore, Job, JobManager, SQLiteJobStore
+
+
+PR_METRICS_INPUTS = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return InMemoryJobStore() if request.param == "memory" else SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+def wait_until_finished(store, job_id):
+    index = 0
+    events = []
+    while True:
+        new_events, finished = store.wait_for_events(job_id, index, timeout=5)
+        events += new_events
+        index += len(new_events)
+        if finished and not new_events:
+            return events
+
+
+def test_job_streams_step_results_and_keeps_report(store):
+    release = threading.Event()
+
+    def run_workflow(job, on_step_complete):
+        results = []
+        for number in (1, 2):
+            release.wait(5)
+            result = {"step_number": number, "status": "success"}
+            on_step_complete(result)
+            results.append(result)
+        return results
+
+    manager = JobManager(store, run_workflow, max_workers=1)
+    job = manager.submit("pr_metrics.yml", {"service": "service"})
+    assert store.get(job.job_id).status in ("queued", "running")
+
+    release.set()
+    events = wait_until_finished(store, job.job_id)
+
+    assert [event["type"] for event in events] == ["status", "status", "step", "step", "status"]
+    assert events[-1]["status"] == COMPLETED
+    report = store.get(job.job_id).report()
+    assert report["status"] == COMPLETED
+    assert [result["step_number"] for result in report["execution_results"]] == [1, 2]
+    manager.shutdown()
+
+
+def test_failed_job_records_error(store):
+    def run_workflow(job, on_step_complete):
+        raise RuntimeError("boom")
+
+    manager = JobManager(store, run_workflow)
+    job = manager.submit("pr_metrics.yml", {})
+    wait_until_finished(store, job.job_id)
+
+    assert store.get(job.job_id).status == FAILED
+    assert store.get(job.job_id).error == "boom"
+    manager.shutdown()
+
+
+def test_sqlite_jobs_are_visible_to_other_processes(tmp_path):
+    # Two stores on one database behave like two gunicorn workers
+    accepting = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    other = SQLiteJobStore(str(tmp_path / "jobs.db"))
+    accepting.create(Job(job_id="job", filename="pr_metrics.yml", inputs={"service": "service"}))
+    accepting.append_event("job", {"type": "status", "status": "queued"})
+
+    assert other.get("job").inputs == {"service": "service"}
+    assert other.wait_for_events("job", 0, timeout=0) == ([{"type": "status", "status": "queued"}], False)
+
+    threading.Timer(0.05, accepting.update, ("job",), {"status": COMPLETED, "results": [{"step_number": 1}]}).start()
+    assert other.wait_for_events("job", 1, timeout=5) == ([], True)
+    assert other.get("job").report()["execution_results"] == [{"step_number": 1}]
+
+
+def test_sqlite_store_keeps_the_newest_finished_jobs(tmp_path):
+    store = SQLiteJobStore(str(tmp_path / "jobs.db"), max_finished_jobs=1)
+    for number in range(3):
+        store.create(Job(job_id=f"job-{number}", filename="pr_metrics.yml", inputs={}))
+        store.append_event(f"job-{number}", {"type": "status", "status": "queued"})
+        store.update(f"job-{number}", status=COMPLETED, finished_at=float(number))
+
+    assert [store.get(f"job-{number}") is not None for number in range(3)] == [False, False, True]
+
+
+def test_job_routes(web_app, monkeypatch):
+    monkeypatch.setattr(web_app, "port_api", FakePortAPI())
+    client = web_app.app.test_client()
+
+    response = client.post("/jobs", json={"filename": "pr_metrics.yml", "inputs": PR_METRICS_INPUTS})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    # The stream ends once the job has finished
+    stream = client.get(f"/jobs/{job_id}/events")
+    assert stream.mimetype == "text/event-stream"
+    events = [json.loads(line[len("data: "):]) for line in stream.get_data(as_text=True).splitlines()
+              if line.startswith("data: ")]
+    assert [event["status"] for event in events if event["type"] == "status"] == ["queued", "running", COMPLETED]
+    assert len([event for event in events if event["type"] == "step"]) == 7
+
+    report = client.get(f"/jobs/{job_id}").get_json()
+    assert report["status"] == COMPLETED and len(report["execution_results"]) == 7
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/events").status_code == 404
+    assert client.post("/jobs", json={"filename": "missing.yml"}).status_code == 404
+    assert client.post("/jobs", json={"filename": "pr_metrics.yml", "mode": "x"}).status_code == 400
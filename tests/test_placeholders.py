@@ -0,0 +1,59 @@
+# tests/test_placeholders.py
+
+from src.yaml_handler.placeholders import compile_value, render_value, step_references
+from src.yaml_handler.yaml_executor import Step, StepSpec, YAMLExecutor
+
+
+def make_executor():
+    executor = YAMLExecutor("", None, {"service": "svc", "Pull request": "pr"})
+    load = Step.from_spec(StepSpec(1, "Load", "load_resource", "blueprint", "x", {"name": "Load"}))
+    load.result = {"id": 1}
+    pending = Step.from_spec(StepSpec(2, "Pending", "load_resource", "blueprint", "y", {"name": "Pending"}))
+    executor.steps = [load, pending]
+    return executor
+
+
+def test_compiled_resolution_matches_regex_resolution():
+    executor = make_executor()
+    text = ("{{ inputs.service }}/{{inputs.Pull request}} {{ inputs.missing }} "
+            "{{ steps.Load.result }} {{ steps.Pending.result }} {{ steps.Unknown.result }}")
+
+    expected = executor.resolve_step_result_placeholder(executor.resolve_input_placeholder(text))
+
+    assert executor.resolve_placeholders(text) == expected
+    assert expected == ("svc/pr {{ inputs.missing }} {'id': 1} "
+                        "{{ steps.Pending.result }} {{ steps.Unknown.result }}")
+
+
+def test_nested_values_are_resolved_and_untouched_branches_shared():
+    executor = make_executor()
+    static = {"identifier": "changed_files", "type": "number"}
+    details = {
+        "name": "Step",
+        "properties": [static, {"identifier": "{{ inputs.service }}_count"}],
+        "meta": {"source": "{{ steps.Load.result }}"}
+    }
+
+    node = compile_value(details)
+    resolved = render_value(node, executor.inputs, executor.steps_by_name)
+
+    assert step_references(node) == {"Load"}
+    assert resolved["properties"][1] == {"identifier": "svc_count"}
+    assert resolved["meta"]["source"] is executor.steps[0].result
+    assert resolved["properties"][0] is static
+    assert details["properties"][1] == {"identifier": "{{ inputs.service }}_count"}
+    assert compile_value(static) is static
+
+
+def test_whole_value_and_path_placeholders_bind_objects():
+    executor = make_executor()
+    executor.steps[0].result = {"data": {"blueprint": {"identifier": "service", "tags": ["a", "b"]}}}
+
+    assert executor.resolve_placeholders("{{ steps.Load.result }}") is executor.steps[0].result
+    assert executor.resolve_placeholders("{{ steps.Load.result.data.blueprint.identifier }}") == "service"
+    assert executor.resolve_placeholders("{{ steps.Load.result.data.blueprint.tags.1 }}") == "b"
+    assert executor.resolve_placeholders("id={{ steps.Load.result.data.blueprint.identifier }}") == "id=service"
+    # Missing paths and pending steps stay unresolved
+    assert executor.resolve_placeholders("{{ steps.Load.result.data.missing }}") == \
+        "{{ steps.Load.result.data.missing }}"
+    assert executor.resolve_placeholders("{{ steps.Pending.result }}") == "{{ steps.Pending.result }}"
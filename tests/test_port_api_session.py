@@ -0,0 +1,82 @@
+# tests/test_port_api_session.py
+
+import pytest
+import requests
+
+from src.api_clients.port_api import PortAPI, failed_before_sending
+
+
+def make_api(port_stub, **kwargs):
+    port_api = PortAPI(backoff_factor=0.01, **kwargs)
+    port_api.base_url = port_stub.base_url
+    return port_api
+
+
+def test_retries_429_honoring_retry_after(port_stub):
+    port_stub.queue("GET", "/v1/blueprints/service", 429, {"ok": False}, {"Retry-After": "0"})
+    port_stub.queue("GET", "/v1/blueprints/service", 503, {"ok": False})
+    port_api = make_api(port_stub)
+
+    data = port_api.get_blueprint_data("service")
+
+    assert data["blueprint"]["identifier"] == "service"
+    assert port_stub.count("GET", "/v1/blueprints/service") == 3
+
+
+def test_gives_up_after_max_retries(port_stub):
+    for _ in range(3):
+        port_stub.queue("GET", "/v1/blueprints/service", 500, {"ok": False})
+    port_api = make_api(port_stub, max_retries=2)
+
+    result = port_api.update_blueprint("missing", {"identifier": "missing"})
+    assert result["status"] == "error"
+
+    try:
+        port_api.get_blueprint_data("service")
+    except Exception as e:
+        assert "500" in str(e)
+    else:
+        raise AssertionError("Expected an HTTPError after exhausting retries")
+
+
+def test_writes_are_only_retried_when_port_turned_them_away(port_stub):
+    path = "/v1/blueprints/service/scorecards"
+    port_stub.queue("POST", path, 503, {"ok": False})
+    port_stub.add_route("POST", path, 200, {"ok": True})
+    port_api = make_api(port_stub)
+
+    # The create may have been applied before the 503, so it is not sent again
+    assert port_api.create_scorecard("service", {"identifier": "quality"})["status"] == "error"
+    assert port_stub.count("POST", path) == 1
+
+    port_stub.queue("POST", path, 429, {"ok": False}, {"Retry-After": "0"})
+    assert port_api.create_scorecard("service", {"identifier": "quality"})["status"] == "success"
+    assert port_stub.count("POST", path) == 3
+
+
+def test_refused_connections_count_as_not_sent():
+    with pytest.raises(requests.exceptions.ConnectionError) as refused:
+        requests.post("http://127.0.0.1:9/", timeout=5)
+    assert failed_before_sending(refused.value)
+    assert not failed_before_sending(requests.exceptions.ReadTimeout())
+
+
+def test_refreshes_token_before_expiry(port_stub):
+    port_stub.expires_in = 30  # Inside the default 60 second refresh margin
+    port_api = make_api(port_stub, cache_size=0)
+
+    port_api.get_blueprint_data("service")
+    port_api.get_blueprint_data("service")
+
+    assert port_stub.count("POST", "/v1/auth/access_token") == 2
+    assert port_api.token == "token-2"
+
+
+def test_reauthenticates_once_on_401(port_stub):
+    port_stub.queue("GET", "/v1/blueprints/service", 401, {"ok": False})
+    port_api = make_api(port_stub)
+
+    port_api.get_blueprint_data("service")
+
+    assert port_stub.count("POST", "/v1/auth/access_token") == 2
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
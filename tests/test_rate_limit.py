@@ -0,0 +1,107 @@
+# tests/test_rate_limit.py
+
+import asyncio
+import fcntl
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.api_clients.port_api import PortAPI
+from src.api_clients.rate_limit import FileInFlightLimiter, FileTokenBucket, RateLimiter
+
+
+def test_in_flight_cap_is_never_exceeded():
+    limiter = RateLimiter(max_in_flight=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def request(_):
+        with limiter.slot("read"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(request, range(16)))
+
+    assert peak[0] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_file_bucket_is_shared_between_instances(tmp_path):
+    # Two instances on one path behave like two worker processes
+    first = FileTokenBucket(str(tmp_path / "read.bucket"), rate=1, capacity=2)
+    second = FileTokenBucket(str(tmp_path / "read.bucket"), rate=1, capacity=2)
+
+    assert first.try_acquire() == 0.0
+    assert second.try_acquire() == 0.0
+    assert first.try_acquire() > 0.5
+
+
+def test_file_bucket_locks_exclude_forked_processes(tmp_path):
+    # As in a preloaded gunicorn app: the bucket is created before the workers are forked
+    bucket = FileTokenBucket(str(tmp_path / "read.bucket"), rate=1)
+    fcntl.flock(bucket._fd, fcntl.LOCK_EX)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            fcntl.flock(bucket._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os._exit(0)
+        os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    fcntl.flock(bucket._fd, fcntl.LOCK_UN)
+
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_async_slot_does_not_block_the_loop_on_a_locked_bucket(tmp_path):
+    limiter = RateLimiter(read_rate=100, state_dir=str(tmp_path))
+    fd = os.open(limiter.buckets["read"].path, os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)  # Another worker is updating the bucket
+    threading.Timer(0.1, fcntl.flock, (fd, fcntl.LOCK_UN)).start()
+
+    async def main():
+        ticks = [0]
+
+        async def tick():
+            while True:
+                await asyncio.sleep(0.01)
+                ticks[0] += 1
+
+        ticker = asyncio.ensure_future(tick())
+        async with limiter.slot_async("read"):
+            ticker.cancel()
+            return ticks[0]
+
+    try:
+        # The loop kept running other coroutines while the slot waited for the lock
+        assert asyncio.run(main()) >= 5
+    finally:
+        os.close(fd)
+
+
+def test_file_in_flight_slots(tmp_path):
+    limiter = FileInFlightLimiter(str(tmp_path / "in_flight"), 1)
+    handle = limiter.try_acquire()
+    assert handle is not None and limiter.try_acquire() is None
+    limiter.release(handle)
+    limiter.release(limiter.try_acquire())
+
+
+def test_port_api_throttles_writes_separately_from_reads(port_stub):
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    limiter = RateLimiter(read_rate=1000, write_rate=20, burst=1)
+    port_api = PortAPI(cache_size=0, rate_limiter=limiter)
+    port_api.base_url = port_stub.base_url
+
+    start = time.monotonic()
+    for _ in range(3):
+        port_api.update_blueprint("service", {"identifier": "service"})
+    # The authentication POST and three PATCHes share a one-token write budget at 20/s
+    assert time.monotonic() - start >= 0.1
+    assert limiter.stats()["throttled"] >= 3
@@ -0,0 +1,100 @@
+# tests/test_response_cache.py
+
+import threading
+import time
+
+from src.api_clients.port_api import PortAPI
+from src.api_clients.response_cache import ResponseCache
+
+
+def test_lru_eviction_and_counters():
+    cache = ResponseCache(max_size=2)
+    cache.set("blueprint", "a", {"id": "a"})
+    cache.set("blueprint", "b", {"id": "b"})
+    assert cache.get("blueprint", "a") == {"id": "a"}  # "b" is now least recently used
+    cache.set("blueprint", "c", {"id": "c"})
+
+    assert cache.get("blueprint", "b") is None
+    assert cache.get("blueprint", "c") == {"id": "c"}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+def test_per_resource_type_ttl():
+    cache = ResponseCache(ttls={"blueprint": 0.01, "integration": 60})
+    cache.set("blueprint", "a", 1)
+    cache.set("integration", "a", 2)
+    time.sleep(0.02)
+
+    assert cache.get("blueprint", "a") is None
+    assert cache.get("integration", "a") == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_invalidations_are_remembered_for_a_bounded_number_of_resources():
+    cache = ResponseCache()
+    cache.max_invalidations = 2
+    stale = cache.generation("blueprint", "a")
+    for identifier in ("a", "b", "c", "d"):
+        cache.invalidate("blueprint", identifier)
+    fresh = cache.generation("blueprint", "a")
+
+    assert len(cache._invalidated) == 2
+    # "a" was forgotten, so a read taken before its invalidation is still dropped
+    cache.set("blueprint", "a", 1, stale)
+    cache.set("blueprint", "e", 2, fresh)
+    assert cache.get("blueprint", "a") is None
+    assert cache.get("blueprint", "e") == 2
+
+
+def test_port_api_reads_through_cache_and_writes_invalidate(port_stub):
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+
+    port_api.get_blueprint_data("service")
+    port_api.get_blueprint_data("service")
+    assert port_stub.count("GET", "/v1/blueprints/service") == 1
+
+    port_api.update_blueprint("service", {"identifier": "service"})
+    port_api.get_blueprint_data("service")
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
+    assert port_api.cache.stats()["invalidations"] == 1
+
+
+def test_read_in_flight_during_a_write_is_not_cached(port_stub):
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    port_api.ensure_token()
+
+    port_stub.delay = 0.2
+    read = threading.Thread(target=port_api.get_blueprint_data, args=("service",))
+    read.start()
+    time.sleep(0.05)  # The GET is now waiting on Port
+    port_api.update_blueprint("service", {"identifier": "service"})
+    read.join()
+    port_stub.delay = 0.0
+
+    # The response fetched before the write must not be served afterwards
+    port_api.get_blueprint_data("service")
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
+    assert port_api.cache.stats()["discarded"] == 1
+
+
+def test_read_sent_while_a_write_is_in_flight_is_not_cached(port_stub):
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    port_api.ensure_token()
+
+    port_stub.delay = 0.2
+    write = threading.Thread(target=port_api.update_blueprint, args=("service", {"identifier": "service"}))
+    write.start()
+    time.sleep(0.05)  # The PATCH is now waiting on Port, after the cache was invalidated
+    port_api.get_blueprint_data("service")
+    write.join()
+    port_stub.delay = 0.0
+
+    port_api.get_blueprint_data("service")
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
@@ -0,0 +1,125 @@
+# tests/test_run_history.py
+
+import sqlite3
+import time
+
+import pytest
+from conftest import FakePortAPI, run_workflow
+
+from src.instrumentation.hooks import hooks
+from src.instrumentation.run_history import COMPLETED, FAILED, RunHistoryRecorder, SQLiteRunHistoryStore, inputs_hash
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "owner", "name": "Owner", "type": "string"}]},
+    ]
+}
+
+
+def record(store, run_id, started_at, filename="a.yml", status="success"):
+    store.record_run({"run_id": run_id, "filename": filename, "inputs": {"name": run_id}, "mode": "sync",
+                      "started_at": started_at, "wall": 1.0,
+                      "results": [{"step_number": 1, "step_name": "Load", "action": "load_resource",
+                                   "status": status, "wall": 0.5, "error": "boom" if status == "failed" else None}]})
+
+
+def test_executor_runs_are_recorded_with_step_details(tmp_path):
+    store = SQLiteRunHistoryStore(str(tmp_path / "history.db"))
+    recorder = hooks.register(RunHistoryRecorder(store))
+    try:
+        for run_id, fail_writes in (("ok", False), ("broken", True)):
+            run_workflow(FakePortAPI(fail_writes=fail_writes), WORKFLOW, {"name": "owner"}, "history.yml",
+                         run_id=run_id)
+    finally:
+        hooks.unregister(recorder)
+
+    assert [run["run_id"] for run in store.list_runs(status=COMPLETED)["runs"]] == ["ok"]
+    run = store.get_run("broken")
+    assert run["status"] == FAILED and run["filename"] == "history.yml"
+    assert run["inputs_hash"] == inputs_hash({"name": "owner"})
+    assert run["step_count"] == 2 and run["failed_steps"] == 1 and run["error"] == "503 Server Error"
+    assert [(step["step_name"], step["status"]) for step in run["steps"]] == [("Load", "success"),
+                                                                             ("Props", "failed")]
+    assert all(step["wall"] >= 0 for step in run["steps"])
+    assert store.get_run("missing") is None
+
+
+def test_list_runs_filters_and_pages_newest_first(tmp_path):
+    store = SQLiteRunHistoryStore(str(tmp_path / "history.db"))
+    for number in range(7):
+        record(store, f"run-{number}", 1000.0 + number // 2, filename="a.yml" if number % 2 else "b.yml",
+               status="failed" if number == 3 else "success")
+
+    seen, cursor = [], None
+    while True:
+        page = store.list_runs(limit=3, cursor=cursor)
+        seen += [run["run_id"] for run in page["runs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"run-{number}" for number in reversed(range(7))]
+
+    assert [run["run_id"] for run in store.list_runs(filename="a.yml")["runs"]] == ["run-5", "run-3", "run-1"]
+    assert [run["run_id"] for run in store.list_runs(status=FAILED)["runs"]] == ["run-3"]
+    assert [run["run_id"] for run in store.list_runs(since=1001.0, until=1002.0)["runs"]] == ["run-3", "run-2"]
+    stats = {row["filename"]: row for row in store.workflow_stats()}
+    assert stats["a.yml"]["runs"] == 3 and stats["a.yml"]["failed"] == 1 and stats["b.yml"]["failed"] == 0
+
+
+def test_run_routes(tmp_path, web_app, monkeypatch):
+    client = web_app.app.test_client()
+    monkeypatch.setattr(web_app, "port_api", FakePortAPI())
+    inputs = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+    run_id = client.post("/execute_steps", json={"filename": "pr_metrics.yml", "inputs": inputs}).get_json()["run_id"]
+
+    # The app records its own runs
+    run = client.get(f"/runs/{run_id}").get_json()
+    assert run["filename"] == "pr_metrics.yml" and run["status"] == COMPLETED and len(run["steps"]) == 7
+    assert client.get("/runs/missing").status_code == 404
+
+    store = SQLiteRunHistoryStore(str(tmp_path / "history.db"))
+    for number in range(5):
+        record(store, f"run-{number}", 1000.0 + number, filename="a.yml" if number % 2 else "b.yml",
+               status="failed" if number == 3 else "success")
+    monkeypatch.setattr(web_app, "run_history", store)
+
+    seen, cursor = [], None
+    while True:
+        page = client.get("/runs", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})}).get_json()
+        seen += [run["run_id"] for run in page["runs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == ["run-4", "run-3", "run-2", "run-1", "run-0"]
+    page = client.get("/runs", query_string={"workflow": "a.yml", "status": FAILED}).get_json()
+    assert [run["run_id"] for run in page["runs"]] == ["run-3"]
+    assert client.get("/runs", query_string={"limit": "many"}).status_code == 400
+    assert client.get("/runs", query_string={"cursor": "bad"}).status_code == 400
+
+    stats = client.get("/runs/stats", query_string={"since": 1002.0}).get_json()["workflows"]
+    assert [(row["filename"], row["runs"], row["failed"]) for row in stats] == [("a.yml", 1, 1), ("b.yml", 2, 0)]
+
+
+def test_old_runs_are_compacted(tmp_path):
+    store = SQLiteRunHistoryStore(str(tmp_path / "history.db"), retention_seconds=3600, compact_every=2)
+    record(store, "old", time.time() - 7200)
+    assert store.get_run("old") is not None
+    record(store, "new", time.time())
+
+    # The second append triggered compaction
+    assert store.get_run("old") is None
+    assert [run["run_id"] for run in store.list_runs()["runs"]] == ["new"]
+    assert store.compact(time.time() + 1) == 1
+    assert store.list_runs()["runs"] == []
+
+
+def test_failed_append_is_rolled_back(tmp_path):
+    store = SQLiteRunHistoryStore(str(tmp_path / "history.db"))
+    with pytest.raises(sqlite3.Error):
+        record(store, "broken", {"not": "a time"})
+
+    # The connection is no longer inside the failed transaction
+    record(store, "next", time.time())
+    assert [run["run_id"] for run in store.list_runs()["runs"]] == ["next"]
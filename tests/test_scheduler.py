@@ -0,0 +1,45 @@
+# tests/test_scheduler.py
+
+import os
+
+from conftest import FakePortAPI
+
+from src.yaml_handler.scheduler import build_dependency_graph
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../configuration_files")
+
+
+INPUTS = {"service": "service", "Pull request": "githubPullRequest", "Git Integration": "53367788"}
+
+
+def test_dependency_graph_for_pr_metrics():
+    executor = YAMLExecutor(YAML_FOLDER, FakePortAPI(delay=0.05))
+    steps = executor.build_execution_plan(executor.load_yaml("pr_metrics.yml"))
+    dependencies = build_dependency_graph(steps)
+
+    # The three loads are independent
+    assert dependencies[0] == dependencies[1] == dependencies[2] == set()
+    # Property upsert on the PR blueprint needs the PR load only
+    assert dependencies[3] == {1}
+    # Scorecards need the PR load and, through depends_on, the property upsert
+    assert dependencies[4] == {1, 3}
+    assert dependencies[5] == {2}
+    assert dependencies[6] == {0}
+
+
+def test_parallel_execution_matches_sequential_results():
+    sequential_api = FakePortAPI(delay=0.05)
+    sequential = YAMLExecutor(YAML_FOLDER, sequential_api, dict(INPUTS))
+    sequential.build_execution_plan(sequential.load_yaml("pr_metrics.yml"))
+    sequential_results = sequential.execute_steps()
+
+    parallel_api = FakePortAPI(delay=0.05)
+    parallel = YAMLExecutor(YAML_FOLDER, parallel_api, dict(INPUTS), max_workers=4)
+    parallel.build_execution_plan(parallel.load_yaml("pr_metrics.yml"))
+    parallel_results = parallel.execute_steps()
+
+    assert sequential_results == parallel_results
+    assert [result["step_number"] for result in parallel_results] == list(range(1, 8))
+    assert sequential_api.max_in_flight == 1
+    assert parallel_api.max_in_flight > 1
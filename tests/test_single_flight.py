@@ -0,0 +1,115 @@
+# tests/test_single_flight.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.api_clients.async_port_api import AsyncPortAPI
+from src.api_clients.port_api import PortAPI
+from src.api_clients.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result_or_error():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def call(value):
+        calls.append(value)
+        release.wait(5)
+        if value == "boom":
+            raise ValueError(value)
+        return {"value": value}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, "key", call, "ok") for _ in range(8)]
+        while flights.stats()["shared"] < 7:
+            pass
+        release.set()
+        results = [future.result() for future in futures]
+    assert calls == ["ok"] and all(result is results[0] for result in results)
+
+    release.clear()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flights.do, "key", call, "boom") for _ in range(4)]
+        while flights.stats()["shared"] < 10:
+            pass
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+    # Nothing is remembered once a call has finished
+    assert flights.do("key", lambda: 42) == 42
+    assert flights.stats() == {"calls": 3, "shared": 10, "in_flight": 0}
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flights = SingleFlight()
+
+    async def run():
+        release = asyncio.Event()
+
+        async def call():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(flights.do_async("key", call))
+        waiter = asyncio.ensure_future(flights.do_async("key", call))
+        other = asyncio.ensure_future(flights.do_async("key", call))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        return await leader, await other, waiter
+
+    leader, other, waiter = asyncio.run(run())
+    assert leader == other == "done" and waiter.cancelled()
+
+
+def test_cold_burst_sends_one_token_request_and_one_read(port_stub):
+    port_stub.delay = 0.05
+    port_api = PortAPI(cache_size=0)
+    port_api.base_url = port_stub.base_url
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: port_api.get_blueprint_data("service"), range(8)))
+
+    assert all(result == {"ok": True, "blueprint": {"identifier": "service"}} for result in results)
+    assert port_stub.count("POST", "/v1/auth/access_token") == 1
+    assert port_stub.count("GET", "/v1/blueprints/service") == 1
+
+
+def test_a_write_detaches_reads_already_in_flight(port_stub):
+    port_stub.delay = 0.05
+    port_stub.add_route("PATCH", "/v1/blueprints/service", 200, {"ok": True})
+    port_api = PortAPI(cache_size=0)
+    port_api.base_url = port_stub.base_url
+    port_api.ensure_token()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        before = pool.submit(port_api.get_blueprint_data, "service")
+        while port_api.flights.stats()["in_flight"] == 0:
+            pass
+        port_api.update_blueprint("service", {"identifier": "service"})
+        # Started after the write, so it can't reuse the read started before it
+        port_api.get_blueprint_data("service")
+        before.result()
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
+
+
+def test_async_reads_coalesce_across_event_loops(port_stub):
+    port_stub.delay = 0.05
+    port_api = AsyncPortAPI(cache_size=0)
+    port_api.base_url = port_stub.base_url
+
+    async def read_many():
+        async with port_api.session():
+            return await asyncio.gather(*(port_api.get_blueprint_data("service") for _ in range(4)))
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        results = [result for batch in pool.map(lambda _: asyncio.run(read_many()), range(3)) for result in batch]
+
+    assert len(results) == 12 and all(result["blueprint"]["identifier"] == "service" for result in results)
+    assert port_stub.count("POST", "/v1/auth/access_token") == 1
+    assert port_stub.count("GET", "/v1/blueprints/service") <= 2
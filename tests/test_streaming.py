@@ -0,0 +1,93 @@
+# tests/test_streaming.py
+
+import io
+import json
+
+import pytest
+from conftest import FakePortAPI, run_workflow
+
+from src.api_clients.port_api import PortAPI
+from src.api_clients.streaming import normalize_fields, parse_fields, project
+from src.yaml_handler.workflow_registry import compile_workflow
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+DOCUMENT = {"ok": True, "blueprint": {"identifier": "service", "title": "Service",
+                                      "schema": {"properties": {"a": {"type": "string"}}},
+                                      "mappings": [{"kind": "x" * 100} for _ in range(50)]}}
+FIELDS = normalize_fields(["blueprint.identifier", "blueprint.schema", "blueprint.missing"])
+
+
+def test_project_keeps_only_declared_fields():
+    assert project(DOCUMENT, FIELDS) == {"blueprint": {"identifier": "service",
+                                                       "schema": {"properties": {"a": {"type": "string"}}}}}
+    assert normalize_fields("ok") == ("ok",)
+    assert normalize_fields([]) is None
+
+
+def test_parse_fields_matches_projection():
+    pytest.importorskip("ijson")
+    stream = io.BytesIO(json.dumps(DOCUMENT).encode())
+    assert parse_fields(stream, FIELDS) == project(DOCUMENT, FIELDS)
+
+
+def test_parse_fields_returns_numbers_json_can_serialize():
+    pytest.importorskip("ijson")
+    document = {"entity": {"score": 0.75, "count": 3, "nested": {"ratio": 1.5}}}
+    selected = parse_fields(io.BytesIO(json.dumps(document).encode()), ("entity.score", "entity.nested"))
+
+    assert selected == {"entity": {"score": 0.75, "nested": {"ratio": 1.5}}}
+    assert type(selected["entity"]["score"]) is float and type(selected["entity"]["nested"]["ratio"]) is float
+    json.dumps(selected)
+
+
+def test_port_api_streams_fields_and_caches_projection(port_stub):
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+
+    data = port_api.get_blueprint_data("service", fields=["blueprint.identifier"])
+    assert data == {"blueprint": {"identifier": "service"}}
+    port_api.get_blueprint_data("service", fields=["blueprint.identifier"])
+    assert port_stub.count("GET", "/v1/blueprints/service") == 1
+
+    # A write drops the projected copy along with the full one
+    port_api.cache.invalidate("blueprint", "service")
+    port_api.get_blueprint_data("service", fields=["blueprint.identifier"])
+    assert port_stub.count("GET", "/v1/blueprints/service") == 2
+
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service",
+         "fields": ["blueprint.identifier"]},
+        {"name": "Unused", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "owner", "name": "Owner", "type": "string"}]},
+        {"name": "More", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "tier", "name": "Tier", "type": "string"}]},
+    ]
+}
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_results_are_released_once_no_later_step_needs_them(max_workers):
+    port_api = FakePortAPI(blueprint=DOCUMENT["blueprint"])
+    load_data_seen = {}
+    executor = YAMLExecutor("", port_api, {}, max_workers=max_workers, release_results=True,
+                            on_step_complete=lambda result: load_data_seen.setdefault(
+                                result["step_name"], "data" in executor.steps_by_name["Load"].result))
+    executor.use_workflow(compile_workflow("streaming.yml", WORKFLOW))
+    results = executor.execute_steps()
+
+    assert [result["status"] for result in results] == ["success"] * 4
+    assert port_api.arguments("get_blueprint_data") == [["blueprint.identifier"], None]
+    # Load stays whole until both steps that reference it have finished, then goes
+    assert load_data_seen["Props"] and load_data_seen["More"]
+    assert results[0]["released"] and "data" not in results[0]
+    # Nothing references Unused, so its data goes as soon as it has run
+    assert results[1]["released"] and "data" not in results[1]
+
+
+def test_results_are_kept_by_default():
+    _, results = run_workflow(FakePortAPI(blueprint=DOCUMENT["blueprint"]), WORKFLOW)
+    assert results[0]["data"] == {"blueprint": {"identifier": "service"}}
+    assert "released" not in results[1]
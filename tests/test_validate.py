@@ -0,0 +1,122 @@
+# tests/test_validate.py
+
+import json
+import os
+import shutil
+
+from src.yaml_handler.validate import ERROR, WARNING, main, validate_folder
+from src.yaml_handler.workflow_registry import (PLAN_CACHE_FILENAME, WorkflowRegistry, compile_workflow,
+                                                read_plan_cache, write_plan_cache)
+from src.yaml_handler.yaml_executor import EmbeddedJSON, build_scorecard_payload
+
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../configuration_files")
+
+BROKEN = """
+title: Broken
+inputs:
+  service:
+    type: blueprint
+steps:
+  - name: Load
+    action: load_resource
+    resource_type: blueprint
+    resource_id: "{{ inputs.servce }}"
+  - name: Props
+    action: add_properties_to_blueprint
+    blueprint_data: "{{ steps.Laod.result }}"
+    depends_on: Later
+    aggregationProperties:
+      - identifier: count
+        calculationSpec: "{not json"
+  - name: Scorecards
+    action: add_scorecards_to_blueprint
+    blueprint_data: "{{ steps.Load.result }}"
+    scorecards:
+      - identifier: quality
+        name: Quality
+        rules:
+          - identifier: has_owner
+            title: Has owner
+            query: '{"combinator": "and", "conditions": []}'
+  - name: Later
+    action: add_propertys_to_blueprint
+"""
+
+
+def write_folder(tmp_path, files):
+    for filename, content in files.items():
+        (tmp_path / filename).write_text(content)
+    return str(tmp_path)
+
+
+def test_bundled_workflows_are_valid():
+    report = validate_folder(YAML_FOLDER)
+    assert report and all(not issues for issues in report.values())
+
+
+def test_problems_are_reported_before_anything_runs(tmp_path):
+    folder = write_folder(tmp_path, {"broken.yml": BROKEN, "unparsable.yml": "steps: [\n"})
+    report = validate_folder(folder)
+
+    messages = {(issue.step, issue.message) for issue in report["broken.yml"]}
+    assert ("1 (Load)", "Input 'servce' is not declared under inputs") in messages
+    assert ("2 (Props)", "{{ steps.Laod.result }} refers to an unknown step and is never resolved") in messages
+    assert ("2 (Props)", "depends_on 'Later' is not an earlier step") in messages
+    assert any(step == "2 (Props)" and message.startswith("calculationSpec is not valid JSON")
+               for step, message in messages)
+    assert ("3 (Scorecards)", "Rule has_owner of scorecard quality needs level") in messages
+    assert ("4 (Later)", "Unknown action: add_propertys_to_blueprint") in messages
+    assert all(issue.severity == ERROR for issue in report["broken.yml"])
+    assert report["unparsable.yml"][0].message.startswith("Could not parse")
+    assert main([folder, "--no-cache"]) == 1
+
+
+def test_embedded_json_is_parsed_once_and_reported_as_written():
+    query = '{"combinator": "and", "conditions": []}'
+    workflow = compile_workflow("scorecards.yml", {"steps": [{
+        "name": "Scorecards", "action": "add_scorecards_to_blueprint", "blueprint_identifier": "service",
+        "scorecards": [{"identifier": "quality", "name": "Quality",
+                        "rules": [{"identifier": "r", "title": "R", "level": "Gold", "query": query}]}]}]})
+    scorecard = workflow.plan[0].details["scorecards"][0]
+
+    assert isinstance(scorecard["rules"][0]["query"], EmbeddedJSON) and scorecard["rules"][0]["query"] == query
+    assert build_scorecard_payload(scorecard)["rules"][0]["query"] == {"combinator": "and", "conditions": []}
+
+
+def test_registry_loads_plans_from_the_cache_until_the_file_changes(tmp_path):
+    folder = str(tmp_path)
+    shutil.copy(os.path.join(YAML_FOLDER, "pr_metrics.yml"), folder)
+    assert main([folder]) == 0
+    assert os.path.exists(os.path.join(folder, PLAN_CACHE_FILENAME))
+
+    registry = WorkflowRegistry(folder)
+    registry._yaml = None  # Any attempt to parse would fail
+    cached = registry.get("pr_metrics.yml")
+    assert cached == WorkflowRegistry(folder, plan_cache=False).get("pr_metrics.yml")
+
+    with open(os.path.join(folder, "pr_metrics.yml"), "a") as file:
+        file.write("\n# edited\n")
+    fresh = WorkflowRegistry(folder)
+    assert fresh.get("pr_metrics.yml").size == cached.size + len("\n# edited\n")
+
+
+def test_plan_cache_holds_plain_data_from_the_current_compiler(tmp_path):
+    folder = write_folder(tmp_path, {"plain.yml": "steps: []\n", "dated.yml": "when: 2024-01-01\nsteps: []\n"})
+    dated = WorkflowRegistry(folder).parse("dated.yml")
+    path = write_plan_cache(folder, {"plain.yml": {"steps": []}, "dated.yml": dated})
+    # The date would not come back from JSON as it went in, so that file is parsed as usual
+    assert set(read_plan_cache(folder)) == {"plain.yml"}
+
+    with open(path) as file:
+        cache = json.load(file)
+    cache["compiler"] = "written by an older compiler"
+    with open(path, "w") as file:
+        json.dump(cache, file)
+    assert read_plan_cache(folder) == {}
+
+
+def test_warnings_only_fail_in_strict_mode(tmp_path):
+    folder = write_folder(tmp_path, {"unnamed.yml": "steps:\n  - action: upsert_integration\n"})
+    assert [issue.severity for issue in validate_folder(folder)["unnamed.yml"]] == [WARNING]
+    assert main([folder, "--no-cache"]) == 0
+    assert main([folder, "--no-cache", "--strict"]) == 1
@@ -0,0 +1,114 @@
+# tests/test_warmup.py
+
+import os
+import time
+
+from src.api_clients.async_port_api import AsyncPortAPI
+from src.api_clients.port_api import PortAPI
+from src.web_app.warmup import (WarmupState, retry_warm_up_worker, start_warm_up_worker, warm_up_shared,
+                                warm_up_worker)
+from src.yaml_handler.workflow_registry import WorkflowRegistry
+
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../configuration_files")
+
+
+def test_ready_after_both_stages(port_stub):
+    registry = WorkflowRegistry(YAML_FOLDER)
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    state = WarmupState()
+
+    warm_up_shared(registry, state)
+    assert not state.ready and state.workflows == 1
+    assert "pr_metrics.yml" in registry._workflows
+
+    warm_up_worker(port_api, state)
+    assert state.ready
+    assert port_api.token == "token-1"
+    assert set(state.as_dict()["stages"]) == {"shared", "worker"}
+
+
+def test_failed_authentication_keeps_process_unready(port_stub):
+    port_stub.respond = lambda method, path, body: (401, {"ok": False}, {})
+    port_api = PortAPI(max_retries=0)
+    port_api.base_url = port_stub.base_url
+    state = WarmupState()
+
+    warm_up_worker(port_api, state)
+    report = state.as_dict()
+    assert not report["ready"]
+    assert report["errors"][0].startswith("port_api:")
+
+
+def test_failed_worker_stage_is_retried_after_backoff(port_stub):
+    respond = port_stub.respond
+    port_stub.respond = lambda method, path, body: (503, {"ok": False}, {})
+    port_api = PortAPI(max_retries=0)
+    port_api.base_url = port_stub.base_url
+    state = WarmupState(retry_backoff=0.05)
+
+    warm_up_worker(port_api, state)
+    assert retry_warm_up_worker(port_api, state) is None  # Still backing off
+    assert not state.ready and len(state.errors) == 1
+
+    port_stub.respond = respond
+    time.sleep(0.06)
+    retry_warm_up_worker(port_api, state).join(5)
+    assert state.ready and state.errors == []
+    assert port_api.token == "token-1"
+
+
+def test_worker_stage_does_not_hold_up_startup(port_stub):
+    port_stub.delay = 0.3  # Port is slow to issue tokens
+    port_api = PortAPI()
+    port_api.base_url = port_stub.base_url
+    state = WarmupState()
+
+    start = time.monotonic()
+    thread = start_warm_up_worker(port_api, state)
+    assert time.monotonic() - start < 0.1
+    assert not state.ready
+
+    thread.join(5)
+    assert state.ready
+
+
+def test_ready_route_retries_the_worker_stage_in_the_background(port_stub, web_app, monkeypatch):
+    respond = port_stub.respond
+    port_stub.respond = lambda method, path, body: (503, {"ok": False}, {})
+    port_api = PortAPI(max_retries=0)
+    port_api.base_url = port_stub.base_url
+    state = WarmupState(retry_backoff=0.05)
+    monkeypatch.setattr(web_app, "port_api", port_api)
+    monkeypatch.setattr(web_app, "warmup_state", state)
+    # Replaying a cassette leaves the async client out of the warm-up
+    monkeypatch.setattr(web_app, "PORT_CASSETTE", "cassette.json")
+    monkeypatch.setattr(web_app, "PORT_CASSETTE_MODE", "replay")
+    client = web_app.app.test_client()
+
+    warm_up_worker(port_api, state)
+    response = client.get("/ready")
+    assert response.status_code == 503 and response.get_json()["errors"]
+
+    port_stub.respond = respond
+    port_stub.delay = 0.2
+    time.sleep(0.06)
+    assert client.get("/ready").status_code == 503  # The retry is still waiting on Port
+    deadline = time.monotonic() + 5
+    while client.get("/ready").status_code != 200 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert state.ready and port_api.token == "token-1"
+
+
+def test_cache_stats_route_leaves_the_async_client_alone(web_app, monkeypatch):
+    monkeypatch.setattr(web_app, "port_api", PortAPI())
+    monkeypatch.setattr(web_app, "_async_port_api", None)
+    client = web_app.app.test_client()
+
+    stats = client.get("/cache_stats").get_json()
+    assert set(stats) == {"port_api", "single_flight"} and set(stats["single_flight"]) == {"port_api"}
+    assert web_app._async_port_api is None
+
+    monkeypatch.setattr(web_app, "_async_port_api", AsyncPortAPI())
+    stats = client.get("/cache_stats").get_json()
+    assert stats["async_port_api"]["size"] == 0 and "async_port_api" in stats["single_flight"]
@@ -0,0 +1,57 @@
+# tests/test_workflow_registry.py
+
+import os
+import shutil
+
+from src.yaml_handler.workflow_registry import WorkflowRegistry
+from src.yaml_handler.yaml_executor import YAMLExecutor
+
+YAML_FOLDER = os.path.join(os.path.dirname(__file__), "../configuration_files")
+
+
+def test_compiled_plan_matches_round_trip_plan():
+    executor = YAMLExecutor(YAML_FOLDER, None)
+    expected = executor.build_execution_plan(executor.load_yaml("pr_metrics.yml"))
+
+    workflow = WorkflowRegistry(YAML_FOLDER).get("pr_metrics.yml")
+
+    assert workflow.title == "Add PR Metrics"
+    assert [item["name"] for item in workflow.summary()["inputs"]] == ["service", "Pull request", "Git Integration"]
+    assert workflow.instantiate() == expected
+
+
+def test_parses_once_and_reloads_on_change(tmp_path):
+    shutil.copy(os.path.join(YAML_FOLDER, "pr_metrics.yml"), tmp_path / "pr_metrics.yml")
+    registry = WorkflowRegistry(str(tmp_path))
+
+    first = registry.get("pr_metrics.yml")
+    assert registry.get("pr_metrics.yml") is first
+
+    path = tmp_path / "pr_metrics.yml"
+    path.write_text(path.read_text().replace('title: "Add PR Metrics"', 'title: "Changed"'))
+    os.utime(path, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+
+    assert registry.get("pr_metrics.yml").title == "Changed"
+    assert [workflow.filename for workflow in registry.list_workflows()] == ["pr_metrics.yml"]
+
+
+def test_instances_share_the_plan_but_not_run_state():
+    workflow = WorkflowRegistry(YAML_FOLDER).get("pr_metrics.yml")
+    first, second = workflow.instantiate(), workflow.instantiate()
+
+    first[0].result = {"status": "success"}
+    assert second[0].result is None
+    # Unresolved values are shared with the plan, not copied per run
+    assert first[0].details is second[0].details is workflow.plan[0].details
+
+
+def test_resolving_copies_only_fields_with_placeholders():
+    workflow = WorkflowRegistry(YAML_FOLDER).get("pr_metrics.yml")
+    executor = YAMLExecutor(YAML_FOLDER, None, {"service": "svc"})
+    executor.use_workflow(workflow)
+
+    load = executor.steps[0]
+    executor.resolve_step(load)
+    assert load.resource_id == "svc"
+    assert load.details is workflow.plan[0].details
+    assert workflow.plan[0].resource_id == "{{ inputs.service }}"
@@ -0,0 +1,77 @@
+# tests/test_write_batching.py
+
+from conftest import FakePortAPI, run_workflow
+
+from src.instrumentation.hooks import InstrumentationHook, hooks
+
+QUERY = '{"combinator": "and", "conditions": []}'
+
+WORKFLOW = {
+    "steps": [
+        {"name": "Load", "action": "load_resource", "resource_type": "blueprint", "resource_id": "service"},
+        {"name": "Props A", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "a", "name": "A", "type": "string"}]},
+        {"name": "Props B", "action": "add_properties_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "properties": [{"identifier": "b", "name": "B", "type": "number"}],
+         "aggregationProperties": [{"identifier": "avg", "title": "Avg", "type": "number", "target": "pr",
+                                    "calculationSpec": '{"func": "average"}'}]},
+        {"name": "Scorecards", "action": "add_scorecards_to_blueprint", "blueprint_data": "{{ steps.Load.result }}",
+         "depends_on": ["Props A", "Props B"],
+         "scorecards": [
+             {"identifier": "one", "name": "One", "rules": [{"identifier": "r", "title": "R", "level": "Gold",
+                                                             "query": QUERY}]},
+             {"identifier": "two", "name": "Two", "rules": []},
+         ]},
+    ]
+}
+
+
+def run(batch_writes, max_workers=1):
+    port_api = FakePortAPI()
+    _, results = run_workflow(port_api, WORKFLOW, max_workers=max_workers, batch_writes=batch_writes)
+    return results, port_api.writes
+
+
+def test_property_updates_are_merged_per_blueprint():
+    for max_workers in (1, 4):
+        results, calls = run(batch_writes=True, max_workers=max_workers)
+
+        updates = [call for call in calls if call[0] == "update_blueprint"]
+        assert len(updates) == 1
+        assert set(updates[0][2]["schema"]["properties"]) == {"a", "b"}
+        assert set(updates[0][2]["aggregationProperties"]) == {"avg"}
+        # The PATCH is sent before the scorecard step that depends on it
+        assert calls.index(updates[0]) < min(calls.index(call) for call in calls if call[0] == "create_scorecard")
+
+        assert [result["status"] for result in results] == ["success"] * 4
+        assert results[1]["batched_steps"] == [2, 3]
+        assert set(results[2]["properties_added"]["schema"]["properties"]) == {"b"}
+
+
+class StepEvents(InstrumentationHook):
+    def __init__(self):
+        self.steps = []
+
+    def on_step(self, step):
+        self.steps.append(step)
+
+
+def test_batched_steps_are_reported_once_with_their_final_status():
+    for max_workers in (1, 4):
+        events = hooks.register(StepEvents())
+        try:
+            run(batch_writes=True, max_workers=max_workers)
+        finally:
+            hooks.unregister(events)
+
+        assert sorted((step["step_number"], step["status"]) for step in events.steps) == [
+            (1, "success"), (2, "success"), (3, "success"), (4, "success")]
+
+
+def test_every_scorecard_is_created():
+    results, calls = run(batch_writes=False)
+
+    assert len([call for call in calls if call[0] == "update_blueprint"]) == 2
+    created = sorted(call[2]["identifier"] for call in calls if call[0] == "create_scorecard")
+    assert created == ["one", "two"]
+    assert [scorecard["identifier"] for scorecard in results[3]["scorecards_added"]] == ["one", "two"]